@@ -0,0 +1,92 @@
+"""Per-operation latency of the NumPy canvas compared to the pixoo library's buffer.
+
+Runs without a device:
+
+    python benchmarks/canvas.py [--size 64] [--repeat 200]
+"""
+
+import argparse
+import base64
+import hashlib
+import timeit
+from collections.abc import Callable
+
+import numpy as np
+from PIL import Image
+from pixoo import Pixoo
+
+from pixoo_rest.core.canvas import Canvas
+
+
+def offline_pixoo(size: int) -> Pixoo:
+    """A Pixoo object with an initialized buffer that never talks to a device."""
+    pixoo = Pixoo.__new__(Pixoo)
+    pixoo.size = size
+    pixoo.pixel_count = size * size
+    pixoo.debug = False
+    pixoo.fill()
+    return pixoo
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """Best average time of a call in microseconds."""
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=5, number=repeat)) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=64, choices=(16, 32, 64))
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    size, repeat = args.size, args.repeat
+    pixoo = offline_pixoo(size)
+    canvas = Canvas(size)
+    image = Image.fromarray(np.random.default_rng(0).integers(0, 256, (size, size, 3), dtype=np.uint8))
+    rgba = np.random.default_rng(1).integers(0, 256, (size, size, 4), dtype=np.uint8)
+
+    cases: list[tuple[str, Callable[[], object], Callable[[], object] | None]] = [
+        ("fill", lambda: pixoo.fill_rgb(10, 20, 30), lambda: canvas.fill(10, 20, 30)),
+        ("pixel", lambda: pixoo.draw_pixel_at_location_rgb(5, 5, 255, 0, 0), lambda: canvas.pixel(5, 5, 255, 0, 0)),
+        (
+            "rectangle (full screen)",
+            lambda: pixoo.draw_filled_rectangle_from_top_left_to_bottom_right_rgb(0, 0, size - 1, size - 1, 1, 2, 3),
+            lambda: canvas.rectangle(0, 0, size - 1, size - 1, 1, 2, 3),
+        ),
+        (
+            "line (diagonal)",
+            lambda: pixoo.draw_line_from_start_to_stop_rgb(0, 0, size - 1, size - 1, 255, 255, 0),
+            lambda: canvas.line(0, 0, size - 1, size - 1, 255, 255, 0),
+        ),
+        (
+            "text (16 characters)",
+            lambda: pixoo.draw_text_at_location_rgb("HELLO WORLD 1234", 0, 0, 255, 255, 255),
+            lambda: canvas.text("HELLO WORLD 1234", 0, 0, 255, 255, 255),
+        ),
+        ("image (full screen)", lambda: pixoo.draw_image_at_location(image, 0, 0), lambda: canvas.image(image, 0, 0)),
+        ("alpha composite (full screen)", None, lambda: canvas.composite(rgba, 0, 0)),
+        (
+            "push payload (base64)",
+            lambda: base64.b64encode(bytearray(pixoo._Pixoo__buffer)).decode(),
+            lambda: base64.b64encode(canvas.pixels).decode(),
+        ),
+        (
+            "frame fingerprint",
+            lambda: hashlib.blake2b(bytes(pixoo._Pixoo__buffer), digest_size=16).digest(),
+            lambda: hashlib.blake2b(canvas.pixels, digest_size=16).digest(),
+        ),
+    ]
+
+    print(f"{size}x{size} screen, best of 5 x {repeat} calls")
+    print(f"{'operation':<32}{'pixoo (µs)':>12}{'canvas (µs)':>13}{'speedup':>10}")
+    for name, library, vectorized in cases:
+        library_us = measure(library, repeat) if library else None
+        canvas_us = measure(vectorized, repeat)
+        speedup = f"{library_us / canvas_us:.1f}x" if library_us else "-"
+        library_text = f"{library_us:.1f}" if library_us else "n/a"
+        print(f"{name:<32}{library_text:>12}{canvas_us:>13.1f}{speedup:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Device registry endpoints for the Pixoo REST API."""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from pixoo_rest.api.draw import draw_operations, prepare_operations
+from pixoo_rest.core.devices import Device, DeviceRegistry
+from pixoo_rest.core.discovery import LanDiscovery
+from pixoo_rest.core.workers import ImageWorkers
+from pixoo_rest.dependencies import get_device_registry, get_image_workers, get_lan_discovery
+from pixoo_rest.models.requests import BroadcastBatchRequest, BroadcastResponse, DeviceInfo, DiscoveredDeviceInfo
+
+router = APIRouter(prefix="/devices", tags=["devices"])
+
+# Statuses of device calls that failed because of the device, not the request
+_DEVICE_FAILURES = {503, 504}
+
+
+@router.get("", response_model=list[DeviceInfo])
+async def list_devices(registry: DeviceRegistry = Depends(get_device_registry)) -> list[DeviceInfo]:
+    """List the configured Pixoo devices.
+
+    Every device can be addressed below `/devices/{device_name}`, e.g.
+    `/devices/kitchen/draw/fill`.
+    """
+    return [
+        DeviceInfo(name=device.name, host=device.host, screen_size=device.size, default=device is registry.default)
+        for device in registry
+    ]
+
+
+@router.post("/broadcast", response_model=BroadcastResponse)
+async def broadcast(
+    request: BroadcastBatchRequest,
+    registry: DeviceRegistry = Depends(get_device_registry),
+    workers: ImageWorkers = Depends(get_image_workers),
+) -> BroadcastResponse:
+    """Draw a frame once and send it to several devices in parallel.
+
+    The operations are rendered on the first reachable target device of each
+    screen size (on top of its current canvas, so start with a `fill` for a
+    clean frame); the resulting frame is copied to the other targets and pushed
+    to all of them concurrently. Devices that cannot be reached are skipped
+    and listed in `failed`. Images are decoded before any canvas is touched;
+    an invalid operation fails the whole request.
+    """
+    try:
+        targets = [registry.get(name) for name in request.devices] if request.devices else list(registry)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown Pixoo device: {e.args[0]}") from e
+
+    by_size: dict[int, list[Device]] = {}
+    for device in targets:
+        by_size.setdefault(device.size, []).append(device)
+    images = {size: await prepare_operations(request.operations, size, workers) for size in by_size}
+
+    failed: dict[str, str] = {}
+
+    def record(devices: list[Device], results: list) -> list[Device]:
+        """Note the devices whose call failed and return the others."""
+        for device, result in zip(devices, results, strict=True):
+            if isinstance(result, HTTPException):
+                failed[device.name] = result.detail
+            elif isinstance(result, Exception):
+                failed[device.name] = str(result)
+        return [device for device in devices if device.name not in failed]
+
+    loaded: list[Device] = []
+    try:
+        for group in by_size.values():
+            for index, renderer in enumerate(group):
+                try:
+                    await renderer.run(draw_operations, renderer.canvas, request.operations, images[renderer.size])
+                    frame = await renderer.run(renderer.canvas.tobytes)
+                except HTTPException as e:
+                    if e.status_code not in _DEVICE_FAILURES:
+                        raise
+                    # Not reachable (or timed out): render on the next device of the size
+                    failed[renderer.name] = e.detail
+                    continue
+                others = group[index + 1:]
+                results = await asyncio.gather(
+                    *(device.run(device.canvas.load, frame) for device in others),
+                    return_exceptions=True,
+                )
+                loaded += [renderer, *record(others, results)]
+                break
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to render broadcast frame: {str(e)}") from e
+
+    if request.push_immediately:
+        results = await asyncio.gather(*(device.push() for device in loaded), return_exceptions=True)
+        record(loaded, results)
+
+    return BroadcastResponse(
+        status="success" if not failed else "partial",
+        message=f"Sent frame to {len(targets) - len(failed)} of {len(targets)} devices",
+        devices=[device.name for device in targets if device.name not in failed],
+        failed=failed,
+    )
+
+
+@router.get("/discovered", response_model=list[DiscoveredDeviceInfo])
+async def discovered_devices(
+    refresh: bool = Query(default=False, description="Probe the targets again instead of using the inventory"),
+    registry: DeviceRegistry = Depends(get_device_registry),
+    discovery: LanDiscovery = Depends(get_lan_discovery),
+) -> list[DiscoveredDeviceInfo]:
+    """List the Pixoo devices found on the local network.
+
+    The hosts and networks of `PIXOO_DISCOVERY_TARGETS` are probed directly
+    (unlike `/divoom/device/lan`, which asks the Divoom cloud). Results are
+    reused for `PIXOO_DISCOVERY_TTL` seconds. Hosts that are not used by a
+    configured device can be added to `PIXOO_DEVICES`, or are picked up by
+    devices configured with the host `auto`.
+    """
+    if not discovery.targets:
+        raise HTTPException(status_code=404, detail="No discovery targets configured (PIXOO_DISCOVERY_TARGETS)")
+    try:
+        found = await discovery.devices(refresh)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid discovery targets: {str(e)}") from e
+
+    names = {device.host: device.name for device in registry}
+    return [
+        DiscoveredDeviceInfo(
+            host=device.host,
+            device=names.get(device.host),
+            latency_ms=round(device.latency * 1000, 2),
+            first_seen=device.first_seen,
+            last_seen=device.last_seen,
+            conf=device.conf,
+        )
+        for device in found
+    ]
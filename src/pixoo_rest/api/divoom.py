@@ -1,19 +1,23 @@
 """Divoom API passthrough endpoints for the Pixoo REST API."""
 
 import httpx
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
+from pixoo_rest.core.config import settings
+from pixoo_rest.core.divoom import DivoomCatalog
+from pixoo_rest.core.http import HttpClients
+from pixoo_rest.dependencies import get_divoom_catalog, get_http_clients
 from pixoo_rest.models.requests import (
+    DivoomDialFindResponse,
     DivoomDialListResponse,
+    DivoomDialPrefetchResponse,
     DivoomDialTypesResponse,
     DivoomLanDevicesResponse,
 )
 
 router = APIRouter(prefix="/divoom", tags=["divoom"])
 
-DIVOOM_API_URL = "https://app.divoom-gz.com"
-
 
 class GetDialListRequest(BaseModel):
     """Request model for getting dial list."""
@@ -22,18 +26,36 @@ class GetDialListRequest(BaseModel):
     page_number: int = Field(default=1, ge=1, description="Page number")
 
 
+class PrefetchDialsRequest(BaseModel):
+    """Request model for loading all pages of a dial type into the cache."""
+
+    dial_type: str = Field(default="Game", description="Type of dial (e.g., 'Game', 'Clock')")
+    wait: bool = Field(default=True, description="Answer once all pages are loaded (false: load in the background)")
+
+
+class FindDialRequest(BaseModel):
+    """Request model for looking up dials in the cached dial lists."""
+
+    query: str = Field(..., min_length=1, description="Clock ID or part of the dial name (case-insensitive)")
+    dial_type: str | None = Field(
+        default=None,
+        description="Dial type to search; all its pages are loaded first. If not set, only cached pages are searched",
+    )
+
+
 @router.post("/device/lan", response_model=DivoomLanDevicesResponse)
-async def get_lan_devices() -> DivoomLanDevicesResponse:
+async def get_lan_devices(clients: HttpClients = Depends(get_http_clients)) -> DivoomLanDevicesResponse:
     """Get Divoom devices on the local network.
     
-    Returns information about Divoom devices available on the same LAN.
+    Returns information about Divoom devices available on the same LAN, as
+    seen by the Divoom cloud (devices sharing the server's public IP).
+    `/devices/discovered` probes the local network directly instead.
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{DIVOOM_API_URL}/Device/ReturnSameLANDevice"
-            )
-            return DivoomLanDevicesResponse(**response.json())
+        response = await clients.divoom.post(
+            f"{settings.pixoo_rest_divoom_api_url.rstrip('/')}/Device/ReturnSameLANDevice"
+        )
+        return DivoomLanDevicesResponse(**response.json())
     except httpx.HTTPError as e:
         raise HTTPException(
             status_code=400,
@@ -47,17 +69,14 @@ async def get_lan_devices() -> DivoomLanDevicesResponse:
 
 
 @router.post("/channel/dial/types", response_model=DivoomDialTypesResponse)
-async def get_dial_types() -> DivoomDialTypesResponse:
+async def get_dial_types(catalog: DivoomCatalog = Depends(get_divoom_catalog)) -> DivoomDialTypesResponse:
     """Get available dial types from Divoom.
     
-    Returns the list of available clock/dial types.
+    Returns the list of available clock/dial types. Answers are cached (see
+    `PIXOO_REST_DIVOOM_CACHE_MAX_AGE`).
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{DIVOOM_API_URL}/Channel/GetDialType"
-            )
-            return DivoomDialTypesResponse(**response.json())
+        return DivoomDialTypesResponse(**await catalog.dial_types())
     except httpx.HTTPError as e:
         raise HTTPException(
             status_code=400,
@@ -71,24 +90,20 @@ async def get_dial_types() -> DivoomDialTypesResponse:
 
 
 @router.post("/channel/dial/list", response_model=DivoomDialListResponse)
-async def get_dial_list(request: GetDialListRequest) -> DivoomDialListResponse:
+async def get_dial_list(
+    request: GetDialListRequest,
+    catalog: DivoomCatalog = Depends(get_divoom_catalog),
+) -> DivoomDialListResponse:
     """Get list of available dials/clocks from Divoom.
     
     Returns a paginated list of available clock faces for the specified type.
+    Pages are cached (see `PIXOO_REST_DIVOOM_CACHE_MAX_AGE`).
     
     Args:
         request: Dial list request with type and page number
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{DIVOOM_API_URL}/Channel/GetDialList",
-                json={
-                    "DialType": request.dial_type,
-                    "Page": request.page_number
-                }
-            )
-            return DivoomDialListResponse(**response.json())
+        return DivoomDialListResponse(**await catalog.dial_list(request.dial_type, request.page_number))
     except httpx.HTTPError as e:
         raise HTTPException(
             status_code=400,
@@ -99,3 +114,68 @@ async def get_dial_list(request: GetDialListRequest) -> DivoomDialListResponse:
             status_code=500,
             detail=f"Failed to get dial list: {str(e)}"
         ) from e
+
+
+@router.post("/channel/dial/prefetch", response_model=DivoomDialPrefetchResponse)
+async def prefetch_dials(
+    request: PrefetchDialsRequest,
+    catalog: DivoomCatalog = Depends(get_divoom_catalog),
+) -> DivoomDialPrefetchResponse:
+    """Load all pages of a dial type into the cache.
+
+    Afterwards the pages and `/channel/dial/find` are answered without asking
+    the Divoom cloud.
+
+    Args:
+        request: Dial type and whether to wait for the pages
+    """
+    if not request.wait:
+        catalog.start_prefetch(request.dial_type)
+        return DivoomDialPrefetchResponse(
+            message=f"Loading {request.dial_type} dials in the background",
+            dial_type=request.dial_type,
+        )
+
+    try:
+        pages = await catalog.prefetch(request.dial_type)
+    except httpx.HTTPError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to query Divoom API: {str(e)}"
+        ) from e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to prefetch dials: {str(e)}"
+        ) from e
+    return DivoomDialPrefetchResponse(
+        message=f"Loaded {pages} page(s) of {request.dial_type} dials",
+        dial_type=request.dial_type,
+        pages=pages,
+    )
+
+
+@router.post("/channel/dial/find", response_model=DivoomDialFindResponse)
+async def find_dials(
+    request: FindDialRequest,
+    catalog: DivoomCatalog = Depends(get_divoom_catalog),
+) -> DivoomDialFindResponse:
+    """Find dials by clock ID or name in the cached dial lists.
+
+    Use the `ClockId` of a result with `/set/clock` to select the dial.
+
+    Args:
+        request: Search query and optional dial type
+    """
+    try:
+        return DivoomDialFindResponse(dials=await catalog.find(request.query, request.dial_type))
+    except httpx.HTTPError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to query Divoom API: {str(e)}"
+        ) from e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to find dials: {str(e)}"
+        ) from e
@@ -1,10 +1,10 @@
 """Download endpoints for the Pixoo REST API."""
 
-import httpx
+import requests
 from fastapi import APIRouter, Depends, HTTPException
-from pixoo import Pixoo
 
-from pixoo_rest.dependencies import get_pixoo
+from pixoo_rest.core.devices import Device
+from pixoo_rest.dependencies import get_device
 from pixoo_rest.models.requests import DownloadTextRequest
 
 router = APIRouter(prefix="/download", tags=["download"])
@@ -13,7 +13,7 @@ router = APIRouter(prefix="/download", tags=["download"])
 @router.post("/text")
 async def download_text(
     request: DownloadTextRequest,
-    pixoo: Pixoo = Depends(get_pixoo)
+    device: Device = Depends(get_device),
 ) -> dict:
     """Display text that updates from a URL.
     
@@ -22,34 +22,40 @@ async def download_text(
     
     Args:
         request: Text download configuration
+
+    Raises:
+        HTTPException: 502 if the device answers with an error code
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"http://{pixoo.ip_address}/post",
-                json={
-                    "Command": "Draw/SendHttpItemList",
-                    "ItemList": [
-                        {
-                            "type": 23,
-                            "TextId": request.id,
-                            "TextString": request.url,
-                            "x": request.x,
-                            "y": request.y,
-                            "dir": request.scroll_direction,
-                            "font": 4,
-                            "TextWidth": request.text_width,
-                            "Textheight": request.text_height,
-                            "speed": request.scroll_speed,
-                            "update_time": request.update_interval,
-                            "align": request.horizontal_alignment,
-                            "color": f"#{request.r:02x}{request.g:02x}{request.b:02x}"
-                        }
-                    ]
+        return await device.send_command({
+            "Command": "Draw/SendHttpItemList",
+            "ItemList": [
+                {
+                    "type": 23,
+                    "TextId": request.id,
+                    "TextString": request.url,
+                    "x": request.x,
+                    "y": request.y,
+                    "dir": request.scroll_direction,
+                    "font": 4,
+                    "TextWidth": request.text_width,
+                    "Textheight": request.text_height,
+                    "speed": request.scroll_speed,
+                    "update_time": request.update_interval,
+                    "align": request.horizontal_alignment,
+                    "color": f"#{request.r:02x}{request.g:02x}{request.b:02x}"
                 }
-            )
-            return response.json()
-    except httpx.HTTPError as e:
+            ]
+        })
+    except HTTPException:
+        raise
+    except RuntimeError as e:
+        # The device answered with a non-zero error code (included in the message)
+        raise HTTPException(
+            status_code=502,
+            detail=f"Pixoo device rejected the text download: {str(e)}"
+        ) from e
+    except requests.RequestException as e:
         raise HTTPException(
             status_code=400,
             detail=f"Failed to configure text download: {str(e)}"
@@ -1,15 +1,32 @@
 """Drawing endpoints for the Pixoo REST API."""
 
+import asyncio
+import base64
+
 from fastapi import APIRouter, Depends, HTTPException
-from pixoo import Pixoo
+from PIL import Image
 
-from pixoo_rest.dependencies import get_pixoo
+from pixoo_rest.core.canvas import Canvas
+from pixoo_rest.core.devices import Device
+from pixoo_rest.core.display import image_options, open_content
+from pixoo_rest.core.imaging import ImageOptions, ImageTooLargeError, PreparedImage, prepare_image
+from pixoo_rest.core.workers import ImageWorkers
+from pixoo_rest.dependencies import get_device, get_image_workers
 from pixoo_rest.models.requests import (
+    DrawBatchRequest,
+    DrawCharacterOperation,
     DrawCharacterRequest,
+    DrawFillOperation,
     DrawFillRequest,
+    DrawImageOperation,
+    DrawLineOperation,
     DrawLineRequest,
+    DrawOperation,
+    DrawPixelOperation,
     DrawPixelRequest,
+    DrawRectangleOperation,
     DrawRectangleRequest,
+    DrawTextOperation,
     DrawTextRequest,
     SuccessResponse,
 )
@@ -18,93 +35,232 @@ router = APIRouter(prefix="/draw", tags=["draw"])
 
 
 @router.post("/pixel", response_model=SuccessResponse)
-async def draw_pixel(request: DrawPixelRequest, pixoo: Pixoo = Depends(get_pixoo)):
+async def draw_pixel(
+    request: DrawPixelRequest,
+    device: Device = Depends(get_device),
+):
     """Draw a single pixel at the specified coordinates with the given color."""
     try:
-        pixoo.draw_pixel_at_location_rgb(request.x, request.y, request.r, request.g, request.b)
+        await device.run(device.canvas.pixel, request.x, request.y, request.r, request.g, request.b)
 
         if request.push_immediately:
-            pixoo.push()
+            await device.push()
 
         return SuccessResponse()
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to draw pixel: {str(e)}") from e
 
 
 @router.post("/character", response_model=SuccessResponse)
-async def draw_character(request: DrawCharacterRequest, pixoo: Pixoo = Depends(get_pixoo)):
+async def draw_character(
+    request: DrawCharacterRequest,
+    device: Device = Depends(get_device),
+):
     """Draw a character at the specified coordinates with the given color."""
     try:
-        pixoo.draw_character_at_location_rgb(
+        await device.run(
+            device.canvas.character,
             request.character, request.x, request.y, request.r, request.g, request.b
         )
 
         if request.push_immediately:
-            pixoo.push()
+            await device.push()
 
         return SuccessResponse()
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to draw character: {str(e)}") from e
 
 
 @router.post("/line", response_model=SuccessResponse)
-async def draw_line(request: DrawLineRequest, pixoo: Pixoo = Depends(get_pixoo)):
+async def draw_line(
+    request: DrawLineRequest,
+    device: Device = Depends(get_device),
+):
     """Draw a line from (x1, y1) to (x2, y2) with the given color."""
     try:
-        pixoo.draw_line_from_start_to_stop_rgb(
+        await device.run(
+            device.canvas.line,
             request.x1, request.y1, request.x2, request.y2, request.r, request.g, request.b
         )
 
         if request.push_immediately:
-            pixoo.push()
+            await device.push()
 
         return SuccessResponse()
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to draw line: {str(e)}") from e
 
 
 @router.post("/rectangle", response_model=SuccessResponse)
-async def draw_rectangle(request: DrawRectangleRequest, pixoo: Pixoo = Depends(get_pixoo)):
+async def draw_rectangle(
+    request: DrawRectangleRequest,
+    device: Device = Depends(get_device),
+):
     """Draw a rectangle from (x1, y1) to (x2, y2) with the given color."""
     try:
-        pixoo.draw_rectangle_from_top_left_to_bottom_right_rgb(
+        await device.run(
+            device.canvas.rectangle,
             request.x1, request.y1, request.x2, request.y2, request.r, request.g, request.b
         )
 
         if request.push_immediately:
-            pixoo.push()
+            await device.push()
 
         return SuccessResponse()
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to draw rectangle: {str(e)}") from e
 
 
 @router.post("/fill", response_model=SuccessResponse)
-async def draw_fill(request: DrawFillRequest, pixoo: Pixoo = Depends(get_pixoo)):
+async def draw_fill(
+    request: DrawFillRequest,
+    device: Device = Depends(get_device),
+):
     """Fill the entire screen with the given color."""
     try:
-        pixoo.fill_rgb(request.r, request.g, request.b)
+        await device.run(device.canvas.fill, request.r, request.g, request.b)
 
         if request.push_immediately:
-            pixoo.push()
+            await device.push()
 
         return SuccessResponse()
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fill screen: {str(e)}") from e
 
 
 @router.post("/text", response_model=SuccessResponse)
-async def draw_text(request: DrawTextRequest, pixoo: Pixoo = Depends(get_pixoo)):
+async def draw_text(
+    request: DrawTextRequest,
+    device: Device = Depends(get_device),
+):
     """Draw text at the specified coordinates with the given color."""
     try:
-        # Note: pixoo library's draw_text_at_location_rgb doesn't support font parameter
-        pixoo.draw_text_at_location_rgb(
+        # Note: the canvas draws the pixoo library's 3x5 font, the font parameter is not supported
+        await device.run(
+            device.canvas.text,
             request.text, request.x, request.y, request.r, request.g, request.b
         )
 
         if request.push_immediately:
-            pixoo.push()
+            await device.push()
 
         return SuccessResponse()
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to draw text: {str(e)}") from e
+
+
+def _decode_image(data: str, size: int, options: ImageOptions) -> PreparedImage:
+    """Decode a batch image and shrink it to fit the screen (runs on the image workers)."""
+    return prepare_image(open_content(base64.b64decode(data)), size, options=options)
+
+
+async def prepare_operations(
+    operations: list[DrawOperation],
+    size: int,
+    workers: ImageWorkers,
+) -> dict[int, PreparedImage]:
+    """Decode the images of a batch for a screen size, before anything is drawn.
+
+    Returns:
+        Converted image per index of an image operation
+
+    Raises:
+        HTTPException: 400 if an image cannot be decoded, 413 if it is too large
+    """
+    options = image_options()
+    indexes = [index for index, operation in enumerate(operations) if isinstance(operation, DrawImageOperation)]
+
+    async def decode(index: int) -> PreparedImage:
+        try:
+            return await workers.run(_decode_image, operations[index].data, size, options)
+        except ImageTooLargeError as e:
+            raise HTTPException(status_code=413, detail=f"Batch operation {index} (image): {str(e)}") from e
+        except (ValueError, OSError) as e:
+            # Invalid base64 (binascii.Error) or not a readable image (UnidentifiedImageError)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Batch operation {index} (image): Invalid image data: {str(e)}"
+            ) from e
+
+    images = await asyncio.gather(*(decode(index) for index in indexes))
+    return dict(zip(indexes, images, strict=True))
+
+
+def _draw_operation(canvas: Canvas, operation: DrawOperation, image: PreparedImage | None) -> None:
+    """Draw a single batch operation onto the canvas (without pushing)."""
+    if isinstance(operation, DrawPixelOperation):
+        canvas.pixel(operation.x, operation.y, operation.r, operation.g, operation.b)
+    elif isinstance(operation, DrawCharacterOperation):
+        canvas.character(operation.character, operation.x, operation.y, operation.r, operation.g, operation.b)
+    elif isinstance(operation, DrawLineOperation):
+        canvas.line(operation.x1, operation.y1, operation.x2, operation.y2, operation.r, operation.g, operation.b)
+    elif isinstance(operation, DrawRectangleOperation):
+        canvas.rectangle(operation.x1, operation.y1, operation.x2, operation.y2, operation.r, operation.g, operation.b)
+    elif isinstance(operation, DrawFillOperation):
+        canvas.fill(operation.r, operation.g, operation.b)
+    elif isinstance(operation, DrawTextOperation):
+        canvas.text(operation.text, operation.x, operation.y, operation.r, operation.g, operation.b)
+    elif isinstance(operation, DrawImageOperation) and image is not None:
+        if image.width <= canvas.width and image.height <= canvas.height:
+            canvas.blit(image.data, image.width, image.height, operation.x, operation.y)
+        else:
+            # Converted for the screen, but drawn on a smaller layer
+            canvas.image(
+                Image.frombytes("RGB", (image.width, image.height), image.data),
+                operation.x,
+                operation.y,
+                image_options(),
+            )
+
+
+def draw_operations(canvas: Canvas, operations: list[DrawOperation], images: dict[int, PreparedImage]) -> None:
+    """Draw all batch operations in order, reporting which one failed.
+
+    Images must have been converted by `prepare_operations`.
+    """
+    for index, operation in enumerate(operations):
+        try:
+            _draw_operation(canvas, operation, images.get(index))
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to draw batch operation {index} ({operation.type}): {str(e)}"
+            ) from e
+
+
+@router.post("/batch", response_model=SuccessResponse)
+async def draw_batch(
+    request: DrawBatchRequest,
+    device: Device = Depends(get_device),
+    workers: ImageWorkers = Depends(get_image_workers),
+):
+    """Apply several draw operations in order and push (at most) once.
+
+    Replaces a sequence of individual /draw/* calls with a single request;
+    the `push_immediately` flag of the individual operations is ignored.
+    Images are decoded first, so a batch with an invalid image draws nothing.
+    """
+    try:
+        images = await prepare_operations(request.operations, device.size, workers)
+        await device.run(draw_operations, device.canvas, request.operations, images)
+
+        if request.push_immediately:
+            await device.push()
+
+        return SuccessResponse(message=f"Drew {len(request.operations)} operations")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to push batch: {str(e)}") from e
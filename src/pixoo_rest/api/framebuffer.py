@@ -0,0 +1,70 @@
+"""Raw framebuffer endpoints for the Pixoo REST API."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from pixoo_rest.core.devices import Device
+from pixoo_rest.core.http import ContentTooLargeError, read_body
+from pixoo_rest.dependencies import get_device
+from pixoo_rest.models.requests import SuccessResponse
+
+router = APIRouter(prefix="/framebuffer", tags=["framebuffer"])
+
+
+@router.put(
+    "",
+    response_model=SuccessResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}},
+        }
+    },
+)
+async def put_framebuffer(
+    request: Request,
+    x: int = Query(0, ge=0, description="X coordinate of the region's top-left corner"),
+    y: int = Query(0, ge=0, description="Y coordinate of the region's top-left corner"),
+    width: int | None = Query(None, ge=1, description="Region width (default: screen size)"),
+    height: int | None = Query(None, ge=1, description="Region height (default: screen size)"),
+    push_immediately: bool = Query(True, description="Push changes immediately"),
+    device: Device = Depends(get_device),
+):
+    """Copy raw RGB888 data into the framebuffer.
+
+    The request body holds `width * height * 3` bytes, row by row, three bytes
+    (red, green, blue) per pixel - e.g. `array.astype(numpy.uint8).tobytes()`
+    of an array with shape `(height, width, 3)`. Without a region the body
+    covers the whole screen. The data is copied row by row without decoding.
+    """
+    width = device.size if width is None else width
+    height = device.size if height is None else height
+    if x + width > device.size or y + height > device.size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Region {width}x{height} at ({x}, {y}) does not fit on a {device.size}x{device.size} screen"
+        )
+
+    try:
+        data = await read_body(request, width * height * 3)
+    except ContentTooLargeError as e:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Expected {width * height * 3} bytes of RGB data for a {width}x{height} region: {e}"
+        ) from e
+    if len(data) != width * height * 3:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected {width * height * 3} bytes of RGB data for a {width}x{height} region, got {len(data)}"
+        )
+
+    try:
+        await device.run(device.canvas.blit, data, width, height, x, y)
+
+        if push_immediately:
+            await device.push()
+
+        return SuccessResponse()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to write framebuffer: {str(e)}") from e
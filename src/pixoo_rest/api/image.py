@@ -1,127 +1,120 @@
 """Image and GIF handling endpoints for the Pixoo REST API."""
 
-import base64
-from io import BytesIO
-
 import httpx
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
-from PIL import Image
-from pixoo import Pixoo
 
-from pixoo_rest.dependencies import get_pixoo
+from pixoo_rest.core.cache import FrameCache
+from pixoo_rest.core.config import settings
+from pixoo_rest.core.devices import Device
+from pixoo_rest.core.display import image_options, send_gif_to_device, send_image_to_device
+from pixoo_rest.core.downloads import DownloadCache
+from pixoo_rest.core.gif import GifUploadResult
+from pixoo_rest.core.http import ContentTooLargeError, HttpClients, read_limited, read_response
+from pixoo_rest.core.imaging import ImageTooLargeError, ResampleFilter, is_gif
+from pixoo_rest.core.workers import ImageWorkers
+from pixoo_rest.dependencies import (
+    get_device,
+    get_download_cache,
+    get_frame_cache,
+    get_http_clients,
+    get_image_workers,
+)
 from pixoo_rest.models.requests import (
     DownloadGifRequest,
     DownloadImageRequest,
-    SuccessResponse,
+    GifUploadResponse,
 )
 
 router = APIRouter(tags=["image"])
 
+# Size of the chunks uploaded files are read in
+_UPLOAD_CHUNK_BYTES = 64 * 1024
 
-async def _send_gif_to_device(
-    pixoo: Pixoo,
-    gif: Image.Image,
-    speed: int,
-    skip_first_frame: bool,
-    client: httpx.AsyncClient
-) -> None:
-    """Send a GIF to the Pixoo device.
-    
-    Args:
-        pixoo: Pixoo device instance
-        gif: PIL Image object (GIF)
-        speed: Animation speed
-        skip_first_frame: Whether to skip the first frame
-        client: httpx AsyncClient to reuse for requests
-    """
-    if not gif.is_animated:
-        # Not animated, just draw as static image
-        pixoo.draw_image(gif)
-        pixoo.push()
-        return
-
-    # Reset GIF state
-    await client.post(
-        f"http://{pixoo.ip_address}/post",
-        json={"Command": "Draw/ResetHttpGifId"}
-    )
 
-    # Extract frames
-    gif_frames = []
-    start_frame = 1 if skip_first_frame else 0
-    
-    for i in range(start_frame, min(gif.n_frames, 59 + start_frame)):
-        gif.seek(i)
-        
-        # Resize if needed
-        if gif.size not in ((16, 16), (32, 32), (64, 64)):
-            frame = gif.resize((pixoo.size, pixoo.size)).convert("RGB")
-        else:
-            frame = gif.convert("RGB")
-        
-        gif_frames.append(frame)
-
-    # Send each frame
-    for offset, frame in enumerate(gif_frames):
-        await client.post(
-            f"http://{pixoo.ip_address}/post",
-            json={
-                "Command": "Draw/SendHttpGif",
-                "PicID": 1,
-                "PicNum": len(gif_frames),
-                "PicOffset": offset,
-                "PicWidth": frame.width,
-                "PicSpeed": speed,
-                "PicData": base64.b64encode(frame.tobytes()).decode("utf-8")
-            }
-        )
+async def _read_upload(upload: UploadFile) -> bytes:
+    """Read an uploaded file in chunks, up to the configured size limit."""
+    async def chunks():
+        while chunk := await upload.read(_UPLOAD_CHUNK_BYTES):
+            yield chunk
+
+    return await read_limited(chunks(), settings.pixoo_rest_max_content_bytes, upload.size)
+
+
+def _upload_response(result: GifUploadResult) -> GifUploadResponse:
+    """Build the response reporting a finished upload."""
+    return GifUploadResponse(
+        message="OK" if result.frames else "Unchanged, nothing sent to the device",
+        frames=result.frames,
+        upload_ms=round(result.seconds * 1000, 1),
+    )
 
 
 @router.post("/image")
 async def upload_image(
     image: UploadFile = File(None),
     image_url: str = Form(None),
-    speed: int = Form(100),
+    speed: int | None = Form(None),
     skip_first_frame: bool = Form(False),
-    pixoo: Pixoo = Depends(get_pixoo)
-) -> SuccessResponse:
+    resample: ResampleFilter | None = Form(None),
+    colors: int | None = Form(None, ge=0, le=256),
+    dither: bool | None = Form(None),
+    device: Device = Depends(get_device),
+    cache: FrameCache = Depends(get_frame_cache),
+    clients: HttpClients = Depends(get_http_clients),
+    workers: ImageWorkers = Depends(get_image_workers),
+) -> GifUploadResponse:
     """Upload an image or provide URL to display.
     
     Supports both static images and animated GIFs.
     Provide either 'image' file or 'image_url' parameter.
+    A GIF the device still plays is not sent again.
     
     Args:
         image: Image file upload
         image_url: URL of image to download
-        speed: Animation speed for GIFs (default: 100)
+        speed: Milliseconds per GIF frame (default: the GIF's own timing)
         skip_first_frame: Skip first frame of GIF (default: False)
+        resample: Filter for scaling down: nearest, box, bilinear or lanczos (default: server setting)
+        colors: Reduce to a palette of this many colors, 0 keeps all (default: server setting)
+        dither: Dither when reducing colors (default: server setting)
     """
     try:
-        # Use a shared HTTP client for all requests in this endpoint
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-            # Check if image file was uploaded
-            if image:
-                content = await image.read()
-                img = Image.open(BytesIO(content))
-            # Check if URL was provided
-            elif image_url and image_url.startswith('http'):
-                response = await client.get(image_url)
+        # Check if image file was uploaded
+        if image:
+            content = await _read_upload(image)
+        # Check if URL was provided
+        elif image_url and image_url.startswith('http'):
+            async with clients.downloads().stream("GET", image_url) as response:
                 response.raise_for_status()
-                img = Image.open(BytesIO(response.content))
-            else:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Must provide either 'image' file or 'image_url' parameter"
-                )
-
-            # Handle GIF or static image
-            if img.format == 'GIF':
-                await _send_gif_to_device(pixoo, img, speed, skip_first_frame, client)
-            else:
-                pixoo.draw_image(img)
-                pixoo.push()
-
-        return SuccessResponse()
+                content = await read_response(response, settings.pixoo_rest_max_content_bytes)
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail="Must provide either 'image' file or 'image_url' parameter"
+            )
+
+        # Handle GIF or static image
+        options = image_options(resample, colors, dither)
+        if is_gif(content):
+            result = await send_gif_to_device(
+                device,
+                content,
+                speed,
+                skip_first_frame,
+                clients.device,
+                cache,
+                workers,
+                skip_if_displayed=True,
+                options=options,
+            )
+        else:
+            result = await send_image_to_device(device, content, cache, workers, options=options)
+
+        return _upload_response(result)
+    except HTTPException:
+        raise
+    except (ContentTooLargeError, ImageTooLargeError) as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
     except httpx.HTTPError as e:
         raise HTTPException(
             status_code=400,
@@ -137,26 +130,47 @@ async def upload_image(
 @router.post("/sendGif")
 async def upload_gif(
     gif: UploadFile = File(...),
-    speed: int = Form(100),
+    speed: int | None = Form(None),
     skip_first_frame: bool = Form(False),
-    pixoo: Pixoo = Depends(get_pixoo)
-) -> SuccessResponse:
+    resample: ResampleFilter | None = Form(None),
+    colors: int | None = Form(None, ge=0, le=256),
+    dither: bool | None = Form(None),
+    device: Device = Depends(get_device),
+    cache: FrameCache = Depends(get_frame_cache),
+    clients: HttpClients = Depends(get_http_clients),
+    workers: ImageWorkers = Depends(get_image_workers),
+) -> GifUploadResponse:
     """Upload and display a GIF.
+
+    If the device still plays the same GIF, nothing is sent.
     
     Args:
         gif: GIF file to upload
-        speed: Animation speed (default: 100)
+        speed: Milliseconds per frame (default: the GIF's own timing)
         skip_first_frame: Skip first frame (default: False)
+        resample: Filter for scaling down: nearest, box, bilinear or lanczos (default: server setting)
+        colors: Reduce to a palette of this many colors, 0 keeps all (default: server setting)
+        dither: Dither when reducing colors (default: server setting)
     """
     try:
-        content = await gif.read()
-        img = Image.open(BytesIO(content))
-        
-        # Use HTTP client for sending GIF frames
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            await _send_gif_to_device(pixoo, img, speed, skip_first_frame, client)
+        content = await _read_upload(gif)
+        result = await send_gif_to_device(
+            device,
+            content,
+            speed,
+            skip_first_frame,
+            clients.device,
+            cache,
+            workers,
+            skip_if_displayed=True,
+            options=image_options(resample, colors, dither),
+        )
         
-        return SuccessResponse()
+        return _upload_response(result)
+    except HTTPException:
+        raise
+    except (ContentTooLargeError, ImageTooLargeError) as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -167,26 +181,41 @@ async def upload_gif(
 @router.post("/download/gif")
 async def download_gif(
     request: DownloadGifRequest,
-    pixoo: Pixoo = Depends(get_pixoo)
-) -> SuccessResponse:
+    device: Device = Depends(get_device),
+    cache: FrameCache = Depends(get_frame_cache),
+    downloads: DownloadCache = Depends(get_download_cache),
+    clients: HttpClients = Depends(get_http_clients),
+    workers: ImageWorkers = Depends(get_image_workers),
+) -> GifUploadResponse:
     """Download and display a GIF from URL.
+
+    Earlier downloads are revalidated with a conditional request (ETag /
+    Last-Modified); if the device still shows the same GIF, nothing is sent.
     
     Args:
         request: GIF download request with URL and options
     """
     try:
-        async with httpx.AsyncClient(
-            timeout=request.timeout,
-            verify=request.ssl_verify,
-            follow_redirects=True
-        ) as client:
-            response = await client.get(request.url)
-            response.raise_for_status()
-            
-            img = Image.open(BytesIO(response.content))
-            await _send_gif_to_device(pixoo, img, request.speed, request.skip_first_frame, client)
+        content = await downloads.fetch(
+            clients.downloads(request.ssl_verify), request.url, request.max_age, request.timeout
+        )
+        result = await send_gif_to_device(
+            device,
+            content,
+            request.speed,
+            request.skip_first_frame,
+            clients.device,
+            cache,
+            workers,
+            skip_if_displayed=True,
+            options=image_options(request.resample, request.colors, request.dither),
+        )
         
-        return SuccessResponse()
+        return _upload_response(result)
+    except HTTPException:
+        raise
+    except (ContentTooLargeError, ImageTooLargeError) as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
     except httpx.HTTPError as e:
         raise HTTPException(
             status_code=400,
@@ -202,29 +231,41 @@ async def download_gif(
 @router.post("/download/image")
 async def download_image(
     request: DownloadImageRequest,
-    pixoo: Pixoo = Depends(get_pixoo)
-) -> SuccessResponse:
+    device: Device = Depends(get_device),
+    cache: FrameCache = Depends(get_frame_cache),
+    downloads: DownloadCache = Depends(get_download_cache),
+    clients: HttpClients = Depends(get_http_clients),
+    workers: ImageWorkers = Depends(get_image_workers),
+) -> GifUploadResponse:
     """Download and display an image from URL.
+
+    Earlier downloads are revalidated with a conditional request (ETag /
+    Last-Modified); if the device still shows the same image, nothing is sent.
     
     Args:
         request: Image download request with URL and position
     """
     try:
-        async with httpx.AsyncClient(
-            timeout=request.timeout,
-            verify=request.ssl_verify,
-            follow_redirects=True
-        ) as client:
-            response = await client.get(request.url)
-            response.raise_for_status()
-            
-            img = Image.open(BytesIO(response.content))
-            pixoo.draw_image_at_location(img, request.x, request.y)
-            
-            if request.push_immediately:
-                pixoo.push()
+        content = await downloads.fetch(
+            clients.downloads(request.ssl_verify), request.url, request.max_age, request.timeout
+        )
+        result = await send_image_to_device(
+            device,
+            content,
+            cache,
+            workers,
+            request.x,
+            request.y,
+            request.push_immediately,
+            skip_if_displayed=True,
+            options=image_options(request.resample, request.colors, request.dither),
+        )
         
-        return SuccessResponse()
+        return _upload_response(result)
+    except HTTPException:
+        raise
+    except (ContentTooLargeError, ImageTooLargeError) as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
     except httpx.HTTPError as e:
         raise HTTPException(
             status_code=400,
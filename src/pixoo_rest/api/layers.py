@@ -0,0 +1,189 @@
+"""Layer endpoints for the Pixoo REST API."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from pixoo_rest.api.draw import draw_operations, prepare_operations
+from pixoo_rest.core.devices import Device
+from pixoo_rest.core.http import ContentTooLargeError, read_body
+from pixoo_rest.core.imaging import PreparedImage
+from pixoo_rest.core.layers import Layer
+from pixoo_rest.core.workers import ImageWorkers
+from pixoo_rest.dependencies import get_device, get_image_workers
+from pixoo_rest.models.requests import DrawBatchRequest, LayerInfo, LayerRequest, SuccessResponse
+
+router = APIRouter(prefix="/layers", tags=["layers"])
+
+# Width and height of the largest possible layer (see `LayerRequest`)
+_MAX_LAYER_SIZE = 64
+_MAX_LAYER_BYTES = _MAX_LAYER_SIZE * _MAX_LAYER_SIZE * 3
+
+
+def _layer_info(layer: Layer) -> LayerInfo:
+    return LayerInfo(
+        name=layer.name,
+        x=layer.x,
+        y=layer.y,
+        width=layer.canvas.width,
+        height=layer.canvas.height,
+        z=layer.z,
+        opacity=layer.opacity,
+        visible=layer.visible,
+    )
+
+
+def _get_layer(device: Device, name: str) -> Layer:
+    """Look up a layer (call on the device's worker thread)."""
+    try:
+        return device.compositor.get(name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown layer: {name}") from e
+
+
+def _draw_on_layer(device: Device, name: str, request: DrawBatchRequest, images: dict[int, PreparedImage]) -> None:
+    layer = _get_layer(device, name)
+    draw_operations(layer.canvas, request.operations, images)
+    device.compositor.invalidate(layer.bounds)
+
+
+def _write_layer_pixels(device: Device, name: str, data: bytes) -> None:
+    layer = _get_layer(device, name)
+    expected = layer.canvas.width * layer.canvas.height * 3
+    if len(data) != expected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected {expected} bytes of RGB data for layer {name}, got {len(data)}"
+        )
+    layer.canvas.load(data)
+    device.compositor.invalidate(layer.bounds)
+
+
+def _remove_layer(device: Device, name: str) -> None:
+    try:
+        device.compositor.remove(name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown layer: {name}") from e
+
+
+@router.get("", response_model=list[LayerInfo])
+async def list_layers(device: Device = Depends(get_device)) -> list[LayerInfo]:
+    """List the layers from bottom to top."""
+    return await device.run(lambda: [_layer_info(layer) for layer in device.compositor.layers])
+
+
+@router.put("/{layer_name}", response_model=LayerInfo)
+async def put_layer(
+    layer_name: str,
+    request: LayerRequest,
+    device: Device = Depends(get_device),
+) -> LayerInfo:
+    """Create a layer or change its position, size, stacking order and visibility.
+
+    Layers are separate regions of the screen, each with its own canvas, so
+    several clients can update their part of the screen without overwriting
+    each other. They are stacked by `z` over the device canvas (which the
+    `/draw/*` routes draw on). Changing an existing layer keeps its content
+    unless its size changes.
+    """
+    try:
+        layer = await device.run(
+            device.compositor.put,
+            layer_name,
+            request.x,
+            request.y,
+            request.width,
+            request.height,
+            request.z,
+            request.opacity,
+            request.visible,
+        )
+
+        if request.push_immediately:
+            await device.push()
+
+        return _layer_info(layer)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update layer: {str(e)}") from e
+
+
+@router.delete("/{layer_name}", response_model=SuccessResponse)
+async def delete_layer(
+    layer_name: str,
+    push_immediately: bool = Query(True, description="Push changes immediately"),
+    device: Device = Depends(get_device),
+):
+    """Remove a layer, uncovering what is beneath it."""
+    try:
+        await device.run(_remove_layer, device, layer_name)
+
+        if push_immediately:
+            await device.push()
+
+        return SuccessResponse()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to remove layer: {str(e)}") from e
+
+
+@router.post("/{layer_name}/draw", response_model=SuccessResponse)
+async def draw_on_layer(
+    layer_name: str,
+    request: DrawBatchRequest,
+    device: Device = Depends(get_device),
+    workers: ImageWorkers = Depends(get_image_workers),
+):
+    """Apply draw operations to a layer and push (at most) once.
+
+    Coordinates are relative to the layer's top-left corner. Only the layer's
+    part of the screen is recomposed.
+    """
+    try:
+        # Converted for the largest layer; smaller layers shrink them on the worker
+        images = await prepare_operations(request.operations, _MAX_LAYER_SIZE, workers)
+        await device.run(_draw_on_layer, device, layer_name, request, images)
+
+        if request.push_immediately:
+            await device.push()
+
+        return SuccessResponse(message=f"Drew {len(request.operations)} operations")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to draw on layer: {str(e)}") from e
+
+
+@router.put(
+    "/{layer_name}/pixels",
+    response_model=SuccessResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}},
+        }
+    },
+)
+async def put_layer_pixels(
+    layer_name: str,
+    request: Request,
+    push_immediately: bool = Query(True, description="Push changes immediately"),
+    device: Device = Depends(get_device),
+):
+    """Replace the content of a layer with raw RGB888 data (`width * height * 3` bytes, row by row)."""
+    try:
+        data = await read_body(request, _MAX_LAYER_BYTES)
+    except ContentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+
+    try:
+        await device.run(_write_layer_pixels, device, layer_name, data)
+
+        if push_immediately:
+            await device.push()
+
+        return SuccessResponse()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to write layer: {str(e)}") from e
@@ -0,0 +1,108 @@
+"""Playlist endpoints for the Pixoo REST API."""
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from pixoo_rest.core.devices import Device
+from pixoo_rest.core.playlists import Playlist, PlaylistManager
+from pixoo_rest.dependencies import get_device, get_playlist_manager
+from pixoo_rest.models.requests import PlaylistInfo, PlaylistRequest, SuccessResponse
+
+router = APIRouter(prefix="/playlists", tags=["playlists"])
+
+
+def _playlist_info(playlist: Playlist) -> PlaylistInfo:
+    return PlaylistInfo(
+        name=playlist.name,
+        items=len(playlist.request.items),
+        playing=playlist.playing,
+        position=playlist.position,
+        prepared=playlist.prepared,
+        rotations=playlist.rotations,
+        last_error=playlist.last_error,
+    )
+
+
+def _get_playlist(manager: PlaylistManager, device: Device, name: str) -> Playlist:
+    try:
+        return manager.get(device, name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown playlist: {name}") from e
+
+
+@router.get("", response_model=list[PlaylistInfo])
+async def list_playlists(
+    device: Device = Depends(get_device),
+    manager: PlaylistManager = Depends(get_playlist_manager),
+) -> list[PlaylistInfo]:
+    """List the playlists of the device."""
+    return [_playlist_info(playlist) for playlist in manager.of_device(device)]
+
+
+@router.put("/{playlist_name}", response_model=PlaylistInfo)
+async def put_playlist(
+    playlist_name: str,
+    request: PlaylistRequest,
+    device: Device = Depends(get_device),
+    manager: PlaylistManager = Depends(get_playlist_manager),
+) -> PlaylistInfo:
+    """Create or replace a playlist of images and GIFs shown in rotation.
+
+    Each item is shown for its `duration` in seconds, then the next one, and
+    the list repeats. The server downloads and converts all items ahead of
+    time and prepares the next item while the current one is shown, so
+    switching items only costs the upload. Starting a playlist stops any
+    other playlist of the device.
+    """
+    try:
+        playlist = await manager.put(device, playlist_name, request)
+        return _playlist_info(playlist)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create playlist: {str(e)}") from e
+
+
+@router.get("/{playlist_name}", response_model=PlaylistInfo)
+async def get_playlist(
+    playlist_name: str,
+    device: Device = Depends(get_device),
+    manager: PlaylistManager = Depends(get_playlist_manager),
+) -> PlaylistInfo:
+    """Get a playlist and its playback state."""
+    return _playlist_info(_get_playlist(manager, device, playlist_name))
+
+
+@router.post("/{playlist_name}/start", response_model=PlaylistInfo)
+async def start_playlist(
+    playlist_name: str,
+    device: Device = Depends(get_device),
+    manager: PlaylistManager = Depends(get_playlist_manager),
+) -> PlaylistInfo:
+    """Start playing a playlist where it stopped, stopping the device's other playlists."""
+    playlist = _get_playlist(manager, device, playlist_name)
+    await manager.start(playlist)
+    return _playlist_info(playlist)
+
+
+@router.post("/{playlist_name}/stop", response_model=PlaylistInfo)
+async def stop_playlist(
+    playlist_name: str,
+    device: Device = Depends(get_device),
+    manager: PlaylistManager = Depends(get_playlist_manager),
+) -> PlaylistInfo:
+    """Stop a playlist; the item shown stays on the screen."""
+    playlist = _get_playlist(manager, device, playlist_name)
+    await manager.stop(playlist)
+    return _playlist_info(playlist)
+
+
+@router.delete("/{playlist_name}", response_model=SuccessResponse)
+async def delete_playlist(
+    playlist_name: str,
+    device: Device = Depends(get_device),
+    manager: PlaylistManager = Depends(get_playlist_manager),
+):
+    """Stop and remove a playlist."""
+    _get_playlist(manager, device, playlist_name)
+    await manager.remove(device, playlist_name)
+    return SuccessResponse()
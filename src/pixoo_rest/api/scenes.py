@@ -0,0 +1,103 @@
+"""Scene endpoints for the Pixoo REST API."""
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from pixoo_rest.core.devices import Device
+from pixoo_rest.core.scenes import Scene, SceneManager
+from pixoo_rest.dependencies import get_device, get_scene_manager
+from pixoo_rest.models.requests import SceneInfo, SceneRequest, SuccessResponse
+
+router = APIRouter(prefix="/scenes", tags=["scenes"])
+
+
+def _scene_info(scene: Scene) -> SceneInfo:
+    return SceneInfo(
+        name=scene.name,
+        interval=scene.request.interval,
+        refreshes=scene.refreshes,
+        renders=scene.renders,
+        last_error=scene.last_error,
+    )
+
+
+def _get_scene(manager: SceneManager, device: Device, name: str) -> Scene:
+    try:
+        return manager.get(device, name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown scene: {name}") from e
+
+
+@router.get("", response_model=list[SceneInfo])
+async def list_scenes(
+    device: Device = Depends(get_device),
+    manager: SceneManager = Depends(get_scene_manager),
+) -> list[SceneInfo]:
+    """List the scenes of the device."""
+    return [_scene_info(scene) for scene in manager.of_device(device)]
+
+
+@router.put("/{scene_name}", response_model=SceneInfo)
+async def put_scene(
+    scene_name: str,
+    request: SceneRequest,
+    device: Device = Depends(get_device),
+    manager: SceneManager = Depends(get_scene_manager),
+) -> SceneInfo:
+    """Create or replace a scene that the server keeps up to date.
+
+    A scene is a layer (see `/layers`) with text, progress bars and images
+    bound to data sources. The server fetches the sources every `interval`
+    seconds, aligned to the clock, and redraws and pushes the scene only if
+    what it shows changed. Sources shared by several scenes are fetched once.
+
+    Text templates use Python format syntax: `{temperature:.1f} C` inserts the
+    source `temperature`, `{now:%H:%M}` the current time.
+    """
+    try:
+        scene = await manager.put(device, scene_name, request)
+        return _scene_info(scene)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create scene: {str(e)}") from e
+
+
+@router.get("/{scene_name}", response_model=SceneInfo)
+async def get_scene(
+    scene_name: str,
+    device: Device = Depends(get_device),
+    manager: SceneManager = Depends(get_scene_manager),
+) -> SceneInfo:
+    """Get a scene and its refresh statistics."""
+    return _scene_info(_get_scene(manager, device, scene_name))
+
+
+@router.post("/{scene_name}/refresh", response_model=SceneInfo)
+async def refresh_scene(
+    scene_name: str,
+    device: Device = Depends(get_device),
+    manager: SceneManager = Depends(get_scene_manager),
+) -> SceneInfo:
+    """Fetch the scene's data and redraw it now, without waiting for the next refresh."""
+    scene = _get_scene(manager, device, scene_name)
+    await manager.refresh(scene, force=True)
+    return _scene_info(scene)
+
+
+@router.delete("/{scene_name}", response_model=SuccessResponse)
+async def delete_scene(
+    scene_name: str,
+    device: Device = Depends(get_device),
+    manager: SceneManager = Depends(get_scene_manager),
+):
+    """Stop a scene and remove its layer."""
+    _get_scene(manager, device, scene_name)
+    try:
+        await manager.remove(device, scene_name)
+        return SuccessResponse()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to remove scene: {str(e)}") from e
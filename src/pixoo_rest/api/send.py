@@ -1,19 +1,23 @@
 """Send endpoints for the Pixoo REST API."""
 
 from fastapi import APIRouter, Depends, HTTPException
-from pixoo import Pixoo
 
-from pixoo_rest.dependencies import get_pixoo
+from pixoo_rest.core.devices import Device
+from pixoo_rest.dependencies import get_device
 from pixoo_rest.models.requests import SendTextRequest, SuccessResponse
 
 router = APIRouter(prefix="/send", tags=["send"])
 
 
 @router.post("/text", response_model=SuccessResponse)
-async def send_text(request: SendTextRequest, pixoo: Pixoo = Depends(get_pixoo)):
+async def send_text(
+    request: SendTextRequest,
+    device: Device = Depends(get_device),
+):
     """Send scrolling text to the Pixoo display."""
     try:
-        pixoo.send_text(
+        await device.show(
+            device.pixoo.send_text,
             request.text,
             (request.x, request.y),
             (request.r, request.g, request.b),
@@ -25,5 +29,7 @@ async def send_text(request: SendTextRequest, pixoo: Pixoo = Depends(get_pixoo))
         )
 
         return SuccessResponse()
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to send text: {str(e)}") from e
@@ -1,18 +1,24 @@
 """Settings endpoints for the Pixoo REST API."""
 
 from fastapi import APIRouter, Depends, HTTPException
-from pixoo import Channel, Pixoo
+from pixoo import Channel
 
-from pixoo_rest.dependencies import get_pixoo
+from pixoo_rest.core.devices import Device
+from pixoo_rest.dependencies import get_device
 from pixoo_rest.models.requests import SuccessResponse
 
 router = APIRouter(prefix="/set", tags=["settings"])
 
 
+def _response(sent: int) -> SuccessResponse:
+    """Report whether a setting was sent or already had the value."""
+    return SuccessResponse(message="OK" if sent else "Unchanged, nothing sent to the device")
+
+
 @router.put("/brightness/{percentage}")
 async def set_brightness(
     percentage: int,
-    pixoo: Pixoo = Depends(get_pixoo)
+    device: Device = Depends(get_device),
 ) -> SuccessResponse:
     """Set the screen brightness.
     
@@ -20,8 +26,11 @@ async def set_brightness(
         percentage: Brightness level (0-100)
     """
     try:
-        pixoo.set_brightness(percentage)
-        return SuccessResponse()
+        # Clamped like the pixoo library did
+        sent = await device.apply_settings(brightness=min(max(percentage, 0), 100))
+        return _response(sent)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to set brightness: {str(e)}") from e
 
@@ -29,7 +38,7 @@ async def set_brightness(
 @router.put("/channel/{number}")
 async def set_channel(
     number: int,
-    pixoo: Pixoo = Depends(get_pixoo)
+    device: Device = Depends(get_device),
 ) -> SuccessResponse:
     """Set the channel.
     
@@ -37,8 +46,10 @@ async def set_channel(
         number: Channel number
     """
     try:
-        pixoo.set_channel(Channel(number))
-        return SuccessResponse()
+        sent = await device.apply_settings(channel=int(Channel(number)))
+        return _response(sent)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to set channel: {str(e)}") from e
 
@@ -46,7 +57,7 @@ async def set_channel(
 @router.put("/face/{number}")
 async def set_face(
     number: int,
-    pixoo: Pixoo = Depends(get_pixoo)
+    device: Device = Depends(get_device),
 ) -> SuccessResponse:
     """Set the face/clock display.
     
@@ -54,8 +65,10 @@ async def set_face(
         number: Face number
     """
     try:
-        pixoo.set_face(number)
-        return SuccessResponse()
+        sent = await device.apply_settings(clock=number)
+        return _response(sent)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to set face: {str(e)}") from e
 
@@ -63,7 +76,7 @@ async def set_face(
 @router.put("/visualizer/{number}")
 async def set_visualizer(
     number: int,
-    pixoo: Pixoo = Depends(get_pixoo)
+    device: Device = Depends(get_device),
 ) -> SuccessResponse:
     """Set the visualizer mode.
     
@@ -71,8 +84,10 @@ async def set_visualizer(
         number: Visualizer number
     """
     try:
-        pixoo.set_visualizer(number)
-        return SuccessResponse()
+        sent = await device.apply_settings(visualizer=number)
+        return _response(sent)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to set visualizer: {str(e)}") from e
 
@@ -80,7 +95,7 @@ async def set_visualizer(
 @router.put("/clock/{number}")
 async def set_clock(
     number: int,
-    pixoo: Pixoo = Depends(get_pixoo)
+    device: Device = Depends(get_device),
 ) -> SuccessResponse:
     """Set the clock display.
     
@@ -88,8 +103,10 @@ async def set_clock(
         number: Clock number
     """
     try:
-        pixoo.set_clock(number)
-        return SuccessResponse()
+        sent = await device.apply_settings(clock=number)
+        return _response(sent)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to set clock: {str(e)}") from e
 
@@ -97,7 +114,7 @@ async def set_clock(
 @router.put("/screen/{on_off}")
 async def set_screen(
     on_off: bool,
-    pixoo: Pixoo = Depends(get_pixoo)
+    device: Device = Depends(get_device),
 ) -> SuccessResponse:
     """Turn the screen on or off.
     
@@ -105,7 +122,9 @@ async def set_screen(
         on_off: True to turn on, False to turn off
     """
     try:
-        pixoo.set_screen(on_off)
-        return SuccessResponse()
+        sent = await device.apply_settings(screen_on=on_off)
+        return _response(sent)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to set screen: {str(e)}") from e
@@ -0,0 +1,62 @@
+"""Device state endpoints for the Pixoo REST API."""
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from pixoo_rest.core.devices import Device
+from pixoo_rest.dependencies import get_device
+from pixoo_rest.models.requests import DeviceStateRequest, DeviceStateResponse
+
+router = APIRouter(prefix="/state", tags=["settings"])
+
+
+def _state_response(device: Device, sent: int | None = None) -> DeviceStateResponse:
+    state = device.state
+    return DeviceStateResponse(
+        **state.snapshot(),
+        synced_at=state.synced_at,
+        writes_sent=state.writes_sent,
+        writes_skipped=state.writes_skipped,
+        sent=sent,
+    )
+
+
+@router.get("", response_model=DeviceStateResponse)
+async def get_state(
+    refresh: bool = False,
+    device: Device = Depends(get_device),
+) -> DeviceStateResponse:
+    """Get the device settings (brightness, channel, clock, visualizer, screen).
+
+    The settings are answered from the server's mirror, which is updated by
+    every change sent through the API and read from the device periodically
+    (`PIXOO_STATE_SYNC_INTERVAL`). Pass `refresh=true` to read them from the
+    device first.
+    """
+    if refresh:
+        device.check_reachable()
+        try:
+            await device.sync_state()
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to read settings: {str(e)}") from e
+    return _state_response(device)
+
+
+@router.patch("", response_model=DeviceStateResponse)
+async def patch_state(
+    request: DeviceStateRequest,
+    device: Device = Depends(get_device),
+) -> DeviceStateResponse:
+    """Change several settings at once.
+
+    Only settings that differ from the mirrored ones are sent, all in one
+    request to the device. Settings left out (or null) stay as they are.
+    """
+    try:
+        sent = await device.apply_settings(**request.model_dump())
+        return _state_response(device, sent)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to change settings: {str(e)}") from e
@@ -0,0 +1,153 @@
+"""Streaming endpoints for the Pixoo REST API."""
+
+import asyncio
+from dataclasses import dataclass, field
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, status
+
+from pixoo_rest.core.config import settings
+from pixoo_rest.core.devices import Device
+from pixoo_rest.dependencies import get_device
+
+router = APIRouter(tags=["stream"])
+
+# Delta messages start with x, y, width and height (one byte each)
+DELTA_HEADER_SIZE = 4
+
+
+@dataclass
+class _FrameStream:
+    """Frame assembled from the messages of one WebSocket client."""
+
+    frame: bytearray
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    received: int = 0
+    pushed: int = 0
+    dropped: int = 0
+
+
+def _apply_message(frame: bytearray, data: bytes, size: int) -> None:
+    """Apply a full frame or a delta message to the frame.
+
+    Raises:
+        ValueError: If the message is neither a full frame nor a valid delta
+    """
+    if len(data) == size * size * 3:
+        frame[:] = data
+        return
+
+    if len(data) < DELTA_HEADER_SIZE:
+        raise ValueError(f"Message too short: {len(data)} bytes")
+
+    x, y, width, height = data[:DELTA_HEADER_SIZE]
+    if width == 0 or height == 0 or x + width > size or y + height > size:
+        raise ValueError(f"Region {width}x{height} at ({x}, {y}) does not fit on a {size}x{size} screen")
+    if len(data) != DELTA_HEADER_SIZE + width * height * 3:
+        raise ValueError(f"Expected {width * height * 3} bytes of RGB data for a {width}x{height} region")
+
+    row_bytes = width * 3
+    for row in range(height):
+        source = DELTA_HEADER_SIZE + row * row_bytes
+        target = ((y + row) * size + x) * 3
+        frame[target:target + row_bytes] = data[source:source + row_bytes]
+
+
+async def _push_frames(websocket: WebSocket, device: Device, stream: _FrameStream, max_fps: float) -> None:
+    """Push the newest assembled frame whenever the device is ready for one."""
+    loop = asyncio.get_running_loop()
+    min_interval = 1 / max_fps
+    last_pushed = 0
+
+    while True:
+        await stream.ready.wait()
+        stream.ready.clear()
+
+        started = loop.time()
+        sequence = stream.received
+        stream.dropped += sequence - last_pushed - 1
+        last_pushed = sequence
+
+        try:
+            await device.run(device.canvas.blit, bytes(stream.frame), device.size, device.size)
+            await device.push()
+        except HTTPException as e:
+            await websocket.send_json({"type": "error", "frame": sequence, "detail": e.detail})
+        except Exception as e:
+            await websocket.send_json({"type": "error", "frame": sequence, "detail": f"Failed to push frame: {e}"})
+        else:
+            stream.pushed += 1
+            await websocket.send_json({
+                "type": "ack",
+                "frame": sequence,
+                "received": stream.received,
+                "pushed": stream.pushed,
+                "dropped": stream.dropped,
+            })
+
+        delay = min_interval - (loop.time() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@router.websocket("/ws/frames")
+async def stream_frames(
+    websocket: WebSocket,
+    device: Device = Depends(get_device),
+    max_fps: float = Query(settings.pixoo_stream_max_fps, gt=0, le=60),
+) -> None:
+    """Stream frames to the display.
+
+    Every binary message is either a full frame (`size * size * 3` bytes of
+    RGB888 data, row by row) or a delta: four bytes `x, y, width, height`
+    followed by `width * height * 3` bytes of RGB888 data for that region.
+
+    Messages are applied in order to a frame that starts as the current
+    canvas. The newest frame is pushed as soon as the device has taken the
+    previous one (at most `max_fps` times per second); frames that arrive in
+    between are merged into it and counted as dropped. Each push is answered
+    with a JSON ack `{"type": "ack", "frame": n, ...}`, where `n` counts the
+    messages it includes, so clients can limit the frames they have in flight.
+
+    If the device is not reachable, the connection is closed right away with
+    code 1013 (try again later); other failures to read the canvas close it
+    with 1011. Failed pushes are answered with `{"type": "error", ...}` and
+    the stream goes on.
+    """
+    await websocket.accept()
+    try:
+        canvas = await device.run(device.canvas.tobytes)
+    except HTTPException as e:
+        code = status.WS_1013_TRY_AGAIN_LATER if e.status_code == 503 else status.WS_1011_INTERNAL_ERROR
+        await websocket.close(code=code, reason=str(e.detail)[:123])
+        return
+    except Exception as e:
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR, reason=f"Failed to read the canvas: {e}"[:123])
+        return
+    stream = _FrameStream(frame=bytearray(canvas))
+    pusher = asyncio.create_task(_push_frames(websocket, device, stream, max_fps))
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            data = message.get("bytes")
+            if data is None:
+                await websocket.send_json({"type": "error", "detail": "Frames must be sent as binary messages"})
+                continue
+
+            try:
+                _apply_message(stream.frame, data, device.size)
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+
+            stream.received += 1
+            stream.ready.set()
+    finally:
+        pusher.cancel()
+        try:
+            await pusher
+        except (asyncio.CancelledError, Exception):
+            pass
@@ -1,43 +1,148 @@
 """FastAPI application for Pixoo REST API."""
 
-import sys
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from pixoo import Pixoo
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from pixoo_rest import __version__, utils
-from pixoo_rest.api import divoom, download, draw, image, send, set as set_router
+from pixoo_rest import __version__
+from pixoo_rest.api import (
+    devices,
+    divoom,
+    download,
+    draw,
+    framebuffer,
+    image,
+    layers,
+    playlists,
+    scenes,
+    send,
+    set as set_router,
+    state,
+    stream,
+)
 from pixoo_rest.core.config import settings
-from pixoo_rest.dependencies import set_pixoo_instance
-from pixoo_rest.models.requests import HealthCheckResponse, RootResponse
+from pixoo_rest.core.cache import FrameCache
+from pixoo_rest.core.devices import DeviceRegistry
+from pixoo_rest.core.discovery import LanDiscovery
+from pixoo_rest.core.divoom import DivoomCatalog
+from pixoo_rest.core.downloads import DownloadCache
+from pixoo_rest.core.http import HttpClients
+from pixoo_rest.core.metrics import family, metrics
+from pixoo_rest.core.playlists import PlaylistManager
+from pixoo_rest.core.scenes import SceneManager
+from pixoo_rest.core.workers import ImageWorkers
+from pixoo_rest.dependencies import (
+    get_device_name,
+    get_device_registry,
+    get_divoom_catalog,
+    get_download_cache,
+    get_frame_cache,
+    get_image_workers,
+    set_device_registry,
+    set_divoom_catalog,
+    set_download_cache,
+    set_frame_cache,
+    set_http_clients,
+    set_image_workers,
+    set_lan_discovery,
+    set_playlist_manager,
+    set_scene_manager,
+)
+from pixoo_rest.models.requests import (
+    CacheStats,
+    DeviceHealth,
+    DeviceStats,
+    DivoomCatalogStats,
+    DownloadCacheStats,
+    GifSlotStats,
+    HealthCheckResponse,
+    ImageWorkerStats,
+    QueueStats,
+    RootResponse,
+    StatsResponse,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager - handles startup and shutdown."""
-    # Startup: Initialize Pixoo device
-    print(f"Connecting to Pixoo device at {settings.pixoo_host}...")
-    
-    # Test connection to Pixoo device
-    for connection_test_count in range(settings.pixoo_test_connection_retries + 1):
-        if utils.try_to_request(f'http://{settings.pixoo_host}/get'):
-            break
-        else:
-            if connection_test_count == settings.pixoo_test_connection_retries:
-                sys.exit("ERROR: Failed to connect to Pixoo device.")
-            print(f"Connection attempt {connection_test_count + 1} failed, retrying...")
-    
-    pixoo = Pixoo(settings.pixoo_host, settings.pixoo_screen_size, settings.pixoo_debug)
-    print(f"Successfully connected to Pixoo device at {settings.pixoo_host}")
-    
-    # Set the global pixoo instance
-    set_pixoo_instance(pixoo)
+    # Startup: Connect to the configured Pixoo devices in the background; the
+    # server comes up right away and a device's routes answer 503 until it is reached
+    http_clients = HttpClients(
+        settings.pixoo_rest_http_max_connections,
+        settings.pixoo_rest_http_max_keepalive_connections,
+        settings.pixoo_rest_http_keepalive_expiry,
+    )
+    set_http_clients(http_clients)
+    lan_discovery = LanDiscovery(
+        http_clients.device,
+        settings.pixoo_discovery_targets,
+        settings.pixoo_discovery_timeout,
+        settings.pixoo_discovery_ttl,
+        settings.pixoo_discovery_concurrency,
+    )
+    set_lan_discovery(lan_discovery)
+    registry = DeviceRegistry.from_settings(settings)
+    registry.start(http_clients.device, settings, lan_discovery)
+
+    # Set the global device registry and the caches
+    set_device_registry(registry)
+    frame_cache = FrameCache(
+        settings.pixoo_rest_cache_max_bytes,
+        settings.pixoo_rest_cache_dir,
+        settings.pixoo_rest_cache_max_disk_bytes,
+    )
+    set_frame_cache(frame_cache)
+    download_cache = DownloadCache(
+        settings.pixoo_rest_download_max_age,
+        settings.pixoo_rest_download_cache_max_bytes,
+        settings.pixoo_rest_max_content_bytes,
+    )
+    set_download_cache(download_cache)
+    divoom_catalog = DivoomCatalog(
+        http_clients.divoom,
+        settings.pixoo_rest_divoom_api_url,
+        settings.pixoo_rest_divoom_cache_max_age,
+        settings.pixoo_rest_divoom_cache_max_stale,
+        settings.pixoo_rest_divoom_cache_max_entries,
+    )
+    for dial_type in settings.pixoo_rest_divoom_prefetch:
+        divoom_catalog.start_prefetch(dial_type)
+    set_divoom_catalog(divoom_catalog)
+    image_workers = ImageWorkers(
+        settings.pixoo_rest_image_workers_mode,
+        settings.pixoo_rest_image_workers,
+        settings.pixoo_rest_image_queue_size,
+        settings.pixoo_rest_image_timeout,
+    )
+    set_image_workers(image_workers)
+    scene_manager = SceneManager(download_cache, http_clients, image_workers)
+    set_scene_manager(scene_manager)
+    playlist_manager = PlaylistManager(download_cache, frame_cache, http_clients, image_workers)
+    set_playlist_manager(playlist_manager)
     
     yield
     
-    # Shutdown: Cleanup if needed
+    # Shutdown: Stop the scenes, the playlists and the device command queues
     print("Shutting down...")
+    set_scene_manager(None)
+    await scene_manager.close()
+    set_playlist_manager(None)
+    await playlist_manager.close()
+    set_device_registry(None)
+    set_lan_discovery(None)
+    set_frame_cache(None)
+    set_download_cache(None)
+    set_divoom_catalog(None)
+    set_http_clients(None)
+    set_image_workers(None)
+    await registry.close()
+    await lan_discovery.close()
+    await divoom_catalog.close()
+    await http_clients.close()
+    image_workers.close()
 
 
 # Create FastAPI app
@@ -48,19 +153,226 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# Include routers
-app.include_router(draw.router)
-app.include_router(send.router)
-app.include_router(set_router.router)
-app.include_router(image.router)
-app.include_router(download.router)
+# Include routers; device routers serve the default device and, below
+# /devices/{device_name}, every configured device
+for device_router in (
+    draw.router,
+    framebuffer.router,
+    layers.router,
+    scenes.router,
+    playlists.router,
+    send.router,
+    set_router.router,
+    state.router,
+    image.router,
+    download.router,
+    stream.router,
+):
+    app.include_router(device_router)
+    app.include_router(device_router, prefix="/devices/{device_name}", dependencies=[Depends(get_device_name)])
+app.include_router(devices.router)
 app.include_router(divoom.router)
 
 
+# Room for the form fields and part headers of a multipart upload besides the file
+_MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+@app.middleware("http")
+async def limit_uploads(request: Request, call_next):
+    """Reject multipart uploads whose announced size exceeds the content limit.
+
+    Form data is spooled before the route runs, so the limit is checked on the
+    `Content-Length` up front; uploads without one are only checked while the
+    file is read from the spool.
+    """
+    if request.headers.get("Content-Type", "").startswith("multipart/form-data"):
+        length = request.headers.get("Content-Length", "")
+        limit = settings.pixoo_rest_max_content_bytes + _MULTIPART_OVERHEAD_BYTES
+        if length.isdigit() and int(length) > limit:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"Upload of {length} bytes exceeds the limit of {limit} bytes"},
+            )
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    """Record the latency of every API request under its route template."""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        # Routes of included routers report their path without the per-device prefix
+        if "device_name" in request.path_params and not route.startswith("/devices/"):
+            route = "/devices/{device_name}" + route
+        metrics.requests.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=route,
+            status=status,
+        )
+
+
 @app.get("/health", response_model=HealthCheckResponse)
-async def health_check() -> HealthCheckResponse:
-    """Health check endpoint."""
-    return HealthCheckResponse(status="healthy", pixoo_host=settings.pixoo_host)
+async def health_check(registry: DeviceRegistry = Depends(get_device_registry)) -> HealthCheckResponse:
+    """Health check endpoint.
+
+    Reports whether each device answered its last probes and how fast. The
+    status is `healthy` if all devices are reachable, `degraded` if some are
+    and `unhealthy` if none is.
+    """
+    devices = {
+        device.name: DeviceHealth(
+            host=device.host,
+            reachable=device.reachable,
+            latency_ms=None if device.latency is None else round(device.latency * 1000, 1),
+            last_seen=device.last_seen,
+            last_error=device.last_error,
+        )
+        for device in registry
+    }
+    reachable = sum(health.reachable for health in devices.values())
+    if reachable == len(devices):
+        status = "healthy"
+    elif reachable:
+        status = "degraded"
+    else:
+        status = "unhealthy"
+    return HealthCheckResponse(status=status, pixoo_host=registry.default.host, devices=devices)
+
+
+@app.get("/stats", response_model=StatsResponse)
+async def stats(
+    registry: DeviceRegistry = Depends(get_device_registry),
+    cache: FrameCache = Depends(get_frame_cache),
+    downloads: DownloadCache = Depends(get_download_cache),
+    catalog: DivoomCatalog = Depends(get_divoom_catalog),
+    workers: ImageWorkers = Depends(get_image_workers),
+) -> StatsResponse:
+    """Runtime statistics of the device command queues, caches and image workers."""
+    return StatsResponse(
+        devices={
+            device.name: DeviceStats(
+                queue=QueueStats(
+                    depth=device.executor.queue_depth,
+                    commands_run=device.executor.commands_run,
+                    pushes_requested=device.executor.pushes_requested,
+                    pushes_sent=device.executor.pushes_sent - device.pushes_skipped,
+                    pushes_dropped=device.executor.pushes_dropped,
+                    pushes_skipped=device.pushes_skipped,
+                ),
+                gif_slots=GifSlotStats(
+                    resets=device.gif_slots.resets,
+                    mismatches=device.gif_slots.mismatches,
+                ),
+            )
+            for device in registry
+        },
+        frame_cache=CacheStats(
+            hits=cache.hits,
+            misses=cache.misses,
+            entries=cache.entries,
+            bytes=cache.nbytes,
+            disk_entries=cache.disk_entries,
+            disk_bytes=cache.disk_bytes,
+        ),
+        download_cache=DownloadCacheStats(
+            fresh=downloads.fresh,
+            revalidated=downloads.revalidated,
+            downloaded=downloads.downloaded,
+            coalesced=downloads.coalesced,
+            entries=downloads.entries,
+            bytes=downloads.nbytes,
+        ),
+        divoom_catalog=DivoomCatalogStats(
+            hits=catalog.hits,
+            stale=catalog.stale,
+            misses=catalog.misses,
+            errors=catalog.errors,
+            entries=catalog.entries,
+        ),
+        image_workers=ImageWorkerStats(
+            mode=workers.mode,
+            workers=workers.workers,
+            pending=workers.pending,
+            jobs_run=workers.jobs_run,
+            jobs_rejected=workers.jobs_rejected,
+            jobs_timed_out=workers.jobs_timed_out,
+        ),
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics(
+    registry: DeviceRegistry = Depends(get_device_registry),
+    cache: FrameCache = Depends(get_frame_cache),
+    downloads: DownloadCache = Depends(get_download_cache),
+    catalog: DivoomCatalog = Depends(get_divoom_catalog),
+    workers: ImageWorkers = Depends(get_image_workers),
+) -> PlainTextResponse:
+    """Metrics in the Prometheus text format: latencies of routes, device commands,
+    outgoing requests and image conversions, plus the values reported by `/stats`."""
+    devices = list(registry)
+    extra = [
+        family("pixoo_rest_device_up", "Whether the device answered its last probes", "gauge", (
+            ({"device": device.name}, int(device.reachable)) for device in devices
+        )),
+        family("pixoo_rest_device_probe_latency_seconds", "Response time of the last successful probe", "gauge", (
+            ({"device": device.name}, device.latency) for device in devices if device.latency is not None
+        )),
+        family("pixoo_rest_device_queue_depth", "Commands waiting in a device's queue", "gauge", (
+            ({"device": device.name}, device.executor.queue_depth) for device in devices
+        )),
+        family("pixoo_rest_device_pushes_total", "Pushes by outcome", "counter", (
+            sample
+            for device in devices
+            for sample in (
+                ({"device": device.name, "outcome": "sent"}, device.executor.pushes_sent - device.pushes_skipped),
+                ({"device": device.name, "outcome": "dropped"}, device.executor.pushes_dropped),
+                ({"device": device.name, "outcome": "skipped"}, device.pushes_skipped),
+            )
+        )),
+        family("pixoo_rest_device_gif_id_resets_total", "Resets of a device's animation IDs", "counter", (
+            ({"device": device.name}, device.gif_slots.resets) for device in devices
+        )),
+        family("pixoo_rest_frame_cache_lookups_total", "Frame cache lookups by result", "counter", [
+            ({"result": "hit"}, cache.hits),
+            ({"result": "miss"}, cache.misses),
+        ]),
+        family("pixoo_rest_frame_cache_bytes", "Bytes held by the frame cache", "gauge", [
+            ({"tier": "memory"}, cache.nbytes),
+            ({"tier": "disk"}, cache.disk_bytes),
+        ]),
+        family("pixoo_rest_downloads_total", "Download requests by how they were answered", "counter", [
+            ({"result": "fresh"}, downloads.fresh),
+            ({"result": "revalidated"}, downloads.revalidated),
+            ({"result": "downloaded"}, downloads.downloaded),
+            ({"result": "coalesced"}, downloads.coalesced),
+        ]),
+        family("pixoo_rest_divoom_catalog_lookups_total", "Divoom dial catalog requests by result", "counter", [
+            ({"result": "hit"}, catalog.hits),
+            ({"result": "stale"}, catalog.stale),
+            ({"result": "miss"}, catalog.misses),
+        ]),
+        family("pixoo_rest_divoom_catalog_errors_total", "Failed requests to the Divoom cloud", "counter", [
+            ({}, catalog.errors),
+        ]),
+        family("pixoo_rest_image_jobs_pending", "Image conversions running or waiting", "gauge", [
+            ({}, workers.pending),
+        ]),
+        family("pixoo_rest_image_jobs_total", "Image conversions by outcome", "counter", [
+            ({"outcome": "run"}, workers.jobs_run),
+            ({"outcome": "rejected"}, workers.jobs_rejected),
+            ({"outcome": "timed_out"}, workers.jobs_timed_out),
+        ]),
+    ]
+    return PlainTextResponse(metrics.render(extra), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/", response_model=RootResponse)
@@ -81,7 +393,7 @@ def main():
     import uvicorn
     
     print(f"Starting server on {settings.pixoo_rest_host}:{settings.pixoo_rest_port}")
-    print(f"Pixoo device: {settings.pixoo_host}")
+    print(f"Pixoo device(s): {', '.join((settings.pixoo_devices or {'default': settings.pixoo_host}).values())}")
     
     uvicorn.run(
         app,
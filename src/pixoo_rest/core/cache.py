@@ -0,0 +1,228 @@
+"""Content-addressed cache of device-ready image payloads."""
+
+import asyncio
+import hashlib
+import json
+import os
+import struct
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from pixoo_rest.core.imaging import GifFrames, PreparedImage
+
+CachedPayload = PreparedImage | GifFrames
+
+# Disk entries: magic, header length, JSON header, then the payload data
+_MAGIC = b"PXFC1"
+_HEADER_LENGTH = struct.Struct(">I")
+_SUFFIX = ".frames"
+
+
+def _encode(payload: CachedPayload) -> bytes:
+    """Serialize a payload for the disk cache."""
+    if isinstance(payload, PreparedImage):
+        header = {"type": "image", "width": payload.width, "height": payload.height}
+        data = payload.data
+    else:
+        frames = [frame.encode("ascii") for frame in payload.frames]
+        header = {
+            "type": "gif",
+            "width": payload.width,
+            "speed": payload.speed,
+            "frames": [len(frame) for frame in frames],
+        }
+        data = b"".join(frames)
+    encoded = json.dumps(header).encode()
+    return _MAGIC + _HEADER_LENGTH.pack(len(encoded)) + encoded + data
+
+
+def _decode(blob: bytes) -> CachedPayload | None:
+    """Parse a disk cache entry; None if it is not a valid entry."""
+    start = len(_MAGIC) + _HEADER_LENGTH.size
+    if not blob.startswith(_MAGIC) or len(blob) < start:
+        return None
+    (length,) = _HEADER_LENGTH.unpack_from(blob, len(_MAGIC))
+    try:
+        header = json.loads(blob[start:start + length])
+        data = blob[start + length:]
+        if header["type"] == "image":
+            width, height = int(header["width"]), int(header["height"])
+            if len(data) != width * height * 3:
+                return None
+            return PreparedImage(width, height, data)
+        if header["type"] == "gif":
+            sizes = [int(size) for size in header["frames"]]
+            if sum(sizes) != len(data):
+                return None
+            frames = []
+            offset = 0
+            for size in sizes:
+                frames.append(data[offset:offset + size].decode("ascii"))
+                offset += size
+            return GifFrames(int(header["width"]), frames, int(header["speed"]))
+    except (ValueError, KeyError, TypeError):
+        return None
+    return None
+
+
+class FrameCache:
+    """LRU cache of converted images and GIF frames.
+
+    Entries are keyed by a hash of the source file content plus the target size
+    and the conversion options, so replaying an animation that was shown before
+    skips decoding, resizing and encoding entirely. The in-memory part is bounded
+    by `max_bytes`; evicted entries stay available from the optional disk cache,
+    which is bounded by `max_disk_bytes` (least recently used files go first).
+
+    Disk entries hold the raw payload behind a small JSON header, and are read
+    and written on a worker thread. The disk tier's size is tracked in memory;
+    the directory is only listed once, when the cache is created.
+    """
+
+    def __init__(self, max_bytes: int, disk_path: str | None = None, max_disk_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, CachedPayload] = OrderedDict()
+        self._bytes = 0
+        # Size of each disk entry, least recently used first
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._disk_path = Path(disk_path) if disk_path else None
+        if self._disk_path is not None:
+            self._disk_path.mkdir(parents=True, exist_ok=True)
+            files = sorted(self._disk_path.glob(f"*{_SUFFIX}"), key=lambda path: path.stat().st_mtime)
+            for path in files:
+                size = path.stat().st_size
+                self._disk[path.stem] = size
+                self._disk_bytes += size
+
+    @staticmethod
+    def key(content: bytes, size: int, **options: Any) -> str:
+        """Build the cache key for file content converted for a screen size with the given options."""
+        digest = hashlib.sha256(content)
+        digest.update(json.dumps({"size": size, **options}, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    @property
+    def entries(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    @property
+    def disk_entries(self) -> int:
+        return len(self._disk)
+
+    @property
+    def disk_bytes(self) -> int:
+        return self._disk_bytes
+
+    async def get(self, key: str) -> CachedPayload | None:
+        """Look up a payload, promoting disk entries back into memory."""
+        payload = self._entries.get(key)
+        if payload is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+        if self._disk_path is not None and key in self._disk:
+            path = self._disk_path / f"{key}{_SUFFIX}"
+            payload = await asyncio.to_thread(self._read_disk, path)
+            if payload is not None:
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                self._remember(key, payload)
+                self.hits += 1
+                return payload
+            # Unreadable or not a cache entry
+            self._forget_disk(key)
+            await asyncio.to_thread(self._delete_disk, [path])
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, payload: CachedPayload) -> None:
+        """Store a payload in memory and, if configured, on disk."""
+        self._remember(key, payload)
+        if self._disk_path is None or self.max_disk_bytes <= 0:
+            return
+
+        size = await asyncio.to_thread(self._write_disk, self._disk_path / f"{key}{_SUFFIX}", payload)
+        if size is None:
+            return
+        self._forget_disk(key)
+        self._disk[key] = size
+        self._disk_bytes += size
+
+        evicted = []
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            oldest = next(iter(self._disk))
+            self._forget_disk(oldest)
+            evicted.append(self._disk_path / f"{oldest}{_SUFFIX}")
+        if evicted:
+            await asyncio.to_thread(self._delete_disk, evicted)
+
+    async def clear(self) -> None:
+        """Drop all entries from memory and disk."""
+        self._entries.clear()
+        self._bytes = 0
+        if self._disk_path is None:
+            return
+        paths = [self._disk_path / f"{key}{_SUFFIX}" for key in self._disk]
+        self._disk.clear()
+        self._disk_bytes = 0
+        await asyncio.to_thread(self._delete_disk, paths)
+
+    def _remember(self, key: str, payload: CachedPayload) -> None:
+        if payload.nbytes > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+        self._entries[key] = payload
+        self._bytes += payload.nbytes
+
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def _forget_disk(self, key: str) -> None:
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    @staticmethod
+    def _read_disk(path: Path) -> CachedPayload | None:
+        """Read a disk entry (on a worker thread)."""
+        try:
+            payload = _decode(path.read_bytes())
+            # Mark as recently used for the next start
+            os.utime(path)
+        except OSError:
+            return None
+        return payload
+
+    @staticmethod
+    def _write_disk(path: Path, payload: CachedPayload) -> int | None:
+        """Write a disk entry (on a worker thread) and return its size."""
+        temporary = path.with_suffix(".tmp")
+        blob = _encode(payload)
+        try:
+            temporary.write_bytes(blob)
+            os.replace(temporary, path)
+        except OSError:
+            temporary.unlink(missing_ok=True)
+            return None
+        return len(blob)
+
+    @staticmethod
+    def _delete_disk(paths: list[Path]) -> None:
+        """Delete disk entries (on a worker thread)."""
+        for path in paths:
+            path.unlink(missing_ok=True)
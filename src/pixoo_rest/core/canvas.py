@@ -0,0 +1,127 @@
+"""NumPy-backed framebuffer with vectorized drawing primitives."""
+
+import numpy as np
+from PIL import Image
+from pixoo.constants.font import FONT_PICO_8
+
+from pixoo_rest.core.imaging import ImageOptions, prepare_image
+
+# Glyphs of the pixoo library's PICO-8 font (3x5 pixels, trailing blank pixels omitted) as boolean masks
+_GLYPHS = {
+    character: np.array(bits + [0] * (15 - len(bits)), dtype=bool).reshape(5, 3)
+    for character, bits in FONT_PICO_8.items()
+}
+
+
+def _color(r: int, g: int, b: int) -> tuple[int, int, int]:
+    return min(max(r, 0), 255), min(max(g, 0), 255), min(max(b, 0), 255)
+
+
+class Canvas:
+    """RGB888 framebuffer backed by a contiguous `(height, width, 3)` uint8 array.
+
+    Drawing works on whole array slices instead of single pixels and produces
+    the same pixels as the corresponding pixoo library methods (shapes are
+    clipped to the canvas). `pixels` supports the buffer protocol, so pushing
+    and fingerprinting read it without copying. A canvas is square (the
+    screen) unless a `height` is given.
+    """
+
+    def __init__(self, width: int, height: int | None = None):
+        self.width = width
+        self.height = width if height is None else height
+        self.pixels = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+
+    def tobytes(self) -> bytes:
+        """Copy of the frame as raw RGB data."""
+        return self.pixels.tobytes()
+
+    def load(self, data: bytes) -> None:
+        """Replace the whole frame with raw RGB data of the same size."""
+        self.pixels[...] = np.frombuffer(data, dtype=np.uint8).reshape(self.pixels.shape)
+
+    def fill(self, r: int, g: int, b: int) -> None:
+        """Fill the screen with a color."""
+        self.pixels[...] = _color(r, g, b)
+
+    def pixel(self, x: int, y: int, r: int, g: int, b: int) -> None:
+        """Set a single pixel; pixels off the canvas are ignored."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y, x] = _color(r, g, b)
+
+    def rectangle(self, x1: int, y1: int, x2: int, y2: int, r: int, g: int, b: int) -> None:
+        """Fill the rectangle from (x1, y1) to (x2, y2), both corners included."""
+        left, top = max(x1, 0), max(y1, 0)
+        right, bottom = min(x2 + 1, self.width), min(y2 + 1, self.height)
+        if left < right and top < bottom:
+            self.pixels[top:bottom, left:right] = _color(r, g, b)
+
+    def line(self, x1: int, y1: int, x2: int, y2: int, r: int, g: int, b: int) -> None:
+        """Draw a line from (x1, y1) towards (x2, y2).
+
+        Like the pixoo library, the end point itself is not drawn.
+        """
+        steps = max(abs(x2 - x1), abs(y2 - y1))
+        if steps == 0:
+            return
+
+        interpolants = np.arange(steps) / steps
+        xs = np.round(x1 + interpolants * (x2 - x1)).astype(np.intp)
+        ys = np.round(y1 + interpolants * (y2 - y1)).astype(np.intp)
+        visible = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        self.pixels[ys[visible], xs[visible]] = _color(r, g, b)
+
+    def character(self, character: str, x: int, y: int, r: int, g: int, b: int) -> None:
+        """Draw a character of the pixoo library's 3x5 font; unknown characters are skipped."""
+        glyph = _GLYPHS.get(character)
+        if glyph is not None:
+            self._paint(glyph, x, y, _color(r, g, b))
+
+    def text(self, text: str, x: int, y: int, r: int, g: int, b: int) -> None:
+        """Draw text with the pixoo library's 3x5 font (4 pixels per character)."""
+        color = _color(r, g, b)
+        for index, character in enumerate(text):
+            glyph = _GLYPHS.get(character)
+            if glyph is not None:
+                self._paint(glyph, x + index * 4, y, color)
+
+    def blit(self, data: bytes | np.ndarray, width: int, height: int, x: int = 0, y: int = 0) -> None:
+        """Copy raw RGB data (or an RGB array) into the frame at (x, y), clipped to the canvas."""
+        source = np.asarray(data if isinstance(data, np.ndarray) else np.frombuffer(data, dtype=np.uint8))
+        source = source.reshape(height, width, 3)
+        target, region = self._clip(x, y, width, height)
+        if target is not None:
+            self.pixels[target] = source[region]
+
+    def composite(self, rgba: np.ndarray, x: int = 0, y: int = 0) -> None:
+        """Alpha-blend an RGBA array of shape `(height, width, 4)` over the frame at (x, y)."""
+        height, width = rgba.shape[:2]
+        target, region = self._clip(x, y, width, height)
+        if target is None:
+            return
+
+        source = rgba[region]
+        alpha = source[..., 3:4].astype(np.uint16)
+        background = self.pixels[target].astype(np.uint16)
+        blended = (source[..., :3] * alpha + background * (255 - alpha) + 127) // 255
+        self.pixels[target] = blended.astype(np.uint8)
+
+    def image(self, image: Image.Image, x: int = 0, y: int = 0, options: ImageOptions = ImageOptions()) -> None:
+        """Draw an image like the pixoo library's `draw_image` (shrunk to fit, alpha ignored)."""
+        prepared = prepare_image(image, self.width, self.height, options=options)
+        self.blit(prepared.data, prepared.width, prepared.height, x, y)
+
+    def _paint(self, mask: np.ndarray, x: int, y: int, color: tuple[int, int, int]) -> None:
+        height, width = mask.shape
+        target, region = self._clip(x, y, width, height)
+        if target is not None:
+            self.pixels[target][mask[region]] = color
+
+    def _clip(self, x: int, y: int, width: int, height: int) -> tuple[tuple[slice, slice] | None, tuple[slice, slice]]:
+        """Slices of the frame and of a `width` x `height` source placed at (x, y), clipped to the canvas."""
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + width, self.width), min(y + height, self.height)
+        region = (slice(top - y, bottom - y), slice(left - x, right - x))
+        if left >= right or top >= bottom:
+            return None, region
+        return (slice(top, bottom), slice(left, right)), region
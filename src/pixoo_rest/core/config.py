@@ -1,5 +1,7 @@
 """Application configuration using Pydantic Settings."""
 
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -15,18 +17,216 @@ class Settings(BaseSettings):
     )
 
     # Pixoo Device Settings
-    pixoo_host: str = Field(default="Pixoo64", description="Pixoo device hostname or IP address")
+    pixoo_host: str = Field(
+        default="Pixoo64",
+        description="Pixoo device hostname or IP address; auto takes a device found by LAN discovery",
+    )
+    pixoo_devices: dict[str, str] = Field(
+        default_factory=dict,
+        description="Named Pixoo devices as JSON object (name -> host); overrides pixoo_host if set",
+    )
+    pixoo_discovery_targets: list[str] = Field(
+        default_factory=list,
+        description='Hosts and networks probed for Pixoo devices, as JSON list (e.g. ["192.168.1.0/24"])',
+    )
+    pixoo_discovery_timeout: float = Field(
+        default=1.0,
+        gt=0,
+        description="Seconds a discovery probe waits for a host to answer",
+    )
+    pixoo_discovery_ttl: float = Field(
+        default=300.0,
+        gt=0,
+        description="Seconds a discovered device is kept without answering, and the discovery results are reused",
+    )
+    pixoo_discovery_concurrency: int = Field(
+        default=64,
+        ge=1,
+        description="Hosts probed at the same time during discovery",
+    )
     pixoo_screen_size: int = Field(default=64, description="Pixoo screen size (16, 32, or 64)")
     pixoo_debug: bool = Field(default=False, description="Enable Pixoo debug mode")
     pixoo_test_connection_retries: int = Field(
         default=3,
-        description="Number of connection retries before failing",
+        ge=0,
+        description="Failed probes in a row tolerated before a connected device is reported unreachable",
+    )
+    pixoo_probe_interval: float = Field(
+        default=30.0,
+        gt=0,
+        description="Seconds between reachability probes of a connected device",
+    )
+    pixoo_probe_timeout: float = Field(
+        default=5.0,
+        gt=0,
+        description="Seconds a reachability probe waits for the device",
+    )
+    pixoo_state_sync_interval: float = Field(
+        default=300.0,
+        gt=0,
+        description="Seconds between reads of the device settings (brightness, channel, ...) into the mirror",
+    )
+    pixoo_reconnect_min_delay: float = Field(
+        default=1.0,
+        gt=0,
+        description="Seconds before the first reconnection attempt to an unreachable device",
+    )
+    pixoo_reconnect_max_delay: float = Field(
+        default=60.0,
+        gt=0,
+        description="Longest delay between reconnection attempts (the delay doubles after each failure)",
+    )
+    pixoo_command_timeout: float = Field(
+        default=10.0,
+        gt=0,
+        description="Seconds to wait for a single device command before answering with 504",
+    )
+    pixoo_skip_unchanged_pushes: bool = Field(
+        default=True,
+        description="Skip pushes of a buffer identical to the last frame the device acknowledged",
+    )
+    pixoo_stream_max_fps: float = Field(
+        default=20.0,
+        gt=0,
+        le=60,
+        description="Default limit of pushes per second for frames streamed over /ws/frames",
+    )
+    pixoo_gif_upload_mode: Literal["serial", "pipelined"] = Field(
+        default="pipelined",
+        description="GIF frame upload mode: one frame request at a time (serial) or several in flight (pipelined)",
+    )
+    pixoo_gif_upload_window: int = Field(
+        default=2,
+        ge=1,
+        le=16,
+        description="Maximum number of GIF frame requests in flight (pipelined mode; above 1 frames may arrive out of order)",
+    )
+    pixoo_gif_upload_retries: int = Field(
+        default=2,
+        ge=0,
+        description="Retries per GIF frame request on transient failures or rejections by the device",
+    )
+    pixoo_gif_dedupe_threshold: float = Field(
+        default=2.0,
+        ge=0,
+        le=255,
+        description="GIF frames in which no pixel's color differs from the previous frame by more than this are merged",
     )
 
     # REST API Settings
     pixoo_rest_debug: bool = Field(default=False, description="Enable REST API debug mode")
     pixoo_rest_host: str = Field(default="127.0.0.1", description="REST API host address")
     pixoo_rest_port: int = Field(default=5000, description="REST API port")
+    pixoo_rest_http_max_connections: int = Field(
+        default=100,
+        ge=1,
+        description="Maximum number of open connections per pooled HTTP client",
+    )
+    pixoo_rest_http_max_keepalive_connections: int = Field(
+        default=20,
+        ge=0,
+        description="Maximum number of idle keep-alive connections per pooled HTTP client",
+    )
+    pixoo_rest_http_keepalive_expiry: float = Field(
+        default=30.0,
+        ge=0,
+        description="Seconds an idle keep-alive connection is kept open",
+    )
+    pixoo_rest_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Memory limit of the converted image/GIF frame cache in bytes",
+    )
+    pixoo_rest_cache_dir: str | None = Field(
+        default=None,
+        description="Directory for the on-disk image/GIF frame cache (disabled if not set)",
+    )
+    pixoo_rest_cache_max_disk_bytes: int = Field(
+        default=512 * 1024 * 1024,
+        ge=0,
+        description="Disk limit of the converted image/GIF frame cache in bytes",
+    )
+    pixoo_rest_download_max_age: float = Field(
+        default=0,
+        ge=0,
+        description="Seconds a downloaded file is reused without revalidating it with the server",
+    )
+    pixoo_rest_download_cache_max_bytes: int = Field(
+        default=32 * 1024 * 1024,
+        ge=0,
+        description="Memory limit of the download cache in bytes",
+    )
+    pixoo_rest_divoom_api_url: str = Field(
+        default="https://app.divoom-gz.com",
+        description="Base URL of the Divoom cloud API",
+    )
+    pixoo_rest_divoom_cache_max_age: float = Field(
+        default=3600,
+        ge=0,
+        description="Seconds a Divoom dial type/list answer is reused without asking the cloud",
+    )
+    pixoo_rest_divoom_cache_max_stale: float = Field(
+        default=86400,
+        ge=0,
+        description="Further seconds an outdated dial answer is served while it is refreshed in the background",
+    )
+    pixoo_rest_divoom_cache_max_entries: int = Field(
+        default=1000,
+        ge=1,
+        description="Largest number of Divoom dial type/list answers kept in the cache",
+    )
+    pixoo_rest_divoom_prefetch: list[str] = Field(
+        default_factory=list,
+        description='Dial types whose pages are loaded into the cache at startup, as JSON list (e.g. ["Game"])',
+    )
+    pixoo_rest_max_content_bytes: int = Field(
+        default=32 * 1024 * 1024,
+        ge=1,
+        description="Largest accepted image/GIF upload or download in bytes",
+    )
+    pixoo_rest_max_image_pixels: int = Field(
+        default=4096 * 4096,
+        ge=1,
+        description="Largest accepted image/GIF size in pixels (width x height) before decoding",
+    )
+    pixoo_rest_max_image_frames: int = Field(
+        default=2000,
+        ge=1,
+        description="Largest accepted number of frames of an animated image",
+    )
+    pixoo_rest_image_resample: Literal["nearest", "box", "bilinear", "lanczos"] = Field(
+        default="nearest",
+        description="Filter for scaling images down: nearest (pixel art) or box/bilinear/lanczos (photos)",
+    )
+    pixoo_rest_image_colors: int = Field(
+        default=0,
+        ge=0,
+        le=256,
+        description="Reduce images to a palette of this many colors (0 keeps all colors)",
+    )
+    pixoo_rest_image_dither: bool = Field(
+        default=False,
+        description="Dither images reduced to a palette (Floyd-Steinberg)",
+    )
+    pixoo_rest_image_workers_mode: Literal["thread", "process"] = Field(
+        default="thread",
+        description="Run image conversions on a thread pool or a process pool",
+    )
+    pixoo_rest_image_workers: int = Field(
+        default=4,
+        ge=1,
+        description="Number of image conversion threads/processes",
+    )
+    pixoo_rest_image_queue_size: int = Field(
+        default=16,
+        ge=1,
+        description="Image conversions running or waiting at once; further ones are rejected with 503",
+    )
+    pixoo_rest_image_timeout: float = Field(
+        default=60,
+        gt=0,
+        description="Seconds to wait for an image conversion before answering with 504",
+    )
 
 
 # Global settings instance
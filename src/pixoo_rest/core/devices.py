@@ -0,0 +1,681 @@
+"""Pixoo devices, their command queues and the registry holding them."""
+
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, TypeVar
+
+import httpx
+import requests
+from fastapi import HTTPException
+from pixoo import Pixoo
+
+from pixoo_rest.core.canvas import Canvas
+from pixoo_rest.core.config import Settings
+from pixoo_rest.core.discovery import LanDiscovery
+from pixoo_rest.core.gif import GifSlots
+from pixoo_rest.core.layers import Compositor
+from pixoo_rest.core.metrics import metrics
+from pixoo_rest.core.state import StateMirror
+
+T = TypeVar("T")
+
+# Host of a device that is assigned one found by LAN discovery
+AUTO_HOST = "auto"
+
+
+@dataclass
+class _Command:
+    """A queued device call and the futures waiting for its result."""
+
+    func: Callable[[], Any]
+    is_push: bool = False
+    # Coroutine function, awaited on the event loop instead of the worker thread
+    is_async: bool = False
+    # Event loop time by which the callers give up (None: no limit)
+    deadline: float | None = None
+    waiters: list[asyncio.Future] = field(default_factory=list)
+
+
+class DeviceExecutor:
+    """Single-writer command queue for blocking Pixoo device calls.
+
+    The pixoo library talks to the device with blocking HTTP requests. Calls are
+    queued in submission order and executed one at a time by a single worker on a
+    dedicated thread, which keeps the event loop responsive and serializes access
+    to the shared Pixoo buffer.
+
+    Pushes are coalesced: when a push is about to run while a newer push is already
+    queued behind it, it is dropped and its callers are answered by the newer push
+    (latest frame wins). A device that falls behind therefore skips stale frames
+    instead of replaying every one of them.
+
+    Asynchronous calls that need the device to themselves (GIF uploads, which
+    send many requests) are queued the same way with `run_async`; they run on
+    the event loop, but nothing else is sent to the device until they finish.
+    An asynchronous call still running when its callers' timeout passes is
+    cancelled, so it cannot hold up the queue beyond that.
+    """
+
+    def __init__(self, timeout: float, name: str = ""):
+        self.timeout = timeout
+        self.name = name
+        self.commands_run = 0
+        self.pushes_requested = 0
+        self.pushes_sent = 0
+        self.pushes_dropped = 0
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pixoo-device")
+        self._commands: deque[_Command] = deque()
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of commands waiting to be executed."""
+        return len(self._commands)
+
+    def start(self) -> None:
+        """Start the worker task on the running event loop."""
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._work())
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Queue a blocking device call and await its result.
+
+        Raises:
+            HTTPException: 504 if the call does not finish within the configured timeout
+                (measured from submission, so time spent queued counts). A call that has
+                not started yet is skipped; one that has keeps the worker busy until it returns.
+        """
+        return await self._submit(_Command(partial(func, *args, **kwargs)), self.timeout)
+
+    async def run_async(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> T:
+        """Queue a coroutine function that needs the device to itself and await its result.
+
+        Args:
+            timeout: Seconds to wait for the result, queueing included (None: no limit);
+                the call is cancelled when it runs longer
+
+        Raises:
+            HTTPException: 504 if the call does not finish within `timeout`
+        """
+        return await self._submit(_Command(partial(func, *args, **kwargs), is_async=True), timeout)
+
+    async def push(self, func: Callable[[], None]) -> None:
+        """Queue a push of the current buffer, coalescing it with newer pushes."""
+        self.pushes_requested += 1
+        await self._submit(_Command(func, is_push=True), self.timeout)
+
+    async def close(self) -> None:
+        """Stop the worker and fail all commands that have not run yet."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        while self._commands:
+            for waiter in self._commands.popleft().waiters:
+                if not waiter.done():
+                    waiter.set_exception(HTTPException(status_code=503, detail="Pixoo device is shutting down"))
+
+        self._thread.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, command: _Command, timeout: float | None) -> Any:
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        command.waiters.append(waiter)
+        if timeout is not None:
+            command.deadline = loop.time() + timeout
+        self._commands.append(command)
+        self._wakeup.set()
+
+        try:
+            return await asyncio.wait_for(waiter, timeout=timeout)
+        except asyncio.TimeoutError as e:
+            raise HTTPException(
+                status_code=504,
+                detail=f"Pixoo device did not respond within {timeout}s"
+            ) from e
+
+    def _newer_push(self) -> _Command | None:
+        """Return the most recently queued push, if any."""
+        for command in reversed(self._commands):
+            if command.is_push:
+                return command
+        return None
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            while not self._commands:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            command = self._commands.popleft()
+
+            if command.is_push:
+                newer = self._newer_push()
+                if newer is not None:
+                    newer.waiters.extend(command.waiters)
+                    self.pushes_dropped += 1
+                    continue
+
+            # Every caller gave up (timed out) before the command could start
+            if all(waiter.done() for waiter in command.waiters):
+                continue
+
+            call = "push" if command.is_push else getattr(command.func, "func", command.func).__name__
+            try:
+                with metrics.device_calls.time(device=self.name, call=call):
+                    if command.is_async:
+                        remaining = None if command.deadline is None else command.deadline - loop.time()
+                        result = await asyncio.wait_for(command.func(), remaining)
+                    else:
+                        result = await loop.run_in_executor(self._thread, command.func)
+            except Exception as e:
+                for waiter in command.waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                for waiter in command.waiters:
+                    if not waiter.done():
+                        waiter.set_result(result)
+            finally:
+                self.commands_run += 1
+                if command.is_push:
+                    self.pushes_sent += 1
+
+
+class Device:
+    """A Pixoo display with its own connection, canvas and command queue.
+
+    Drawing happens on the NumPy `canvas`; the `compositor` stacks the layers
+    on top of it and the result is pushed to the device directly (the pixoo
+    library is only used for its device commands).
+    Pushes of a frame identical to the last one the device acknowledged are
+    skipped (unless `skip_unchanged_pushes` is off), provided the device still
+    reports the animation ID of that frame. Anything that puts other content on
+    the screen must call `forget_frame()` so the next push is sent.
+
+    The device is connected in the background (see `monitor`). Until it is
+    reachable, device calls fail right away with 503 instead of waiting for
+    the device. A device configured with the host `auto` takes the host of a
+    device found on the local network.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        host: str,
+        size: int,
+        debug: bool,
+        timeout: float,
+        skip_unchanged_pushes: bool = True,
+    ):
+        self.name = name
+        self.host = host
+        self.size = size
+        self.debug = debug
+        self.skip_unchanged_pushes = skip_unchanged_pushes
+        self.canvas = Canvas(size)
+        self.compositor = Compositor(size)
+        self.executor = DeviceExecutor(timeout, name)
+        self.pushes_skipped = 0
+        # Identifies the image/animation on screen; cleared by anything else drawn or sent
+        self.displayed: str | None = None
+        # Fingerprint of the last frame the device acknowledged
+        self._pushed_frame: bytes | None = None
+        # Animation IDs shared by pushes and GIF uploads
+        self.gif_slots = GifSlots()
+        # Settings (brightness, channel, ...) as far as they are known
+        self.state = StateMirror()
+        # Reachability, as seen by the last probes
+        self.reachable = False
+        self.latency: float | None = None
+        self.last_seen: datetime | None = None
+        self.last_error: str | None = None
+        self._pixoo: Pixoo | None = None
+        self._monitor: asyncio.Task | None = None
+        # Used by the worker thread only; keeps the connection to the device alive
+        self._session = requests.Session()
+
+    @property
+    def pixoo(self) -> Pixoo:
+        """The pixoo library's connection, for its device commands.
+
+        Raises:
+            HTTPException: 503 if the device has not been reached yet
+        """
+        if self._pixoo is None:
+            raise HTTPException(status_code=503, detail=f"Pixoo device '{self.name}' has not been reached yet")
+        return self._pixoo
+
+    def check_reachable(self) -> None:
+        """Fail fast while the device is not reachable.
+
+        Raises:
+            HTTPException: 503 if the last probes did not reach the device
+        """
+        if not self.reachable:
+            raise HTTPException(status_code=503, detail=f"Pixoo device '{self.name}' is not reachable")
+
+    async def probe(self, client: httpx.AsyncClient, timeout: float) -> bool:
+        """Check whether the device answers, recording its latency.
+
+        Returns:
+            True if the device answered
+        """
+        started = time.perf_counter()
+        try:
+            response = await client.get(f"http://{self.host}/get", timeout=timeout)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            return False
+        self.latency = time.perf_counter() - started
+        self.last_seen = datetime.now(timezone.utc)
+        self.last_error = None
+        return True
+
+    def start_monitor(
+        self,
+        client: httpx.AsyncClient,
+        interval: float,
+        timeout: float,
+        min_delay: float,
+        max_delay: float,
+        failures_allowed: int,
+        sync_interval: float,
+        discover: Callable[[bool], Awaitable[str | None]] | None = None,
+    ) -> None:
+        """Connect the device in the background and keep checking that it is reachable (see `monitor`)."""
+        if self._monitor is None:
+            self._monitor = asyncio.create_task(
+                self.monitor(
+                    client, interval, timeout, min_delay, max_delay, failures_allowed, sync_interval, discover
+                )
+            )
+
+    async def monitor(
+        self,
+        client: httpx.AsyncClient,
+        interval: float,
+        timeout: float,
+        min_delay: float,
+        max_delay: float,
+        failures_allowed: int,
+        sync_interval: float,
+        discover: Callable[[bool], Awaitable[str | None]] | None = None,
+    ) -> None:
+        """Probe the device until it is reached, then every `interval` seconds.
+
+        An unreachable device is probed again after `min_delay` seconds, and the
+        delay doubles with every failure up to `max_delay`. A connected device is
+        reported unreachable after more than `failures_allowed` failed probes in
+        a row. When the device is reached again, everything known about its
+        screen and settings is forgotten, as it may have been restarted. The
+        settings mirror is synced with the device on connection and then at
+        least every `sync_interval` seconds.
+
+        A device with the host `auto` first calls `discover` (with True to ask
+        for a fresh scan) until it returns a host, with the same backoff.
+        """
+        if self.host == AUTO_HOST:
+            if discover is None:
+                self.last_error = "No discovery targets configured (PIXOO_DISCOVERY_TARGETS)"
+                print(f"Cannot find Pixoo device '{self.name}': {self.last_error}")
+                return
+            print(f"Looking for Pixoo device '{self.name}' on the local network...")
+            misses = 0
+            while (host := await discover(misses > 0)) is None:
+                misses += 1
+                self.last_error = "No unassigned Pixoo device found on the local network"
+                await asyncio.sleep(min(max_delay, min_delay * 2 ** (misses - 1)))
+            self.host = host
+
+        print(f"Connecting to Pixoo device '{self.name}' at {self.host}...")
+        failures = 0
+        synced = 0.0
+        while True:
+            if await self.probe(client, timeout):
+                failures = 0
+                if not self.reachable:
+                    try:
+                        await self._connected()
+                        synced = 0.0
+                    except Exception as e:
+                        self.last_error = f"{type(e).__name__}: {e}"
+                        failures = 1
+                if self.reachable and time.monotonic() - synced >= sync_interval:
+                    try:
+                        await self.sync_state()
+                        synced = time.monotonic()
+                    except Exception as e:
+                        self.last_error = f"Syncing settings failed: {type(e).__name__}: {e}"
+            else:
+                failures += 1
+                if self.reachable and failures > failures_allowed:
+                    self.reachable = False
+                    print(f"Lost connection to Pixoo device '{self.name}' at {self.host}: {self.last_error}")
+
+            if self.reachable:
+                delay = interval if failures == 0 else min_delay
+            else:
+                delay = min(max_delay, min_delay * 2 ** max(failures - 1, 0))
+            await asyncio.sleep(delay)
+
+    async def _connected(self) -> None:
+        if self._pixoo is None:
+            # The library connects without a timeout; check with a timed request that
+            # the device answers commands first, and do not wait longer than that
+            await asyncio.to_thread(self._get_gif_id)
+            self._pixoo = await asyncio.wait_for(
+                asyncio.to_thread(Pixoo, self.host, self.size, self.debug),
+                timeout=self.executor.timeout,
+            )
+        self.gif_slots.invalidate()
+        self.state.forget()
+        self.forget_frame()
+        self.executor.start()
+        self.reachable = True
+        print(f"Successfully connected to Pixoo device '{self.name}' at {self.host}")
+
+    async def sync_state(self) -> None:
+        """Read the device's settings into the mirror."""
+        conf = await self.executor.run(self._post, {"Command": "Channel/GetAllConf"})
+        index = await self.executor.run(self._post, {"Command": "Channel/GetIndex"})
+        self.state.update(conf, index.get("SelectIndex"))
+
+    async def apply_settings(self, **values: Any) -> int:
+        """Change settings of the device, skipping those that already have the value.
+
+        All changes are sent in one request (`Draw/CommandList`).
+
+        Args:
+            values: Settings of `DeviceSettings` to change; None leaves a setting alone
+
+        Returns:
+            Number of settings sent to the device
+
+        Raises:
+            HTTPException: 503 while the device is not reachable
+        """
+        self.check_reachable()
+        changes = self.state.changes(**values)
+        if not changes:
+            return 0
+
+        commands = self.state.commands(changes)
+        payload = commands[0] if len(commands) == 1 else {"Command": "Draw/CommandList", "CommandList": commands}
+        try:
+            if self.state.affects_screen(changes):
+                await self.executor.run(self._replacing_screen, partial(self._post, payload))
+            else:
+                await self.executor.run(self._post, payload)
+        except Exception:
+            # The device may have applied some of the commands
+            self.state.forget()
+            raise
+        self.state.applied(changes)
+        return len(changes)
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Queue a blocking call for this device and await its result.
+
+        Raises:
+            HTTPException: 503 while the device is not reachable
+        """
+        self.check_reachable()
+        self.displayed = None
+        return await self.executor.run(func, *args, **kwargs)
+
+    async def show(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Queue a blocking call that puts other content on the screen (text, ...).
+
+        The last pushed frame is forgotten when the call runs, so that pushes
+        queued before it cannot mark the screen as showing their frame.
+
+        Raises:
+            HTTPException: 503 while the device is not reachable
+        """
+        self.check_reachable()
+        self.displayed = None
+        self.state.screen_changed()
+        return await self.executor.run(self._replacing_screen, partial(func, *args, **kwargs))
+
+    async def send_command(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Queue a raw device command that changes the screen and return the device's answer (see `show`).
+
+        Raises:
+            HTTPException: 503 while the device is not reachable
+            RuntimeError: If the device answers with an error code
+        """
+        return await self.show(self._post, payload)
+
+    async def run_async(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> T:
+        """Queue a coroutine function that needs the device to itself.
+
+        Args:
+            timeout: Seconds to wait for the result, queueing included (None: no limit)
+
+        Raises:
+            HTTPException: 503 while the device is not reachable, 504 if the call
+                does not finish within `timeout` (it is cancelled then)
+        """
+        self.check_reachable()
+        self.displayed = None
+        return await self.executor.run_async(func, *args, timeout=timeout, **kwargs)
+
+    async def push(self) -> None:
+        """Queue a (coalesced) push of the buffer to the device.
+
+        Raises:
+            HTTPException: 503 while the device is not reachable
+        """
+        self.check_reachable()
+        self.state.screen_changed()
+        await self.executor.push(self._push_frame)
+
+    def forget_frame(self) -> None:
+        """Note that the screen no longer shows the last pushed buffer."""
+        self._pushed_frame = None
+        self.displayed = None
+
+    async def still_displayed(self) -> bool:
+        """Ask the device whether it still plays the last animation or frame sent from here.
+
+        A device that was rebooted, or was sent an animation by another client,
+        reports a different animation ID; then the screen content is unknown
+        and everything tracked about it is forgotten.
+        """
+        if await self.executor.run(self._still_showing):
+            return True
+        self.forget_frame()
+        return False
+
+    def _still_showing(self) -> bool:
+        """Whether the device plays the last animation sent from here (on the worker thread).
+
+        If not, the animation IDs and the last pushed frame are forgotten.
+        """
+        try:
+            pic_id = self._get_gif_id()
+        except Exception:
+            pic_id = None
+        if pic_id is not None and self.gif_slots.reconcile(pic_id):
+            return True
+        self.gif_slots.invalidate()
+        self._pushed_frame = None
+        return False
+
+    def _replacing_screen(self, call: Callable[[], T]) -> T:
+        """Make a call that replaces the screen content (on the worker thread)."""
+        self.forget_frame()
+        return call()
+
+    def _push_frame(self) -> None:
+        """Push the composed frame unless the device already shows exactly this frame."""
+        # The image or animation shown before is replaced
+        self.displayed = None
+        frame = self.compositor.compose(self.canvas.pixels)
+        fingerprint = hashlib.blake2b(frame, digest_size=16).digest()
+        # A device that was rebooted (or sent an animation from elsewhere) no longer shows it
+        if self.skip_unchanged_pushes and fingerprint == self._pushed_frame and self._still_showing():
+            self.pushes_skipped += 1
+            return
+
+        self._pushed_frame = None
+        pic_id, reset = self.gif_slots.allocate()
+        try:
+            if reset:
+                self._post({"Command": "Draw/ResetHttpGifId"})
+            self._post({
+                "Command": "Draw/SendHttpGif",
+                "PicNum": 1,
+                "PicWidth": self.size,
+                "PicOffset": 0,
+                "PicID": pic_id,
+                "PicSpeed": 1000,
+                "PicData": base64.b64encode(frame).decode(),
+            })
+        except Exception:
+            self.gif_slots.invalidate()
+            raise
+        self._pushed_frame = fingerprint
+
+    def _get_gif_id(self) -> int:
+        """Animation ID the device plays (on the worker thread)."""
+        return int(self._post({"Command": "Draw/GetHttpGifId"})["PicId"])
+
+    def _post(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Send a command to the device from the worker thread and return its answer.
+
+        Raises:
+            RuntimeError: If the device answers with an error code
+        """
+        body = json.dumps(payload)
+        command = payload["Command"]
+        metrics.device_bytes.inc(len(body), device=self.name)
+        try:
+            with metrics.device_commands.time(device=self.name, command=command):
+                response = self._session.post(f"http://{self.host}/post", data=body, timeout=self.executor.timeout)
+                response.raise_for_status()
+                data = response.json()
+            if data.get("error_code", 0) != 0:
+                raise RuntimeError(f"Pixoo device rejected {command}: {data}")
+        except Exception:
+            metrics.device_errors.inc(device=self.name, command=command)
+            raise
+        return data
+
+    async def close(self) -> None:
+        """Stop monitoring the device and its command queue."""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+        await self.executor.close()
+        self._session.close()
+
+
+class DeviceRegistry:
+    """All configured Pixoo devices, addressable by name.
+
+    The first configured device is the default one, which serves the routes
+    that are not prefixed with `/devices/{device_name}`.
+    """
+
+    def __init__(self, devices: list[Device]):
+        if not devices:
+            raise ValueError("At least one Pixoo device must be configured")
+        self._devices = {device.name: device for device in devices}
+        self.default = devices[0]
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "DeviceRegistry":
+        """Create the registry from `PIXOO_DEVICES`, falling back to `PIXOO_HOST`."""
+        hosts = settings.pixoo_devices or {"default": settings.pixoo_host}
+        return cls([
+            Device(
+                name,
+                host,
+                settings.pixoo_screen_size,
+                settings.pixoo_debug,
+                settings.pixoo_command_timeout,
+                settings.pixoo_skip_unchanged_pushes,
+            )
+            for name, host in hosts.items()
+        ])
+
+    def __iter__(self) -> Iterator[Device]:
+        return iter(self._devices.values())
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def get(self, name: str | None = None) -> Device:
+        """Look up a device by name; no name selects the default device.
+
+        Raises:
+            KeyError: If no device with that name is configured
+        """
+        if name is None:
+            return self.default
+        return self._devices[name]
+
+    def start(self, client: httpx.AsyncClient, settings: Settings, discovery: LanDiscovery | None = None) -> None:
+        """Connect all devices in the background, without waiting for them.
+
+        Devices with the host `auto` are assigned devices found by `discovery`
+        that no other configured device uses, in address order.
+        """
+        async def discover(refresh: bool) -> str | None:
+            try:
+                found = await discovery.devices(refresh)
+            except ValueError as e:
+                print(f"LAN discovery failed: {e}")
+                return None
+            taken = {device.host for device in self}
+            return next((device.host for device in found if device.host not in taken), None)
+
+        for device in self:
+            device.start_monitor(
+                client,
+                settings.pixoo_probe_interval,
+                settings.pixoo_probe_timeout,
+                settings.pixoo_reconnect_min_delay,
+                settings.pixoo_reconnect_max_delay,
+                settings.pixoo_test_connection_retries,
+                settings.pixoo_state_sync_interval,
+                discover if discovery is not None and discovery.targets else None,
+            )
+
+    async def close(self) -> None:
+        """Stop monitoring all devices and their command queues."""
+        await asyncio.gather(*(device.close() for device in self))
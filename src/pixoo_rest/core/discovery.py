@@ -0,0 +1,172 @@
+"""Discovery of Pixoo devices on the local network."""
+
+import asyncio
+import ipaddress
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+
+# Largest number of addresses a single scan probes (a /20 network)
+MAX_SCAN_HOSTS = 4096
+
+
+def expand_targets(targets: list[str]) -> list[str]:
+    """Hosts to probe: networks in CIDR notation are expanded, other entries (`host[:port]`) kept.
+
+    Raises:
+        ValueError: If a network is malformed or the targets exceed `MAX_SCAN_HOSTS`
+    """
+    hosts: dict[str, None] = {}
+    for target in targets:
+        target = target.strip()
+        if not target:
+            continue
+        if "/" in target:
+            network = ipaddress.ip_network(target, strict=False)
+            if network.num_addresses > MAX_SCAN_HOSTS:
+                raise ValueError(f"Network {target} has more than {MAX_SCAN_HOSTS} addresses")
+            addresses = list(network.hosts()) or [network.network_address]
+            hosts.update((str(address), None) for address in addresses)
+        else:
+            hosts[target] = None
+        if len(hosts) > MAX_SCAN_HOSTS:
+            raise ValueError(f"Discovery targets have more than {MAX_SCAN_HOSTS} addresses")
+    return list(hosts)
+
+
+@dataclass
+class DiscoveredDevice:
+    """A device that answered a discovery probe."""
+
+    host: str
+    latency: float
+    first_seen: datetime
+    last_seen: datetime
+    # Answer to `Channel/GetAllConf` (brightness, clock, ...)
+    conf: dict[str, Any] = field(default_factory=dict)
+    _seen_at: float = field(default=0.0, repr=False)
+
+
+class LanDiscovery:
+    """Finds Pixoo devices by probing hosts of the local network.
+
+    Every host of `targets` (addresses, `host:port` or networks in CIDR
+    notation) is sent `Channel/GetAllConf`, at most `concurrency` at a time and
+    each with a `timeout`; hosts that answer like a Pixoo are kept in an
+    inventory. A device stays in the inventory for `ttl` seconds after it last
+    answered, and `devices` rescans once the last scan is older than `ttl`.
+    Concurrent scans share one run.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        targets: list[str],
+        timeout: float,
+        ttl: float,
+        concurrency: int,
+    ):
+        self.client = client
+        self.targets = targets
+        self.timeout = timeout
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self.scans = 0
+        self.probes = 0
+        self.scanned_at: datetime | None = None
+        self._scanned: float | None = None
+        self._inventory: dict[str, DiscoveredDevice] = {}
+        self._scan: asyncio.Task[list[DiscoveredDevice]] | None = None
+
+    @property
+    def inventory(self) -> list[DiscoveredDevice]:
+        """Devices seen within the last `ttl` seconds, without probing."""
+        now = time.monotonic()
+        for host in [host for host, device in self._inventory.items() if now - device._seen_at > self.ttl]:
+            del self._inventory[host]
+        return sorted(self._inventory.values(), key=lambda device: _sort_key(device.host))
+
+    async def devices(self, refresh: bool = False) -> list[DiscoveredDevice]:
+        """The inventory, rescanning the targets first if it is outdated (or `refresh` is set).
+
+        Raises:
+            ValueError: If the targets are malformed or too many
+        """
+        if refresh or self._scanned is None or time.monotonic() - self._scanned > self.ttl:
+            await self.scan()
+        return self.inventory
+
+    async def scan(self) -> list[DiscoveredDevice]:
+        """Probe all targets and return the devices that answered.
+
+        Raises:
+            ValueError: If the targets are malformed or too many
+        """
+        if self._scan is None:
+            self._scan = asyncio.ensure_future(self._run_scan(expand_targets(self.targets)))
+            self._scan.add_done_callback(self._scan_done)
+        return await asyncio.shield(self._scan)
+
+    async def close(self) -> None:
+        """Cancel a scan in progress."""
+        if self._scan is not None:
+            self._scan.cancel()
+            await asyncio.gather(self._scan, return_exceptions=True)
+
+    def _scan_done(self, _: asyncio.Task) -> None:
+        self._scan = None
+
+    async def _run_scan(self, hosts: list[str]) -> list[DiscoveredDevice]:
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def probe(host: str) -> DiscoveredDevice | None:
+            async with limit:
+                return await self._probe(host)
+
+        results = await asyncio.gather(*(probe(host) for host in hosts))
+        self.scans += 1
+        self._scanned = time.monotonic()
+        self.scanned_at = datetime.now(timezone.utc)
+        return sorted((device for device in results if device is not None), key=lambda device: _sort_key(device.host))
+
+    async def _probe(self, host: str) -> DiscoveredDevice | None:
+        """Ask a host for its settings; answers that are not from a Pixoo are ignored."""
+        self.probes += 1
+        started = time.perf_counter()
+        try:
+            response = await self.client.post(
+                f"http://{host}/post",
+                json={"Command": "Channel/GetAllConf"},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            conf = response.json()
+        except (httpx.HTTPError, ValueError):
+            return None
+        if not isinstance(conf, dict) or conf.get("error_code") != 0:
+            return None
+
+        now = datetime.now(timezone.utc)
+        known = self._inventory.get(host)
+        device = DiscoveredDevice(
+            host=host,
+            latency=time.perf_counter() - started,
+            first_seen=known.first_seen if known is not None else now,
+            last_seen=now,
+            conf={key: value for key, value in conf.items() if key != "error_code"},
+            _seen_at=time.monotonic(),
+        )
+        self._inventory[host] = device
+        return device
+
+
+def _sort_key(host: str) -> tuple:
+    """Order hosts by address (numerically) and port."""
+    address, _, port = host.rpartition(":") if host.count(":") == 1 else (host, "", "")
+    try:
+        return (0, int(ipaddress.ip_address(address)), port)
+    except ValueError:
+        return (1, host, "")
@@ -0,0 +1,268 @@
+"""Showing images and animations on a device, using the frame cache."""
+
+import time
+from dataclasses import asdict
+
+import httpx
+from PIL import Image
+
+from pixoo_rest.core.cache import CachedPayload, FrameCache
+from pixoo_rest.core.config import settings
+from pixoo_rest.core.devices import Device
+from pixoo_rest.core.gif import GifUploadResult, send_gif_frames
+from pixoo_rest.core.imaging import (
+    GifFrames,
+    ImageOptions,
+    PreparedImage,
+    ResampleFilter,
+    encode_gif,
+    is_gif,
+    open_image,
+    prepare_image,
+)
+from pixoo_rest.core.workers import ImageWorkers
+
+
+def open_content(content: bytes) -> Image.Image:
+    """Open an image file within the configured pixel and frame limits.
+
+    Raises:
+        ImageTooLargeError: If the image is larger than allowed
+    """
+    return open_image(content, settings.pixoo_rest_max_image_pixels, settings.pixoo_rest_max_image_frames)
+
+
+def image_options(
+    resample: ResampleFilter | None = None,
+    colors: int | None = None,
+    dither: bool | None = None,
+) -> ImageOptions:
+    """Resampling and color reduction options, defaulting to the server settings."""
+    return ImageOptions(
+        resample=settings.pixoo_rest_image_resample if resample is None else resample,
+        colors=settings.pixoo_rest_image_colors if colors is None else colors,
+        dither=settings.pixoo_rest_image_dither if dither is None else dither,
+    )
+
+
+def image_cache_key(cache: FrameCache, content: bytes, size: int, options: ImageOptions) -> str:
+    """Cache key of a static image converted for a screen size."""
+    return cache.key(content, size, kind="image", **asdict(options))
+
+
+def gif_cache_key(
+    cache: FrameCache,
+    content: bytes,
+    size: int,
+    speed: int | None,
+    skip_first_frame: bool,
+    options: ImageOptions,
+) -> str:
+    """Cache key of a GIF converted for a screen size."""
+    return cache.key(
+        content,
+        size,
+        speed=speed,
+        skip_first_frame=skip_first_frame,
+        dedupe_threshold=settings.pixoo_gif_dedupe_threshold,
+        **asdict(options),
+    )
+
+
+def _convert_image(content: bytes, size: int, options: ImageOptions) -> PreparedImage:
+    """Convert a static image file (runs on the image workers)."""
+    return prepare_image(open_content(content), size, options=options)
+
+
+def _convert_gif(
+    content: bytes,
+    size: int,
+    speed: int | None,
+    skip_first_frame: bool,
+    options: ImageOptions,
+) -> CachedPayload:
+    """Convert a GIF file (runs on the image workers); GIFs with a single frame become a static image."""
+    image = open_content(content)
+    if getattr(image, "is_animated", False):
+        return encode_gif(
+            image,
+            size,
+            skip_first_frame,
+            speed,
+            settings.pixoo_gif_dedupe_threshold,
+            options=options,
+        )
+    return prepare_image(image, size, options=options)
+
+
+async def prepare_content(
+    content: bytes,
+    size: int,
+    cache: FrameCache,
+    workers: ImageWorkers,
+    speed: int | None = None,
+    skip_first_frame: bool = False,
+    options: ImageOptions | None = None,
+) -> CachedPayload:
+    """Convert an image or GIF file into its device payload ahead of time and cache it.
+
+    Showing the content later with `send_image_to_device` / `send_gif_to_device`
+    (with the same options) only uploads it.
+    """
+    options = options or image_options()
+    if is_gif(content):
+        key = gif_cache_key(cache, content, size, speed, skip_first_frame, options)
+    else:
+        key = image_cache_key(cache, content, size, options)
+
+    payload = await cache.get(key)
+    if payload is None:
+        if is_gif(content):
+            payload = await workers.run(_convert_gif, content, size, speed, skip_first_frame, options)
+        else:
+            payload = await workers.run(_convert_image, content, size, options)
+        await cache.put(key, payload)
+    return payload
+
+
+async def draw_prepared_image(
+    device: Device,
+    image: PreparedImage,
+    x: int = 0,
+    y: int = 0,
+    push: bool = True
+) -> GifUploadResult:
+    """Draw a converted static image onto the device canvas and push it."""
+    started = time.perf_counter()
+    await device.run(device.canvas.blit, image.data, image.width, image.height, x, y)
+    if push:
+        await device.push()
+    return GifUploadResult(frames=1, seconds=time.perf_counter() - started)
+
+
+async def send_image_to_device(
+    device: Device,
+    content: bytes,
+    cache: FrameCache,
+    workers: ImageWorkers,
+    x: int = 0,
+    y: int = 0,
+    push: bool = True,
+    skip_if_displayed: bool = False,
+    options: ImageOptions | None = None,
+) -> GifUploadResult:
+    """Send a static image to the Pixoo device.
+
+    Args:
+        device: Pixoo device
+        content: Raw image file content
+        cache: Cache of converted images
+        workers: Pool the image is converted on
+        x: X coordinate
+        y: Y coordinate
+        push: Whether to push the canvas afterwards
+        skip_if_displayed: Send nothing if the device still shows this image at this position
+            (confirmed with the device)
+        options: Resampling and color reduction (default: server settings)
+
+    Returns:
+        Number of frames sent and the time it took
+    """
+    options = options or image_options()
+    key = image_cache_key(cache, content, device.size, options)
+    displayed = f"{key}@{x},{y}"
+    if skip_if_displayed and device.displayed == displayed and await device.still_displayed():
+        return GifUploadResult(frames=0, seconds=0.0)
+
+    image = await cache.get(key)
+    if image is None:
+        image = await workers.run(_convert_image, content, device.size, options)
+        await cache.put(key, image)
+
+    result = await draw_prepared_image(device, image, x, y, push)
+    if push:
+        device.displayed = displayed
+    return result
+
+
+async def send_gif_to_device(
+    device: Device,
+    content: bytes,
+    speed: int | None,
+    skip_first_frame: bool,
+    client: httpx.AsyncClient,
+    cache: FrameCache,
+    workers: ImageWorkers,
+    skip_if_displayed: bool = False,
+    options: ImageOptions | None = None,
+) -> GifUploadResult:
+    """Send a GIF to the Pixoo device.
+
+    The GIF is reduced to the frames the device can play (see `encode_gif`) on
+    the image workers. Frames converted for an earlier request with the same
+    content and options are replayed from the cache.
+
+    Args:
+        device: Pixoo device
+        content: Raw GIF file content
+        speed: Milliseconds per frame (None: the GIF's own timing)
+        skip_first_frame: Whether to skip the first frame
+        client: httpx AsyncClient for the device requests
+        cache: Cache of converted images and GIF frames
+        workers: Pool the GIF is converted on
+        skip_if_displayed: Send nothing if the device still plays this GIF (asks the device
+            for its animation ID, which is cheaper than uploading the frames again)
+        options: Resampling and color reduction (default: server settings)
+
+    Returns:
+        Number of frames sent and the time the conversion and upload took
+    """
+    device.check_reachable()
+    started = time.perf_counter()
+    options = options or image_options()
+    key = gif_cache_key(cache, content, device.size, speed, skip_first_frame, options)
+    if skip_if_displayed and device.displayed == key and await device.still_displayed():
+        return GifUploadResult(frames=0, seconds=0.0)
+
+    source = await cache.get(key)
+    if source is None:
+        source = await workers.run(_convert_gif, content, device.size, speed, skip_first_frame, options)
+        await cache.put(key, source)
+
+    if isinstance(source, PreparedImage):
+        # Not animated, just draw as static image
+        result = await draw_prepared_image(device, source)
+        device.displayed = key
+        return result
+
+    device.state.screen_changed()
+    # One command timeout per request (the ID reset and each frame); a hung upload
+    # is cancelled instead of holding up the device's queue
+    deadline = device.executor.timeout * (len(source.frames) + 1)
+    result = await device.run_async(_upload_gif, device, client, source, key, timeout=deadline)
+    return GifUploadResult(frames=result.frames, seconds=time.perf_counter() - started)
+
+
+async def _upload_gif(device: Device, client: httpx.AsyncClient, gif: GifFrames, key: str) -> GifUploadResult:
+    """Upload GIF frames as one command of the device's queue, so no push lands between them."""
+    device.forget_frame()
+    pic_id, reset = device.gif_slots.allocate(key)
+    try:
+        result = await send_gif_frames(
+            client,
+            device.host,
+            gif,
+            pic_id,
+            reset,
+            mode=settings.pixoo_gif_upload_mode,
+            window=settings.pixoo_gif_upload_window,
+            retries=settings.pixoo_gif_upload_retries,
+            timeout=device.executor.timeout,
+            device=device.name,
+        )
+    except BaseException:
+        # The device may have kept part of the frames
+        device.gif_slots.invalidate()
+        raise
+    device.displayed = key
+    return result
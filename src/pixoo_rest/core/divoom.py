@@ -0,0 +1,200 @@
+"""Cached access to the Divoom cloud API's clock face catalog."""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+# Pages of a dial type fetched at the same time when prefetching
+_PREFETCH_CONCURRENCY = 4
+
+
+@dataclass
+class _CachedResponse:
+    data: dict[str, Any]
+    fetched_at: float
+
+
+class DivoomCatalog:
+    """The Divoom cloud's dial types and dial lists, cached with stale-while-revalidate.
+
+    A response younger than `max_age` seconds is answered from the cache. An
+    older one is still answered for up to `max_stale` more seconds while a
+    background request refreshes it (and if that request fails). Only after
+    that is the cloud asked while the caller waits. Concurrent requests for
+    the same page share one cloud request. Error answers of the cloud are
+    passed on but not cached. At most `max_entries` answers are kept (the
+    least recently used one goes first).
+
+    `prefetch` loads all pages of a dial type, and `find` looks dials up by ID
+    or name in the cached pages instead of paging through the cloud.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        max_age: float,
+        max_stale: float,
+        max_entries: int = 1000,
+    ):
+        self.client = client
+        self.base_url = base_url.rstrip("/")
+        self.max_age = max_age
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+        self.errors = 0
+        self._entries: OrderedDict[tuple, _CachedResponse] = OrderedDict()
+        self._pending: dict[tuple, asyncio.Task[dict[str, Any]]] = {}
+        self._prefetching: dict[str, asyncio.Task[int]] = {}
+        self._background: set[asyncio.Task] = set()
+
+    async def dial_types(self) -> dict[str, Any]:
+        """Answer of `Channel/GetDialType`.
+
+        Raises:
+            httpx.HTTPError: If the cloud cannot be reached and nothing usable is cached
+        """
+        return await self._get(("types",), lambda: self._post("/Channel/GetDialType"))
+
+    async def dial_list(self, dial_type: str, page: int) -> dict[str, Any]:
+        """Answer of `Channel/GetDialList` for one page of a dial type.
+
+        Raises:
+            httpx.HTTPError: If the cloud cannot be reached and nothing usable is cached
+        """
+        return await self._get(
+            ("list", dial_type, page),
+            lambda: self._post("/Channel/GetDialList", {"DialType": dial_type, "Page": page}),
+        )
+
+    async def prefetch(self, dial_type: str) -> int:
+        """Load all pages of a dial type into the cache; concurrent calls share the work.
+
+        Returns:
+            Number of pages of the dial type
+        """
+        task = self._prefetching.get(dial_type)
+        if task is None:
+            task = asyncio.ensure_future(self._prefetch(dial_type))
+            self._prefetching[dial_type] = task
+            task.add_done_callback(lambda _: self._prefetching.pop(dial_type, None))
+        return await asyncio.shield(task)
+
+    def start_prefetch(self, dial_type: str) -> None:
+        """Prefetch a dial type in the background; failed pages are counted in `errors`."""
+        async def run() -> None:
+            try:
+                await self.prefetch(dial_type)
+            except Exception:
+                pass
+
+        self._keep(asyncio.ensure_future(run()))
+
+    async def find(self, query: str, dial_type: str | None = None) -> list[dict[str, Any]]:
+        """Dials whose `ClockId` equals the query or whose name contains it (case-insensitive).
+
+        With a `dial_type`, all its pages are loaded first (from the cache where
+        possible); without one, only the pages cached so far are searched.
+        """
+        if dial_type is not None:
+            await self.prefetch(dial_type)
+
+        needle = query.strip().casefold()
+        found: dict[Any, dict[str, Any]] = {}
+        pages = sorted(
+            ((key, entry) for key, entry in self._entries.items()
+             if key[0] == "list" and (dial_type is None or key[1] == dial_type)),
+            key=lambda item: item[0],
+        )
+        for _, entry in pages:
+            for dial in entry.data.get("DialList") or []:
+                if str(dial.get("ClockId")) == needle or needle in str(dial.get("Name", "")).casefold():
+                    found.setdefault(dial.get("ClockId"), dial)
+        return list(found.values())
+
+    @property
+    def entries(self) -> int:
+        return len(self._entries)
+
+    async def close(self) -> None:
+        """Cancel background refreshes and prefetches."""
+        tasks = [*self._background, *self._pending.values(), *self._prefetching.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _keep(self, task: asyncio.Task) -> None:
+        """Hold a reference to a background task until it is done."""
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _prefetch(self, dial_type: str) -> int:
+        first = await self.dial_list(dial_type, 1)
+        page_size = len(first.get("DialList") or [])
+        total = int(first.get("TotalNum") or 0)
+        pages = max(1, math.ceil(total / page_size)) if page_size else 1
+
+        limit = asyncio.Semaphore(_PREFETCH_CONCURRENCY)
+
+        async def load(page: int) -> None:
+            async with limit:
+                await self.dial_list(dial_type, page)
+
+        await asyncio.gather(*(load(page) for page in range(2, pages + 1)))
+        return pages
+
+    async def _get(self, key: tuple, fetch: Callable[[], Awaitable[dict[str, Any]]]) -> dict[str, Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            age = time.monotonic() - entry.fetched_at
+            if age < self.max_age:
+                self.hits += 1
+                return entry.data
+            if age < self.max_age + self.max_stale:
+                self.stale += 1
+                refresh = self._refresh(key, fetch)
+                # Nobody awaits the refresh; a failure keeps the stale entry
+                refresh.add_done_callback(lambda task: task.cancelled() or task.exception())
+                return entry.data
+
+        self.misses += 1
+        return await asyncio.shield(self._refresh(key, fetch))
+
+    def _refresh(self, key: tuple, fetch: Callable[[], Awaitable[dict[str, Any]]]) -> asyncio.Task[dict[str, Any]]:
+        """Start fetching an entry, unless that is already under way."""
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._store(key, fetch))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return task
+
+    async def _store(self, key: tuple, fetch: Callable[[], Awaitable[dict[str, Any]]]) -> dict[str, Any]:
+        try:
+            data = await fetch()
+        except Exception:
+            self.errors += 1
+            raise
+        if data.get("error_code", 0) != 0 or data.get("ReturnCode", 0) != 0:
+            self.errors += 1
+        else:
+            self._entries.pop(key, None)
+            self._entries[key] = _CachedResponse(data, time.monotonic())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data
+
+    async def _post(self, path: str, payload: dict[str, Any] | None = None) -> dict[str, Any]:
+        response = await self.client.post(f"{self.base_url}{path}", json=payload)
+        response.raise_for_status()
+        return response.json()
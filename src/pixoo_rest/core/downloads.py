@@ -0,0 +1,136 @@
+"""HTTP download cache using conditional requests."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import httpx
+
+from pixoo_rest.core.http import read_response
+
+
+@dataclass
+class _CachedDownload:
+    content: bytes
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+
+class DownloadCache:
+    """Remembers downloaded files and their validators (`ETag`, `Last-Modified`).
+
+    A file younger than `max_age` seconds is reused without contacting the server.
+    Older files are revalidated with a conditional request; a `304 Not Modified`
+    answer reuses the stored content instead of downloading it again. The cache
+    is bounded by `max_bytes` of stored content (least recently used goes first).
+    Concurrent requests for the same URL share a single download. Files are
+    streamed, and a download is aborted as soon as it exceeds `max_content_bytes`.
+
+    Entries and shared downloads are kept per client as well as per URL, so a
+    download made without certificate verification is never handed to a
+    caller that asked for a verified one.
+    """
+
+    def __init__(self, max_age: float, max_bytes: int, max_content_bytes: int):
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.max_content_bytes = max_content_bytes
+        self.fresh = 0
+        self.revalidated = 0
+        self.downloaded = 0
+        self.coalesced = 0
+        self._entries: OrderedDict[tuple[httpx.AsyncClient, str], _CachedDownload] = OrderedDict()
+        self._bytes = 0
+        self._pending: dict[tuple[httpx.AsyncClient, str], asyncio.Task[bytes]] = {}
+
+    @property
+    def entries(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    async def fetch(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        max_age: float | None = None,
+        timeout: float = 30.0,
+    ) -> bytes:
+        """Get the content of a URL, reusing or revalidating a cached copy if possible.
+
+        Args:
+            client: httpx AsyncClient used for the request
+            url: URL to download
+            max_age: Overrides the cache's `max_age` for this request
+            timeout: Request timeout in seconds; when joining a download already
+                under way, the longest time to wait for it
+
+        Raises:
+            httpx.HTTPError: If the download fails
+            ContentTooLargeError: If the file is larger than `max_content_bytes`
+        """
+        key = (client, url)
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.wait_for(asyncio.shield(pending), timeout)
+            except asyncio.TimeoutError as e:
+                raise httpx.TimeoutException(f"Timed out waiting for the download of {url}") from e
+
+        task = asyncio.ensure_future(self._fetch(client, url, max_age, timeout))
+        self._pending[key] = task
+        task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str, max_age: float | None, timeout: float) -> bytes:
+        max_age = self.max_age if max_age is None else max_age
+        key = (client, url)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            if time.monotonic() - cached.fetched_at < max_age:
+                self.fresh += 1
+                return cached.content
+
+        headers = {}
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached is not None and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+        async with client.stream("GET", url, headers=headers, timeout=timeout) as response:
+            if cached is not None and response.status_code == 304:
+                cached.fetched_at = time.monotonic()
+                self.revalidated += 1
+                return cached.content
+
+            response.raise_for_status()
+            content = await read_response(response, self.max_content_bytes)
+
+        self.downloaded += 1
+        self._store(key, _CachedDownload(
+            content=content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            fetched_at=time.monotonic(),
+        ))
+        return content
+
+    def _store(self, key: tuple[httpx.AsyncClient, str], entry: _CachedDownload) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous.content)
+
+        if len(entry.content) > self.max_bytes:
+            return
+
+        self._entries[key] = entry
+        self._bytes += len(entry.content)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.content)
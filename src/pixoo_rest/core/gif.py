@@ -0,0 +1,226 @@
+"""Upload of animated GIFs to Pixoo devices."""
+
+import asyncio
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Literal
+
+import httpx
+
+from pixoo_rest.core.imaging import GifFrames
+from pixoo_rest.core.metrics import metrics
+
+GifUploadMode = Literal["serial", "pipelined"]
+
+# The device's animation ID has to be reset before it reaches this value
+PIC_ID_LIMIT = 32
+
+
+@dataclass
+class GifUploadResult:
+    """Outcome of a GIF upload."""
+
+    frames: int
+    seconds: float
+
+
+class GifSlots:
+    """Tracks which content the device has loaded under which animation ID (`PicID`).
+
+    The firmware only plays an animation sent with a newer ID than the last one,
+    and the IDs have to be reset (`Draw/ResetHttpGifId`) before they reach
+    `PIC_ID_LIMIT`. IDs are therefore handed out in order, by GIF uploads and
+    pushes alike, and only reset when they run out or the device state is
+    unknown (at first, after a failed upload or after `invalidate`).
+
+    `reconcile` compares the ID the device reports with the last one handed
+    out; a device that was rebooted or received an animation from elsewhere
+    reports a different one, and the tracker starts over. The device cannot
+    switch back to an animation sent earlier, so only the latest one can be
+    reused without uploading it again.
+
+    IDs are handed out from the event loop (GIF uploads) and from the device's
+    worker thread (pushes), so the state is guarded by a lock.
+    """
+
+    def __init__(self, limit: int = PIC_ID_LIMIT):
+        self.limit = limit
+        self.resets = 0
+        self.mismatches = 0
+        self._lock = threading.Lock()
+        # Last ID handed out, None while the device's ID is unknown
+        self._last_id: int | None = None
+        self._loaded: dict[int, str | None] = {}
+
+    @property
+    def current(self) -> str | None:
+        """Key of the content sent with the last ID, if known."""
+        with self._lock:
+            return None if self._last_id is None else self._loaded.get(self._last_id)
+
+    def allocate(self, key: str | None = None) -> tuple[int, bool]:
+        """Hand out the ID for the next animation showing `key`.
+
+        Returns:
+            The ID, and whether the device's IDs have to be reset before sending it
+        """
+        with self._lock:
+            reset = self._last_id is None or self._last_id + 1 >= self.limit
+            if reset:
+                self._loaded.clear()
+                self._last_id = 1
+                self.resets += 1
+            else:
+                self._last_id += 1
+            self._loaded[self._last_id] = key
+            return self._last_id, reset
+
+    def invalidate(self) -> None:
+        """Forget the device's state; the next ID resets the device's IDs."""
+        with self._lock:
+            self._last_id = None
+            self._loaded.clear()
+
+    def reconcile(self, device_id: int) -> bool:
+        """Check the ID the device reports against the last ID handed out.
+
+        Returns:
+            True if they match; otherwise the tracker is invalidated
+        """
+        with self._lock:
+            if self._last_id is not None and device_id == self._last_id:
+                return True
+            if self._last_id is not None:
+                self.mismatches += 1
+            self._last_id = None
+            self._loaded.clear()
+            return False
+
+
+async def _post(
+    client: httpx.AsyncClient,
+    host: str,
+    device: str,
+    payload: dict,
+    retries: int,
+    timeout: float,
+) -> None:
+    """POST a command to the device, retrying transient failures and rejections with backoff.
+
+    The metrics of the requests are labelled with the device name `device`.
+
+    Raises:
+        httpx.HTTPError: If the request still fails after the retries
+        RuntimeError: If the device still answers with an error code after the retries
+    """
+    body = json.dumps(payload)
+    command = payload["Command"]
+    for attempt in range(retries + 1):
+        metrics.device_bytes.inc(len(body), device=device)
+        try:
+            with metrics.device_commands.time(device=device, command=command):
+                response = await client.post(
+                    f"http://{host}/post",
+                    content=body,
+                    headers={"Content-Type": "application/json"},
+                    timeout=timeout,
+                )
+        except httpx.TransportError:
+            metrics.device_errors.inc(device=device, command=command)
+            if attempt == retries:
+                raise
+        else:
+            if response.is_success:
+                try:
+                    error_code = response.json().get("error_code", 0)
+                except ValueError:
+                    error_code = 0
+                if error_code == 0:
+                    return
+                metrics.device_errors.inc(device=device, command=command)
+                if attempt == retries:
+                    raise RuntimeError(f"Pixoo device rejected {command}: {response.text}")
+            else:
+                metrics.device_errors.inc(device=device, command=command)
+                # Only server errors are worth retrying
+                if response.status_code < 500 or attempt == retries:
+                    response.raise_for_status()
+        await asyncio.sleep(0.2 * 2 ** attempt)
+
+
+async def send_gif_frames(
+    client: httpx.AsyncClient,
+    host: str,
+    gif: GifFrames,
+    pic_id: int = 1,
+    reset: bool = True,
+    mode: GifUploadMode = "pipelined",
+    window: int = 2,
+    retries: int = 2,
+    timeout: float = 10.0,
+    device: str | None = None,
+) -> GifUploadResult:
+    """Upload converted animation frames to a Pixoo device.
+
+    In `serial` mode frames are sent one after another. In `pipelined` mode up
+    to `window` frame requests are in flight at the same time, which hides the
+    network round trip but lets frames arrive out of order (use a window of 1
+    or `serial` for firmware that drops such frames).
+
+    Args:
+        client: httpx AsyncClient used for the device requests
+        host: Device hostname or IP address
+        gif: Converted frames (see `encode_gif`)
+        pic_id: Animation ID to send the frames with (see `GifSlots`)
+        reset: Whether to reset the device's animation IDs first
+        mode: Upload mode (`serial` or `pipelined`)
+        window: Maximum number of frame requests in flight (pipelined mode)
+        retries: Retries per request on transient failures
+        timeout: Seconds each request waits for the device
+        device: Device name the request metrics are labelled with (default: `host`)
+
+    Returns:
+        Number of frames sent and the time the upload took
+    """
+    started = time.perf_counter()
+    device = host if device is None else device
+
+    def payload(offset: int, data: str) -> dict:
+        return {
+            "Command": "Draw/SendHttpGif",
+            "PicID": pic_id,
+            "PicNum": len(gif.frames),
+            "PicOffset": offset,
+            "PicWidth": gif.width,
+            "PicSpeed": gif.speed,
+            "PicData": data,
+        }
+
+    if reset:
+        await _post(client, host, device, {"Command": "Draw/ResetHttpGifId"}, retries, timeout)
+
+    in_flight = asyncio.Semaphore(1 if mode == "serial" else max(1, window))
+    tasks: list[asyncio.Task] = []
+
+    async def send(offset: int, data: str) -> None:
+        try:
+            await _post(client, host, device, payload(offset, data), retries, timeout)
+        finally:
+            in_flight.release()
+
+    try:
+        for offset, data in enumerate(gif.frames):
+            await in_flight.acquire()
+            # Stop early if a previous frame already failed
+            for task in tasks:
+                if task.done() and task.exception() is not None:
+                    raise task.exception()
+            tasks.append(asyncio.create_task(send(offset, data)))
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return GifUploadResult(frames=len(gif.frames), seconds=time.perf_counter() - started)
@@ -0,0 +1,143 @@
+"""Long-lived HTTP clients shared by all requests."""
+
+import asyncio
+import time
+from collections.abc import AsyncIterable
+from importlib.util import find_spec
+from typing import Any
+
+import httpx
+from fastapi import Request
+
+from pixoo_rest.core.metrics import metrics
+
+# HTTP/2 needs the optional `h2` package (`pip install pixoo-rest[http2]`)
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+
+class ContentTooLargeError(ValueError):
+    """A download or upload is larger than allowed."""
+
+
+async def read_limited(chunks: AsyncIterable[bytes], max_bytes: int, length: int | None = None) -> bytes:
+    """Read a body chunk by chunk, giving up as soon as it gets larger than `max_bytes`.
+
+    Args:
+        chunks: Chunks of the body
+        max_bytes: Largest accepted size
+        length: Announced size (e.g. `Content-Length`), checked before reading
+
+    Raises:
+        ContentTooLargeError: If the body is larger than `max_bytes`
+    """
+    if length is not None and length > max_bytes:
+        raise ContentTooLargeError(f"Content of {length} bytes exceeds the limit of {max_bytes} bytes")
+
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        if len(body) > max_bytes:
+            raise ContentTooLargeError(f"Content exceeds the limit of {max_bytes} bytes")
+    return bytes(body)
+
+
+async def read_response(response: httpx.Response, max_bytes: int) -> bytes:
+    """Read the body of a streamed response, up to `max_bytes`.
+
+    Raises:
+        ContentTooLargeError: If the body is larger than `max_bytes`
+    """
+    length = response.headers.get("Content-Length")
+    return await read_limited(
+        response.aiter_bytes(),
+        max_bytes,
+        int(length) if length and length.isdigit() else None,
+    )
+
+
+async def read_body(request: Request, max_bytes: int) -> bytes:
+    """Read the body of an incoming request, up to `max_bytes`.
+
+    The announced `Content-Length` is checked before anything is read.
+
+    Raises:
+        ContentTooLargeError: If the body is larger than `max_bytes`
+    """
+    length = request.headers.get("Content-Length")
+    return await read_limited(
+        request.stream(),
+        max_bytes,
+        int(length) if length and length.isdigit() else None,
+    )
+
+
+def _timing_hooks(client: str) -> dict[str, list[Any]]:
+    """httpx event hooks recording the time until each response's headers arrive."""
+    async def started(request: httpx.Request) -> None:
+        request.extensions["pixoo_rest_started"] = time.perf_counter()
+
+    async def answered(response: httpx.Response) -> None:
+        request = response.request
+        started = request.extensions.get("pixoo_rest_started")
+        if started is not None:
+            metrics.http_client_requests.observe(
+                time.perf_counter() - started,
+                client=client,
+                status=response.status_code,
+            )
+
+    return {"request": [started], "response": [answered]}
+
+
+class HttpClients:
+    """Pooled httpx clients, created once for the lifetime of the application.
+
+    Reusing connections saves the TCP (and TLS) setup on every request:
+
+    * `device` talks to the Pixoo devices (plain HTTP/1.1 with keep-alive; the
+      embedded web server does not speak HTTP/2).
+    * `divoom` talks to the Divoom cloud API (HTTP/2 if available).
+    * `downloads(ssl_verify)` fetches images from arbitrary URLs; there is one
+      client per certificate verification mode, as httpx fixes it per client.
+
+    Timeouts are passed per request where callers need a specific one. The
+    `divoom` and `downloads` clients record their latencies in the metrics;
+    device commands are timed per command where they are sent.
+    """
+
+    def __init__(self, max_connections: int, max_keepalive_connections: int, keepalive_expiry: float):
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.device = httpx.AsyncClient(timeout=30.0, limits=limits)
+        self.divoom = httpx.AsyncClient(
+            timeout=30.0,
+            limits=limits,
+            http2=HTTP2_AVAILABLE,
+            event_hooks=_timing_hooks("divoom"),
+        )
+        self._downloads = {
+            verify: httpx.AsyncClient(
+                timeout=30.0,
+                limits=limits,
+                verify=verify,
+                follow_redirects=True,
+                http2=HTTP2_AVAILABLE,
+                event_hooks=_timing_hooks("downloads"),
+            )
+            for verify in (True, False)
+        }
+
+    def downloads(self, ssl_verify: bool = True) -> httpx.AsyncClient:
+        """Client for downloading files from arbitrary URLs."""
+        return self._downloads[ssl_verify]
+
+    async def close(self) -> None:
+        """Close all clients and their connection pools."""
+        await asyncio.gather(
+            self.device.aclose(),
+            self.divoom.aclose(),
+            *(client.aclose() for client in self._downloads.values()),
+        )
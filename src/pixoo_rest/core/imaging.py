@@ -0,0 +1,229 @@
+"""Conversion of images and GIF frames into device-ready payloads."""
+
+import base64
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Literal
+
+import numpy as np
+from PIL import Image
+
+# The device does not accept more frames per animation
+MAX_GIF_FRAMES = 59
+
+# Frame durations (milliseconds) up to the minimum are replaced by the default
+MIN_GIF_FRAME_DURATION = 10
+DEFAULT_GIF_FRAME_DURATION = 100
+
+ResampleFilter = Literal["nearest", "box", "bilinear", "lanczos"]
+
+_FILTERS = {
+    "nearest": Image.Resampling.NEAREST,
+    "box": Image.Resampling.BOX,
+    "bilinear": Image.Resampling.BILINEAR,
+    "lanczos": Image.Resampling.LANCZOS,
+}
+
+
+@dataclass(frozen=True)
+class ImageOptions:
+    """How images are scaled down and color-reduced for the screen.
+
+    `nearest` keeps the hard edges of pixel art and matches the pixoo library;
+    `box` (fast) and `lanczos` (sharper) average the source pixels and suit
+    photos. `colors` maps the result onto a palette of that many colors (0
+    keeps all colors), with Floyd-Steinberg dithering if `dither` is set.
+    """
+
+    resample: ResampleFilter = "nearest"
+    colors: int = 0
+    dither: bool = False
+
+
+@dataclass
+class PreparedImage:
+    """A static image converted to raw RGB data that fits on the screen."""
+
+    width: int
+    height: int
+    data: bytes
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
+
+@dataclass
+class GifFrames:
+    """Frames of an animation in the format of the device's `Draw/SendHttpGif` command."""
+
+    width: int
+    frames: list[str]
+    speed: int = DEFAULT_GIF_FRAME_DURATION
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(frame) for frame in self.frames)
+
+
+class ImageTooLargeError(ValueError):
+    """An image has more pixels or frames than allowed."""
+
+
+def open_image(content: bytes, max_pixels: int, max_frames: int) -> Image.Image:
+    """Open an image file, checking its size before any pixel data is decoded.
+
+    Pillow only reads the header here; frames are decoded later, one at a time,
+    when they are used. Counting the frames of an animation skips through the
+    file without decoding them.
+
+    Raises:
+        ImageTooLargeError: If the image has more than `max_pixels` pixels or
+            more than `max_frames` frames
+    """
+    image = Image.open(BytesIO(content))
+    if image.width * image.height > max_pixels:
+        raise ImageTooLargeError(
+            f"Image of {image.width}x{image.height} pixels exceeds the limit of {max_pixels} pixels"
+        )
+    frames = getattr(image, "n_frames", 1)
+    if frames > max_frames:
+        raise ImageTooLargeError(f"Animation of {frames} frames exceeds the limit of {max_frames} frames")
+    return image
+
+
+def is_gif(content: bytes) -> bool:
+    """Check whether raw file content is a GIF, without decoding it."""
+    return content[:6] in (b"GIF87a", b"GIF89a")
+
+
+def _reduce_colors(
+    image: Image.Image,
+    options: ImageOptions,
+    palette: Image.Image | None = None,
+) -> tuple[Image.Image, Image.Image]:
+    """Map an RGB image onto a palette of `options.colors` colors.
+
+    Returns:
+        The reduced RGB image and the palette (computed from the image unless given),
+        so frames of an animation can share one palette
+    """
+    if palette is None:
+        palette = image.quantize(options.colors, dither=Image.Dither.NONE)
+    dither = Image.Dither.FLOYDSTEINBERG if options.dither else Image.Dither.NONE
+    return image.quantize(palette=palette, dither=dither).convert("RGB"), palette
+
+
+def prepare_image(
+    image: Image.Image,
+    size: int,
+    height: int | None = None,
+    options: ImageOptions = ImageOptions(),
+) -> PreparedImage:
+    """Shrink an image to fit the screen (keeping its aspect ratio) and convert it to RGB.
+
+    With the default options this mirrors what the pixoo library's `draw_image`
+    does before drawing pixel by pixel. Pass a `height` to fit a `size` x `height`
+    area instead of the square screen. Like the library, the image is shrunk in
+    place: an image that was not loaded yet is decoded at reduced scale where
+    the format supports it (JPEG draft mode), and averaging filters first reduce
+    it by an integer factor, instead of resampling it at full size. An image
+    that already fits is not resampled at all.
+    """
+    height = size if height is None else height
+    if image.width > size or image.height > height:
+        resample = _FILTERS[options.resample]
+        if resample != Image.Resampling.NEAREST and image.mode in ("1", "P"):
+            # Pillow only resamples palette images with NEAREST
+            image = image.convert("RGB")
+        image.thumbnail((size, height), resample)
+
+    rgb_image = image if image.mode == "RGB" else image.convert("RGB")
+    if options.colors:
+        rgb_image, _ = _reduce_colors(rgb_image, options)
+    return PreparedImage(width=rgb_image.width, height=rgb_image.height, data=rgb_image.tobytes())
+
+
+def _gif_frame_duration(gif: Image.Image) -> int:
+    """Duration of the current GIF frame in milliseconds."""
+    duration = gif.info.get("duration") or 0
+    # Like browsers, show frames without a usable delay for the default time
+    return int(duration) if duration > MIN_GIF_FRAME_DURATION else DEFAULT_GIF_FRAME_DURATION
+
+
+def _gif_frame(gif: Image.Image, size: int, options: ImageOptions) -> Image.Image:
+    """The current GIF frame in RGB, resized unless it has a device size already."""
+    if gif.size in ((16, 16), (32, 32), (64, 64)):
+        return gif.convert("RGB")
+
+    resample = _FILTERS[options.resample]
+    if resample == Image.Resampling.NEAREST:
+        return gif.resize((size, size), resample).convert("RGB")
+    return gif.convert("RGB").resize((size, size), resample, reducing_gap=2.0)
+
+
+def encode_gif(
+    gif: Image.Image,
+    size: int,
+    skip_first_frame: bool,
+    speed: int | None = None,
+    dedupe_threshold: float = 0.0,
+    max_frames: int = MAX_GIF_FRAMES,
+    options: ImageOptions = ImageOptions(),
+) -> GifFrames:
+    """Convert an animated GIF of any length into the frames sent to the device.
+
+    Frames are decoded one at a time and scaled to the screen size (frames of
+    a device size are used as they are). A frame in which no pixel differs
+    from the last kept frame by more than `dedupe_threshold` in any color
+    channel (0-255) is merged into it and extends its duration; a small sprite
+    that moves or blinks therefore always keeps its frames. The device plays all frames at one speed, so the kept frames are
+    then sampled on an even time grid: one step per shortest frame duration,
+    but at most `max_frames` steps. Frames that last several steps are repeated,
+    and long animations are sampled evenly over their whole length instead of
+    being cut off. The speed is the step length, so the animation plays about
+    as long as the GIF. With `options.colors`, the frames that are sent are
+    reduced to one palette computed from all of them.
+
+    Args:
+        gif: Animated PIL image
+        size: Device screen size
+        skip_first_frame: Whether to skip the first frame
+        speed: Milliseconds per source frame, overriding the GIF's own timing
+        dedupe_threshold: Largest color difference of any pixel in frames that are merged
+        max_frames: Largest number of frames the device accepts
+        options: Resampling and color reduction
+    """
+    frames: list[np.ndarray] = []
+    durations: list[int] = []
+    for index in range(1 if skip_first_frame else 0, gif.n_frames):
+        gif.seek(index)
+        pixels = np.asarray(_gif_frame(gif, size, options))
+        duration = speed or _gif_frame_duration(gif)
+        if frames and np.abs(pixels.astype(np.int16) - frames[-1]).max() <= dedupe_threshold:
+            durations[-1] += duration
+        else:
+            frames.append(pixels)
+            durations.append(duration)
+
+    if not frames:
+        return GifFrames(width=size, frames=[], speed=speed or DEFAULT_GIF_FRAME_DURATION)
+
+    total = sum(durations)
+    steps = min(max_frames, max(1, round(total / min(durations))))
+    # Show at each step the frame that the GIF shows in the middle of it
+    times = (np.arange(steps) + 0.5) * (total / steps)
+    picks = np.searchsorted(np.cumsum(durations), times, side="right")
+    shown = {int(index): frames[index] for index in picks}
+    if options.colors:
+        # One palette for the whole animation, so colors do not flicker between frames
+        _, palette = _reduce_colors(Image.fromarray(np.concatenate(list(shown.values()))), options)
+        shown = {
+            index: np.asarray(_reduce_colors(Image.fromarray(pixels), options, palette)[0])
+            for index, pixels in shown.items()
+        }
+    return GifFrames(
+        width=frames[0].shape[1],
+        frames=[base64.b64encode(shown[index].tobytes()).decode("utf-8") for index in picks],
+        speed=max(1, round(total / steps)),
+    )
@@ -0,0 +1,151 @@
+"""Named screen regions (layers) composited over the device canvas."""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from pixoo_rest.core.canvas import Canvas
+
+# A rectangle on the screen: left, top, right, bottom (right/bottom exclusive)
+Rect = tuple[int, int, int, int]
+
+
+@dataclass
+class Layer:
+    """A region of the screen with its own canvas.
+
+    Layers are stacked by `z` (higher is on top) over the device canvas; an
+    `opacity` below 1 blends the layer with what is beneath it.
+    """
+
+    name: str
+    x: int
+    y: int
+    z: int
+    opacity: float
+    visible: bool
+    canvas: Canvas
+
+    @property
+    def bounds(self) -> Rect:
+        return self.x, self.y, self.x + self.canvas.width, self.y + self.canvas.height
+
+
+def _intersect(a: Rect, b: Rect) -> Rect | None:
+    left, top = max(a[0], b[0]), max(a[1], b[1])
+    right, bottom = min(a[2], b[2]), min(a[3], b[3])
+    if left >= right or top >= bottom:
+        return None
+    return left, top, right, bottom
+
+
+class Compositor:
+    """Composes the frame sent to the device from the canvas and the layers.
+
+    The composed frame is kept between pushes and only the parts of the screen
+    that changed since the last push are recomposed: the bounds of layers that
+    were drawn on, moved, restacked or removed, plus the bounding box of any
+    change to the device canvas beneath them. Layers that did not change cost
+    nothing. Without layers the device canvas is pushed as is.
+
+    All methods must be called from the device's worker thread.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._layers: dict[str, Layer] = {}
+        self._frame = np.zeros((size, size, 3), dtype=np.uint8)
+        self._base = np.zeros((size, size, 3), dtype=np.uint8)
+        self._dirty: list[Rect] = [(0, 0, size, size)]
+
+    @property
+    def layers(self) -> list[Layer]:
+        """Layers from bottom to top."""
+        return sorted(self._layers.values(), key=lambda layer: layer.z)
+
+    def get(self, name: str) -> Layer:
+        """Look up a layer.
+
+        Raises:
+            KeyError: If no layer with that name exists
+        """
+        return self._layers[name]
+
+    def put(
+        self,
+        name: str,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        z: int = 0,
+        opacity: float = 1.0,
+        visible: bool = True,
+    ) -> Layer:
+        """Create a layer or change its position, size, stacking and visibility.
+
+        The content of an existing layer is kept unless its size changes.
+        """
+        layer = self._layers.get(name)
+        if layer is not None:
+            self.invalidate(layer.bounds)
+            if (layer.canvas.width, layer.canvas.height) != (width, height):
+                layer.canvas = Canvas(width, height)
+            layer.x, layer.y, layer.z, layer.opacity, layer.visible = x, y, z, opacity, visible
+        else:
+            layer = Layer(name, x, y, z, opacity, visible, Canvas(width, height))
+            self._layers[name] = layer
+
+        self.invalidate(layer.bounds)
+        return layer
+
+    def remove(self, name: str) -> None:
+        """Remove a layer, uncovering what is beneath it.
+
+        Raises:
+            KeyError: If no layer with that name exists
+        """
+        self.invalidate(self._layers.pop(name).bounds)
+
+    def invalidate(self, rect: Rect | None = None) -> None:
+        """Mark a part of the screen (default: all of it) for recomposition."""
+        rect = _intersect(rect or (0, 0, self.size, self.size), (0, 0, self.size, self.size))
+        if rect is not None:
+            self._dirty.append(rect)
+
+    def compose(self, base: np.ndarray) -> np.ndarray:
+        """Return the frame for the device, recomposing only what changed.
+
+        Args:
+            base: Pixels of the device canvas, shape `(size, size, 3)`
+        """
+        if not self._layers:
+            self._dirty[:] = [(0, 0, self.size, self.size)]
+            return base
+
+        changed = np.any(base != self._base, axis=2)
+        if changed.any():
+            rows, columns = np.flatnonzero(changed.any(axis=1)), np.flatnonzero(changed.any(axis=0))
+            self._dirty.append((int(columns[0]), int(rows[0]), int(columns[-1]) + 1, int(rows[-1]) + 1))
+            self._base[...] = base
+
+        layers = [layer for layer in self.layers if layer.visible and layer.opacity > 0]
+        for rect in self._dirty:
+            left, top, right, bottom = rect
+            self._frame[top:bottom, left:right] = base[top:bottom, left:right]
+            for layer in layers:
+                overlap = _intersect(rect, layer.bounds)
+                if overlap is not None:
+                    self._draw_layer(layer, overlap)
+
+        self._dirty.clear()
+        return self._frame
+
+    def _draw_layer(self, layer: Layer, rect: Rect) -> None:
+        left, top, right, bottom = rect
+        target = self._frame[top:bottom, left:right]
+        source = layer.canvas.pixels[top - layer.y:bottom - layer.y, left - layer.x:right - layer.x]
+        if layer.opacity >= 1:
+            target[...] = source
+        else:
+            target[...] = (source * layer.opacity + target * (1 - layer.opacity) + 0.5).astype(np.uint8)
@@ -0,0 +1,207 @@
+"""Prometheus metrics in the text exposition format, without extra dependencies.
+
+Latencies and counts of the hot paths are recorded where they happen (device
+commands, outgoing HTTP requests, image conversions, routes). Values that the
+server keeps anyway (queue depths, cache hits) are read when `/metrics` is
+scraped, see `family`.
+"""
+
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import Literal, TypeVar
+
+# Latency buckets in seconds, from a skipped push to a long GIF upload
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+MetricType = Literal["counter", "gauge", "histogram"]
+
+M = TypeVar("M", bound="_Metric")
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict[str, object]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def family(name: str, help: str, type: MetricType, samples: Iterable[tuple[dict[str, object], float]]) -> list[str]:
+    """Exposition lines of a metric whose values are read at scrape time."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {type}"]
+    lines.extend(f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples)
+    return lines
+
+
+class _Metric(ABC):
+    """A metric family with a fixed set of label names.
+
+    Updates come from the event loop, the device threads and the image workers,
+    so they are guarded by a lock.
+    """
+
+    type: MetricType
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, object]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects the labels {', '.join(self.labelnames)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def collect(self) -> list[str]:
+        """Exposition lines of the metric."""
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}", *self._samples()]
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        """Sample lines of the metric."""
+
+
+class Counter(_Metric):
+    """A value that only goes up."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_labels(dict(zip(self.labelnames, key, strict=True)))} {_number(value)}"
+
+
+class Histogram(_Metric):
+    """Distribution of durations over fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+        # Per label set: count per bucket (the last one is +Inf) and the sum
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        """Observe how long the block takes (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        for key, counts, total in values:
+            labels = dict(zip(self.labelnames, key, strict=True))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels({**labels, 'le': _number(bound)})} {cumulative}"
+            yield f"{self.name}_sum{_labels(labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(labels)} {cumulative}"
+
+
+class Metrics:
+    """The metrics recorded by the server."""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self.requests = self._add(Histogram(
+            "pixoo_rest_request_duration_seconds",
+            "Time to answer API requests, by route template",
+            ("method", "route", "status"),
+        ))
+        self.device_commands = self._add(Histogram(
+            "pixoo_rest_device_command_duration_seconds",
+            "Time of commands sent to the devices (one sample per GIF frame)",
+            ("device", "command"),
+        ))
+        self.device_calls = self._add(Histogram(
+            "pixoo_rest_device_call_duration_seconds",
+            "Time calls take on a device's command queue worker (pushes and pixoo library calls)",
+            ("device", "call"),
+        ))
+        self.device_errors = self._add(Counter(
+            "pixoo_rest_device_errors_total",
+            "Device commands that failed or were rejected by the device",
+            ("device", "command"),
+        ))
+        self.device_bytes = self._add(Counter(
+            "pixoo_rest_device_sent_bytes_total",
+            "Bytes of commands sent to the devices",
+            ("device",),
+        ))
+        self.http_client_requests = self._add(Histogram(
+            "pixoo_rest_http_client_duration_seconds",
+            "Time until outgoing HTTP requests (Divoom cloud, downloads) receive their response headers",
+            ("client", "status"),
+        ))
+        self.image_jobs = self._add(Histogram(
+            "pixoo_rest_image_job_duration_seconds",
+            "Time image workers spend on a conversion (decoding, resizing, encoding)",
+            ("job",),
+        ))
+        self.image_queue_wait = self._add(Histogram(
+            "pixoo_rest_image_queue_wait_seconds",
+            "Time conversions wait for an image worker",
+            ("job",),
+        ))
+
+    def _add(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self, extra: Iterable[list[str]] = ()) -> str:
+        """All metrics in the Prometheus text format, followed by `extra` families."""
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for lines_of_family in extra:
+            lines.extend(lines_of_family)
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
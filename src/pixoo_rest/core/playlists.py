@@ -0,0 +1,227 @@
+"""Playlists: images and GIFs shown in rotation by a server-side player."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from pixoo_rest.core.cache import FrameCache
+from pixoo_rest.core.devices import Device
+from pixoo_rest.core.display import image_options, prepare_content, send_gif_to_device, send_image_to_device
+from pixoo_rest.core.downloads import DownloadCache
+from pixoo_rest.core.http import HttpClients
+from pixoo_rest.core.imaging import is_gif
+from pixoo_rest.core.workers import ImageWorkers
+from pixoo_rest.models.requests import PlaylistItem, PlaylistRequest
+
+
+@dataclass
+class Playlist:
+    """A playlist of a device and its playback state."""
+
+    name: str
+    device: Device
+    request: PlaylistRequest
+    position: int = 0
+    rotations: int = 0
+    last_error: str | None = None
+    _prepared: set[int] = field(default_factory=set, repr=False)
+    _preparing: dict[int, asyncio.Task] = field(default_factory=dict, repr=False)
+    _task: asyncio.Task | None = field(default=None, repr=False)
+    _prerender: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def playing(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def prepared(self) -> int:
+        return len(self._prepared)
+
+
+class PlaylistManager:
+    """Plays playlists: shows their items in turn, each for its duration.
+
+    When a playlist starts, all of its items are downloaded and converted into
+    device payloads in the background, and the payloads are kept in the frame
+    cache. While an item is shown, the next one is fetched and prepared, so
+    switching items only uploads the prepared frames (a static item that is
+    still on the screen is not sent again at all). Downloads go through the
+    download cache and are reused for the playlist's `max_age`.
+
+    A device plays at most one playlist at a time; starting one stops the others.
+    """
+
+    def __init__(
+        self,
+        downloads: DownloadCache,
+        frame_cache: FrameCache,
+        clients: HttpClients,
+        workers: ImageWorkers,
+    ):
+        self._downloads = downloads
+        self._frame_cache = frame_cache
+        self._clients = clients
+        self._workers = workers
+        self._playlists: dict[tuple[str, str], Playlist] = {}
+
+    def of_device(self, device: Device) -> list[Playlist]:
+        """Playlists of a device."""
+        return [
+            playlist for (device_name, _), playlist in self._playlists.items() if device_name == device.name
+        ]
+
+    def get(self, device: Device, name: str) -> Playlist:
+        """Look up a playlist.
+
+        Raises:
+            KeyError: If the device has no playlist with that name
+        """
+        return self._playlists[device.name, name]
+
+    async def put(self, device: Device, name: str, request: PlaylistRequest) -> Playlist:
+        """Create or replace a playlist, and start it if requested."""
+        previous = self._playlists.pop((device.name, name), None)
+        if previous is not None:
+            await self._stop(previous)
+
+        playlist = Playlist(name, device, request)
+        self._playlists[device.name, name] = playlist
+        if request.autostart:
+            await self.start(playlist)
+        return playlist
+
+    async def start(self, playlist: Playlist) -> None:
+        """Start (or restart) playing a playlist from its current position."""
+        for other in self.of_device(playlist.device):
+            await self._stop(other)
+
+        playlist._prerender = asyncio.create_task(self._prerender(playlist))
+        playlist._task = asyncio.create_task(self._run(playlist))
+
+    async def stop(self, playlist: Playlist) -> None:
+        """Stop a playlist; the item shown stays on the screen."""
+        await self._stop(playlist)
+
+    async def remove(self, device: Device, name: str) -> None:
+        """Stop and forget a playlist.
+
+        Raises:
+            KeyError: If the device has no playlist with that name
+        """
+        await self._stop(self._playlists.pop((device.name, name)))
+
+    async def close(self) -> None:
+        """Stop all playlists."""
+        playlists = list(self._playlists.values())
+        self._playlists.clear()
+        await asyncio.gather(*(self._stop(playlist) for playlist in playlists))
+
+    def _prepare(self, playlist: Playlist, index: int) -> asyncio.Task:
+        """Download an item and convert it into its device payload.
+
+        Concurrent calls for the same item share one task. The task returns the
+        downloaded content; the payload is left in the frame cache.
+        """
+        task = playlist._preparing.get(index)
+        if task is None:
+            task = asyncio.create_task(self._prepare_item(playlist, playlist.request.items[index]))
+            playlist._preparing[index] = task
+
+            def done(finished: asyncio.Task) -> None:
+                playlist._preparing.pop(index, None)
+                if not finished.cancelled() and finished.exception() is None:
+                    playlist._prepared.add(index)
+
+            task.add_done_callback(done)
+        return task
+
+    async def _prepare_item(self, playlist: Playlist, item: PlaylistItem) -> bytes:
+        content = await self._downloads.fetch(
+            self._clients.downloads(item.ssl_verify),
+            item.url,
+            max_age=playlist.request.max_age,
+        )
+        await prepare_content(
+            content,
+            playlist.device.size,
+            self._frame_cache,
+            self._workers,
+            item.speed,
+            item.skip_first_frame,
+            image_options(item.resample, item.colors, item.dither),
+        )
+        return content
+
+    async def _prerender(self, playlist: Playlist) -> None:
+        """Prepare all items one after another, starting with the next one to show."""
+        count = len(playlist.request.items)
+        for offset in range(count):
+            try:
+                await asyncio.shield(self._prepare(playlist, (playlist.position + offset) % count))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                playlist.last_error = f"{type(e).__name__}: {e}"
+
+    async def _run(self, playlist: Playlist) -> None:
+        items = playlist.request.items
+        prefetch: asyncio.Task | None = None
+        try:
+            while True:
+                index = playlist.position
+                item = items[index]
+                started = time.monotonic()
+                try:
+                    content = await asyncio.shield(prefetch or self._prepare(playlist, index))
+                    # Fetch and convert the next item while this one is shown
+                    prefetch = self._prepare(playlist, (index + 1) % len(items))
+                    await self._show(playlist, item, content)
+                    playlist.rotations += 1
+                    playlist.last_error = None
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    prefetch = None
+                    playlist.last_error = f"{type(e).__name__}: {e}"
+
+                await asyncio.sleep(max(0.0, item.duration - (time.monotonic() - started)))
+                playlist.position = (index + 1) % len(items)
+        finally:
+            if prefetch is not None:
+                prefetch.cancel()
+
+    async def _show(self, playlist: Playlist, item: PlaylistItem, content: bytes) -> None:
+        device = playlist.device
+        if is_gif(content):
+            await send_gif_to_device(
+                device,
+                content,
+                item.speed,
+                item.skip_first_frame,
+                self._clients.device,
+                self._frame_cache,
+                self._workers,
+                skip_if_displayed=True,
+                options=image_options(item.resample, item.colors, item.dither),
+            )
+        else:
+            await send_image_to_device(
+                device,
+                content,
+                self._frame_cache,
+                self._workers,
+                skip_if_displayed=True,
+                options=image_options(item.resample, item.colors, item.dither),
+            )
+
+    @staticmethod
+    async def _stop(playlist: Playlist) -> None:
+        tasks = [task for task in (playlist._task, playlist._prerender) if task is not None]
+        playlist._task = playlist._prerender = None
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,261 @@
+"""Scenes: layers rendered from bound data by a server-side scheduler."""
+
+import asyncio
+import hashlib
+import json
+import string
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from pixoo_rest.core.devices import Device
+from pixoo_rest.core.display import image_options, open_content
+from pixoo_rest.core.downloads import DownloadCache
+from pixoo_rest.core.http import HttpClients
+from pixoo_rest.core.imaging import ImageOptions, PreparedImage, prepare_image
+from pixoo_rest.core.workers import ImageWorkers
+from pixoo_rest.models.requests import (
+    SceneImageElement,
+    SceneProgressElement,
+    SceneRequest,
+    SceneSource,
+    SceneTextElement,
+)
+
+
+class _TemplateFormatter(string.Formatter):
+    """`str.format` restricted to plain names, so templates cannot reach object attributes."""
+
+    def get_field(self, field_name: str, args: Any, kwargs: Any) -> Any:
+        if not field_name.isidentifier():
+            raise ValueError(f"Template fields must be plain names, got '{{{field_name}}}'")
+        return super().get_field(field_name, args, kwargs)
+
+
+_formatter = _TemplateFormatter()
+
+
+def _used_names(element: Any) -> set[str]:
+    """Names of the sources (and `now`) an element uses."""
+    if isinstance(element, SceneImageElement):
+        return {element.source}
+    template = element.text if isinstance(element, SceneTextElement) else element.value
+    return {name for _, name, _, _ in _formatter.parse(template) if name}
+
+
+def _resolve(source: SceneSource, content: bytes) -> Any:
+    """Value of a source: the JSON value at its path, or the response text."""
+    if source.json_path is None:
+        return content.decode("utf-8", errors="replace").strip()
+
+    value = json.loads(content)
+    for key in source.json_path.split("."):
+        value = value[int(key)] if isinstance(value, list) else value[key]
+    return value
+
+
+def _convert_image(content: bytes, width: int, height: int, options: ImageOptions) -> PreparedImage:
+    """Convert an image source to fit a scene's layer (runs on the image workers)."""
+    return prepare_image(open_content(content), width, height, options=options)
+
+
+@dataclass
+class Scene:
+    """A scene scheduled on a device, rendered into the layer of the same name."""
+
+    name: str
+    device: Device
+    request: SceneRequest
+    refreshes: int = 0
+    renders: int = 0
+    last_error: str | None = None
+    _rendered: tuple | None = None
+    _task: asyncio.Task | None = field(default=None, repr=False)
+
+
+class SceneManager:
+    """Runs scenes: fetches their data on a schedule and redraws them when it changes.
+
+    Every scene refreshes at multiples of its interval (so a one-minute clock
+    changes at the full minute). A refresh fetches the scene's sources through
+    the download cache, which shares concurrent downloads of the same URL and
+    reuses recent ones, so scenes bound to the same data cause one request.
+    The scene is only drawn and pushed if what it would show changed; image
+    sources are then decoded on the image workers, not the device's worker.
+    """
+
+    def __init__(self, downloads: DownloadCache, clients: HttpClients, workers: ImageWorkers):
+        self._downloads = downloads
+        self._clients = clients
+        self._workers = workers
+        self._scenes: dict[tuple[str, str], Scene] = {}
+
+    def of_device(self, device: Device) -> list[Scene]:
+        """Scenes of a device."""
+        return [scene for (device_name, _), scene in self._scenes.items() if device_name == device.name]
+
+    def get(self, device: Device, name: str) -> Scene:
+        """Look up a scene.
+
+        Raises:
+            KeyError: If the device has no scene with that name
+        """
+        return self._scenes[device.name, name]
+
+    async def put(self, device: Device, name: str, request: SceneRequest) -> Scene:
+        """Create or replace a scene, render it right away and schedule its refreshes.
+
+        Raises:
+            ValueError: If an element refers to an unknown source
+        """
+        known = set(request.sources) | {"now"}
+        for element in request.elements:
+            unknown = _used_names(element) - known
+            if unknown:
+                raise ValueError(f"Unknown source(s) in {element.type} element: {', '.join(sorted(unknown))}")
+
+        previous = self._scenes.pop((device.name, name), None)
+        if previous is not None:
+            await self._stop(previous)
+
+        scene = Scene(name, device, request)
+        self._scenes[device.name, name] = scene
+        await self.refresh(scene)
+        scene._task = asyncio.create_task(self._run(scene))
+        return scene
+
+    async def remove(self, device: Device, name: str) -> None:
+        """Stop a scene and remove its layer.
+
+        The scene is only dropped once its layer is gone from the device; if
+        that fails (e.g. the device is unreachable) it keeps running.
+
+        Raises:
+            KeyError: If the device has no scene with that name
+        """
+        scene = self._scenes[device.name, name]
+        await self._stop(scene)
+        try:
+            await device.run(self._remove_layer, scene)
+            await device.push()
+        except BaseException:
+            # Draw the layer again at the next refresh
+            scene._rendered = None
+            scene._task = asyncio.create_task(self._run(scene))
+            raise
+        del self._scenes[device.name, name]
+
+    async def refresh(self, scene: Scene, force: bool = False) -> None:
+        """Fetch the scene's data and redraw it if anything visible changed."""
+        scene.refreshes += 1
+        request = scene.request
+        try:
+            contents = dict(zip(request.sources, await asyncio.gather(*(
+                self._downloads.fetch(
+                    self._clients.downloads(source.ssl_verify),
+                    source.url,
+                    max_age=request.interval / 2,
+                )
+                for source in request.sources.values()
+            )), strict=True))
+            # Image sources are used as files; only sources used in templates are parsed
+            in_templates = set().union(*(
+                _used_names(element) for element in request.elements if not isinstance(element, SceneImageElement)
+            ))
+            values: dict[str, Any] = {
+                name: _resolve(source, contents[name])
+                for name, source in request.sources.items()
+                if name in in_templates
+            }
+            values["now"] = datetime.now()
+
+            rendered = tuple(self._render_element(element, values, contents) for element in request.elements)
+            if force or rendered != scene._rendered:
+                images = await self._convert_images(request, contents)
+                await scene.device.run(self._draw, scene, rendered, images)
+                await scene.device.push()
+                scene._rendered = rendered
+                scene.renders += 1
+            scene.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            scene.last_error = f"{type(e).__name__}: {e}"
+
+    async def close(self) -> None:
+        """Stop all scenes (their layers stay on the devices)."""
+        scenes = list(self._scenes.values())
+        self._scenes.clear()
+        await asyncio.gather(*(self._stop(scene) for scene in scenes))
+
+    async def _convert_images(self, request: SceneRequest, contents: dict[str, bytes]) -> dict[str, PreparedImage]:
+        """Convert the image sources the scene's elements show, once per source."""
+        sources = list({element.source: None for element in request.elements if isinstance(element, SceneImageElement)})
+        options = image_options()
+        images = await asyncio.gather(*(
+            self._workers.run(_convert_image, contents[source], request.width, request.height, options)
+            for source in sources
+        ))
+        return dict(zip(sources, images, strict=True))
+
+    async def _run(self, scene: Scene) -> None:
+        interval = scene.request.interval
+        while True:
+            await asyncio.sleep(interval - time.time() % interval)
+            await self.refresh(scene)
+
+    @staticmethod
+    async def _stop(scene: Scene) -> None:
+        if scene._task is not None:
+            scene._task.cancel()
+            try:
+                await scene._task
+            except asyncio.CancelledError:
+                pass
+
+    @staticmethod
+    def _render_element(element: Any, values: dict[str, Any], contents: dict[str, bytes]) -> tuple:
+        """What an element shows, in a form that is cheap to compare."""
+        if isinstance(element, SceneTextElement):
+            return ("text", _formatter.format(element.text, **values))
+        if isinstance(element, SceneProgressElement):
+            value = float(_formatter.format(element.value, **values))
+            span = element.maximum - element.minimum
+            fraction = (value - element.minimum) / span if span else 0.0
+            return ("progress", round(min(max(fraction, 0.0), 1.0) * element.width))
+        return ("image", hashlib.sha256(contents[element.source]).hexdigest())
+
+    @staticmethod
+    def _draw(scene: Scene, rendered: tuple, images: dict[str, PreparedImage]) -> None:
+        """Draw the scene into its layer (on the device's worker thread)."""
+        request = scene.request
+        compositor = scene.device.compositor
+        layer = compositor.put(scene.name, request.x, request.y, request.width, request.height, request.z)
+        canvas = layer.canvas
+        canvas.fill(request.background.r, request.background.g, request.background.b)
+
+        for element, (_, shown) in zip(request.elements, rendered, strict=True):
+            if isinstance(element, SceneTextElement):
+                canvas.text(shown, element.x, element.y, element.r, element.g, element.b)
+            elif isinstance(element, SceneProgressElement):
+                bottom = element.y + element.height - 1
+                background = element.background
+                canvas.rectangle(
+                    element.x, element.y, element.x + element.width - 1, bottom,
+                    background.r, background.g, background.b,
+                )
+                if shown:
+                    canvas.rectangle(element.x, element.y, element.x + shown - 1, bottom, element.r, element.g, element.b)
+            elif isinstance(element, SceneImageElement):
+                image = images[element.source]
+                canvas.blit(image.data, image.width, image.height, element.x, element.y)
+
+        compositor.invalidate(layer.bounds)
+
+    @staticmethod
+    def _remove_layer(scene: Scene) -> None:
+        try:
+            scene.device.compositor.remove(scene.name)
+        except KeyError:
+            pass
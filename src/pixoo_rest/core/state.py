@@ -0,0 +1,123 @@
+"""Mirror of a device's settings, to answer reads and skip writes that change nothing."""
+
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timezone
+from typing import Any
+
+# Settings that decide what the screen shows; pushes and GIFs override them
+_SCREEN_SETTINGS = ("channel", "clock", "visualizer")
+
+
+@dataclass
+class DeviceSettings:
+    """Settings of a device; None where they are unknown."""
+
+    brightness: int | None = None
+    channel: int | None = None
+    clock: int | None = None
+    visualizer: int | None = None
+    screen_on: bool | None = None
+
+
+def _command(name: str, value: Any) -> dict[str, Any]:
+    """Device command that changes one setting."""
+    if name == "brightness":
+        return {"Command": "Channel/SetBrightness", "Brightness": value}
+    if name == "channel":
+        return {"Command": "Channel/SetIndex", "SelectIndex": value}
+    if name == "clock":
+        return {"Command": "Channel/SetClockSelectId", "ClockId": value}
+    if name == "visualizer":
+        return {"Command": "Channel/SetEqPosition", "EqPosition": value}
+    return {"Command": "Channel/OnOffScreen", "OnOff": 1 if value else 0}
+
+
+class StateMirror:
+    """What the server knows about a device's settings.
+
+    The mirror is filled from the device (`Channel/GetAllConf` and
+    `Channel/GetIndex`, see `update`) and from the writes sent to it. A write
+    of a value the mirror already holds is not sent. Anything that puts other
+    content on the screen (pushes, GIFs) calls `screen_changed`: the channel,
+    clock and visualizer are unknown afterwards, so selecting them again is
+    sent (it brings the channel back), and the next `update` does not adopt
+    the device's report of them, which still names the channel shown before.
+    The firmware reports no visualizer, so it is only known after a write.
+    """
+
+    def __init__(self):
+        self.settings = DeviceSettings()
+        self.synced_at: datetime | None = None
+        self.writes_sent = 0
+        self.writes_skipped = 0
+        self._screen_overridden = False
+
+    def changes(self, **values: Any) -> dict[str, Any]:
+        """Requested settings (None: not requested) that differ from the mirror."""
+        changes = {}
+        for name, value in values.items():
+            if value is None:
+                continue
+            if getattr(self.settings, name) == value:
+                self.writes_skipped += 1
+            else:
+                changes[name] = value
+        return changes
+
+    @staticmethod
+    def commands(changes: dict[str, Any]) -> list[dict[str, Any]]:
+        """Device commands applying the changes; the screen is turned on first and off last."""
+        order = [field.name for field in fields(DeviceSettings)]
+        names = sorted(changes, key=order.index)
+        if changes.get("screen_on") is True:
+            names.insert(0, names.pop(names.index("screen_on")))
+        return [_command(name, changes[name]) for name in names]
+
+    @staticmethod
+    def affects_screen(changes: dict[str, Any]) -> bool:
+        """Whether the changes replace what the screen shows."""
+        return any(name in changes for name in _SCREEN_SETTINGS)
+
+    def applied(self, changes: dict[str, Any]) -> None:
+        """Record changes the device accepted."""
+        self.writes_sent += len(changes)
+        for name, value in changes.items():
+            setattr(self.settings, name, value)
+        if self.affects_screen(changes):
+            self._screen_overridden = False
+            # Selecting a clock or visualizer switches the channel on its own
+            if "channel" not in changes:
+                self.settings.channel = None
+
+    def screen_changed(self) -> None:
+        """Note that something else than the selected channel is on the screen now."""
+        self._screen_overridden = True
+        for name in _SCREEN_SETTINGS:
+            setattr(self.settings, name, None)
+
+    def forget(self) -> None:
+        """Forget all settings (e.g. after a failed write or a restart of the device)."""
+        self.settings = DeviceSettings()
+
+    def update(self, conf: dict[str, Any], channel: int | None) -> None:
+        """Adopt the settings reported by the device.
+
+        Args:
+            conf: Answer to `Channel/GetAllConf`
+            channel: `SelectIndex` of the answer to `Channel/GetIndex`
+        """
+        settings = self.settings
+        if "Brightness" in conf:
+            settings.brightness = int(conf["Brightness"])
+        if "LightSwitch" in conf:
+            settings.screen_on = bool(conf["LightSwitch"])
+        if not self._screen_overridden:
+            if "CurClockId" in conf:
+                settings.clock = int(conf["CurClockId"])
+            if channel is not None:
+                settings.channel = int(channel)
+        self.synced_at = datetime.now(timezone.utc)
+
+    def snapshot(self) -> dict[str, Any]:
+        """The mirrored settings as a dict."""
+        return asdict(self.settings)
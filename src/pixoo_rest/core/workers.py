@@ -0,0 +1,108 @@
+"""Worker pool for CPU-bound image conversion."""
+
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Literal, TypeVar
+
+from fastapi import HTTPException
+
+from pixoo_rest.core.metrics import metrics
+
+T = TypeVar("T")
+
+WorkerMode = Literal["thread", "process"]
+
+
+def _timed(func: Callable[..., T], *args: Any) -> tuple[T, float]:
+    """Run a job and measure it on the worker (module-level, so processes can run it)."""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+class ImageWorkers:
+    """Runs image conversions (decoding, resizing, frame encoding) off the event loop.
+
+    Jobs run on a pool of `workers` threads, which is enough where Pillow and
+    NumPy release the GIL (decoding, resizing, pixel comparisons), or of worker
+    processes (`mode="process"`), which also spread the Python parts of the work
+    over all cores at the cost of copying the file to the worker.
+
+    At most `max_pending` jobs are running or waiting at a time; further jobs
+    are rejected with 503 instead of queueing up behind a burst of large files.
+    A job that does not finish within `timeout` seconds (queueing included)
+    answers with 504. A job that has not started yet is dropped; one that has
+    keeps its worker busy until it returns.
+    """
+
+    def __init__(self, mode: WorkerMode, workers: int, max_pending: int, timeout: float):
+        self.mode = mode
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.jobs_run = 0
+        self.jobs_rejected = 0
+        self.jobs_timed_out = 0
+        self._pending = 0
+        self._executor: Executor
+        if mode == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pixoo-image")
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs running or waiting for a worker."""
+        return self._pending
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a conversion on the pool and await its result.
+
+        In process mode `func` and its arguments must be picklable (module-level
+        functions and plain data).
+
+        Raises:
+            HTTPException: 503 if too many jobs are pending, 504 if the job does not
+                finish within the configured timeout
+        """
+        if self._pending >= self.max_pending:
+            self.jobs_rejected += 1
+            raise HTTPException(status_code=503, detail="Too many images are being converted, try again later")
+
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        job = self._executor.submit(partial(_timed, func, *args))
+        self._pending += 1
+
+        def done(finished: Future) -> None:
+            # Count the job as pending until a worker is really done with it
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._job_done, finished)
+
+        job.add_done_callback(done)
+        try:
+            result, seconds = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job)), timeout=self.timeout)
+        except asyncio.TimeoutError as e:
+            self.jobs_timed_out += 1
+            job.cancel()
+            raise HTTPException(
+                status_code=504,
+                detail=f"Image conversion did not finish within {self.timeout}s"
+            ) from e
+
+        name = func.__name__.lstrip("_")
+        metrics.image_jobs.observe(seconds, job=name)
+        metrics.image_queue_wait.observe(max(0.0, time.perf_counter() - submitted - seconds), job=name)
+        return result
+
+    def close(self) -> None:
+        """Shut the pool down, dropping jobs that have not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _job_done(self, future: Future) -> None:
+        self._pending -= 1
+        if not future.cancelled():
+            self.jobs_run += 1
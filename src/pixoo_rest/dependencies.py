@@ -1,24 +1,203 @@
 """Shared FastAPI dependencies."""
 
-from fastapi import HTTPException
-from pixoo import Pixoo
+from fastapi import Depends, HTTPException, Path
+from fastapi.requests import HTTPConnection
 
+from pixoo_rest.core.cache import FrameCache
+from pixoo_rest.core.devices import Device, DeviceRegistry
+from pixoo_rest.core.discovery import LanDiscovery
+from pixoo_rest.core.divoom import DivoomCatalog
+from pixoo_rest.core.downloads import DownloadCache
+from pixoo_rest.core.http import HttpClients
+from pixoo_rest.core.playlists import PlaylistManager
+from pixoo_rest.core.scenes import SceneManager
+from pixoo_rest.core.workers import ImageWorkers
 
-# Global Pixoo device instance
-_pixoo_instance: Pixoo | None = None
+# Global registry of configured Pixoo devices
+_registry_instance: DeviceRegistry | None = None
 
+# Global LAN discovery and its device inventory
+_lan_discovery_instance: LanDiscovery | None = None
 
-def set_pixoo_instance(pixoo_instance: Pixoo) -> None:
-    """Set the global Pixoo instance."""
-    global _pixoo_instance
-    _pixoo_instance = pixoo_instance
+# Global cache of converted images and GIF frames
+_frame_cache_instance: FrameCache | None = None
 
+# Global cache of downloaded files
+_download_cache_instance: DownloadCache | None = None
 
-def get_pixoo() -> Pixoo:
-    """FastAPI dependency that provides the Pixoo instance."""
-    if _pixoo_instance is None:
+# Global pooled HTTP clients
+_http_clients_instance: HttpClients | None = None
+
+# Global cache of the Divoom cloud's dial catalog
+_divoom_catalog_instance: DivoomCatalog | None = None
+
+# Global image conversion pool
+_image_workers_instance: ImageWorkers | None = None
+
+# Global scene scheduler
+_scene_manager_instance: SceneManager | None = None
+
+# Global playlist player
+_playlist_manager_instance: PlaylistManager | None = None
+
+
+def set_device_registry(registry: DeviceRegistry | None) -> None:
+    """Set the global device registry."""
+    global _registry_instance
+    _registry_instance = registry
+
+
+def set_lan_discovery(discovery: LanDiscovery | None) -> None:
+    """Set the global LAN discovery."""
+    global _lan_discovery_instance
+    _lan_discovery_instance = discovery
+
+
+def set_frame_cache(cache: FrameCache | None) -> None:
+    """Set the global frame cache."""
+    global _frame_cache_instance
+    _frame_cache_instance = cache
+
+
+def set_download_cache(cache: DownloadCache | None) -> None:
+    """Set the global download cache."""
+    global _download_cache_instance
+    _download_cache_instance = cache
+
+
+def set_http_clients(clients: HttpClients | None) -> None:
+    """Set the global HTTP clients."""
+    global _http_clients_instance
+    _http_clients_instance = clients
+
+
+def set_divoom_catalog(catalog: DivoomCatalog | None) -> None:
+    """Set the global Divoom dial catalog."""
+    global _divoom_catalog_instance
+    _divoom_catalog_instance = catalog
+
+
+def set_image_workers(workers: ImageWorkers | None) -> None:
+    """Set the global image conversion pool."""
+    global _image_workers_instance
+    _image_workers_instance = workers
+
+
+def set_scene_manager(manager: SceneManager | None) -> None:
+    """Set the global scene manager."""
+    global _scene_manager_instance
+    _scene_manager_instance = manager
+
+
+def set_playlist_manager(manager: PlaylistManager | None) -> None:
+    """Set the global playlist manager."""
+    global _playlist_manager_instance
+    _playlist_manager_instance = manager
+
+
+def get_device_registry() -> DeviceRegistry:
+    """FastAPI dependency that provides the device registry."""
+    if _registry_instance is None:
         raise HTTPException(
             status_code=503,
             detail="Pixoo device not initialized"
         )
-    return _pixoo_instance
+    return _registry_instance
+
+
+def get_device_name(device_name: str = Path(..., description="Name of the configured Pixoo device")) -> str:
+    """Path parameter of the per-device routes (`/devices/{device_name}/...`)."""
+    return device_name
+
+
+def get_device(connection: HTTPConnection, registry: DeviceRegistry = Depends(get_device_registry)) -> Device:
+    """FastAPI dependency that provides the addressed Pixoo device.
+
+    Routes mounted below `/devices/{device_name}` address that device; all
+    other routes use the default device. Works for HTTP and WebSocket routes.
+    """
+    name = connection.path_params.get("device_name")
+    try:
+        return registry.get(name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown Pixoo device: {name}") from e
+
+
+def get_lan_discovery() -> LanDiscovery:
+    """FastAPI dependency that provides the LAN discovery."""
+    if _lan_discovery_instance is None:
+        raise HTTPException(
+            status_code=503,
+            detail="LAN discovery not initialized"
+        )
+    return _lan_discovery_instance
+
+
+def get_frame_cache() -> FrameCache:
+    """FastAPI dependency that provides the cache of converted images and GIF frames."""
+    if _frame_cache_instance is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Frame cache not initialized"
+        )
+    return _frame_cache_instance
+
+
+def get_download_cache() -> DownloadCache:
+    """FastAPI dependency that provides the cache of downloaded files."""
+    if _download_cache_instance is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Download cache not initialized"
+        )
+    return _download_cache_instance
+
+
+def get_http_clients() -> HttpClients:
+    """FastAPI dependency that provides the pooled HTTP clients."""
+    if _http_clients_instance is None:
+        raise HTTPException(
+            status_code=503,
+            detail="HTTP clients not initialized"
+        )
+    return _http_clients_instance
+
+
+def get_divoom_catalog() -> DivoomCatalog:
+    """FastAPI dependency that provides the cached Divoom dial catalog."""
+    if _divoom_catalog_instance is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Divoom catalog not initialized"
+        )
+    return _divoom_catalog_instance
+
+
+def get_image_workers() -> ImageWorkers:
+    """FastAPI dependency that provides the image conversion pool."""
+    if _image_workers_instance is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Image workers not initialized"
+        )
+    return _image_workers_instance
+
+
+def get_scene_manager() -> SceneManager:
+    """FastAPI dependency that provides the scene scheduler."""
+    if _scene_manager_instance is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Scene manager not initialized"
+        )
+    return _scene_manager_instance
+
+
+def get_playlist_manager() -> PlaylistManager:
+    """FastAPI dependency that provides the playlist player."""
+    if _playlist_manager_instance is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Playlist manager not initialized"
+        )
+    return _playlist_manager_instance
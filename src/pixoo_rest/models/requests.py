@@ -1,5 +1,8 @@
 """Pydantic models for API requests and responses."""
 
+from datetime import datetime
+from typing import Annotated, Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -19,6 +22,22 @@ class Position(BaseModel):
     y: int = Field(..., description="Y coordinate")
 
 
+class ImageQualityOptions(BaseModel):
+    """How an image is scaled and reduced for the device (unset fields use the server settings)."""
+
+    resample: Literal["nearest", "box", "bilinear", "lanczos"] | None = Field(
+        default=None,
+        description="Filter for scaling down: nearest keeps pixel art sharp, box/lanczos suit photos",
+    )
+    colors: int | None = Field(
+        default=None,
+        ge=0,
+        le=256,
+        description="Reduce to a palette of this many colors (0 keeps all colors)",
+    )
+    dither: bool | None = Field(default=None, description="Dither when reducing colors")
+
+
 # Draw endpoints
 class DrawPixelRequest(BaseModel):
     """Request model for drawing a pixel."""
@@ -91,6 +110,200 @@ class DrawTextRequest(BaseModel):
     push_immediately: bool = Field(default=True, description="Push changes immediately")
 
 
+# Batch draw operations
+#
+# Each operation reuses the schema of its single-shot /draw/* counterpart and adds a
+# `type` discriminator. The per-operation `push_immediately` flag is ignored inside a
+# batch; the batch itself decides whether to push.
+class DrawPixelOperation(DrawPixelRequest):
+    """Pixel operation within a draw batch."""
+
+    type: Literal["pixel"] = Field(..., description="Operation type")
+
+
+class DrawCharacterOperation(DrawCharacterRequest):
+    """Character operation within a draw batch."""
+
+    type: Literal["character"] = Field(..., description="Operation type")
+
+
+class DrawLineOperation(DrawLineRequest):
+    """Line operation within a draw batch."""
+
+    type: Literal["line"] = Field(..., description="Operation type")
+
+
+class DrawRectangleOperation(DrawRectangleRequest):
+    """Rectangle operation within a draw batch."""
+
+    type: Literal["rectangle"] = Field(..., description="Operation type")
+
+
+class DrawFillOperation(DrawFillRequest):
+    """Fill operation within a draw batch."""
+
+    type: Literal["fill"] = Field(..., description="Operation type")
+
+
+class DrawTextOperation(DrawTextRequest):
+    """Text operation within a draw batch."""
+
+    type: Literal["text"] = Field(..., description="Operation type")
+
+
+class DrawImageOperation(BaseModel):
+    """Image operation within a draw batch."""
+
+    type: Literal["image"] = Field(..., description="Operation type")
+    data: str = Field(..., description="Base64 encoded image file (PNG, JPEG, GIF, ...)")
+    x: int = Field(default=0, description="X coordinate")
+    y: int = Field(default=0, description="Y coordinate")
+
+
+DrawOperation = Annotated[
+    DrawPixelOperation
+    | DrawCharacterOperation
+    | DrawLineOperation
+    | DrawRectangleOperation
+    | DrawFillOperation
+    | DrawTextOperation
+    | DrawImageOperation,
+    Field(discriminator="type"),
+]
+
+
+class DrawBatchRequest(BaseModel):
+    """Request model for applying several draw operations at once."""
+
+    operations: list[DrawOperation] = Field(..., min_length=1, description="Operations, applied in order")
+    push_immediately: bool = Field(default=True, description="Push changes once all operations are drawn")
+
+
+class BroadcastBatchRequest(DrawBatchRequest):
+    """Request model for drawing one frame on several devices."""
+
+    devices: list[str] | None = Field(default=None, description="Target device names (default: all devices)")
+
+
+# Layer endpoints
+class LayerRequest(BaseModel):
+    """Request model for creating or changing a layer."""
+
+    x: int = Field(default=0, ge=0, le=63, description="X coordinate of the top-left corner")
+    y: int = Field(default=0, ge=0, le=63, description="Y coordinate of the top-left corner")
+    width: int = Field(..., ge=1, le=64, description="Layer width")
+    height: int = Field(..., ge=1, le=64, description="Layer height")
+    z: int = Field(default=0, description="Stacking order (higher is on top)")
+    opacity: float = Field(default=1.0, ge=0.0, le=1.0, description="Opacity (0 = invisible, 1 = opaque)")
+    visible: bool = Field(default=True, description="Whether the layer is shown")
+    push_immediately: bool = Field(default=True, description="Push changes immediately")
+
+
+# Scene endpoints
+class SceneSource(BaseModel):
+    """Data a scene is bound to, fetched from a URL."""
+
+    url: str = Field(..., description="URL to fetch")
+    json_path: str | None = Field(
+        default=None,
+        description="Dot-separated path into a JSON response (e.g. 'main.temp' or 'items.0.name'); "
+        "without it the whole response is used",
+    )
+    ssl_verify: bool = Field(default=True, description="Verify SSL certificates")
+
+
+class SceneTextElement(BaseModel):
+    """Text rendered from a template."""
+
+    type: Literal["text"] = Field(..., description="Element type")
+    text: str = Field(
+        ...,
+        description="Template; '{name}' inserts the source 'name', '{now:%H:%M}' the current time",
+    )
+    x: int = Field(default=0, description="X coordinate")
+    y: int = Field(default=0, description="Y coordinate")
+    r: int = Field(default=255, ge=0, le=255, description="Red component")
+    g: int = Field(default=255, ge=0, le=255, description="Green component")
+    b: int = Field(default=255, ge=0, le=255, description="Blue component")
+
+
+class SceneProgressElement(BaseModel):
+    """Horizontal progress bar."""
+
+    type: Literal["progress"] = Field(..., description="Element type")
+    value: str = Field(..., description="Template that renders to a number, e.g. '{battery}'")
+    minimum: float = Field(default=0, description="Value of an empty bar")
+    maximum: float = Field(default=100, description="Value of a full bar")
+    x: int = Field(default=0, description="X coordinate")
+    y: int = Field(default=0, description="Y coordinate")
+    width: int = Field(..., ge=1, le=64, description="Bar width")
+    height: int = Field(default=2, ge=1, le=64, description="Bar height")
+    r: int = Field(default=0, ge=0, le=255, description="Red component")
+    g: int = Field(default=255, ge=0, le=255, description="Green component")
+    b: int = Field(default=0, ge=0, le=255, description="Blue component")
+    background: RGBColor = Field(default=RGBColor(r=40, g=40, b=40), description="Color of the empty part")
+
+
+class SceneImageElement(BaseModel):
+    """Image loaded from a source."""
+
+    type: Literal["image"] = Field(..., description="Element type")
+    source: str = Field(..., description="Name of the source that returns the image file")
+    x: int = Field(default=0, description="X coordinate")
+    y: int = Field(default=0, description="Y coordinate")
+
+
+SceneElement = Annotated[
+    SceneTextElement | SceneProgressElement | SceneImageElement,
+    Field(discriminator="type"),
+]
+
+
+class SceneRequest(BaseModel):
+    """Request model for creating or replacing a scene."""
+
+    x: int = Field(default=0, ge=0, le=63, description="X coordinate of the scene's top-left corner")
+    y: int = Field(default=0, ge=0, le=63, description="Y coordinate of the scene's top-left corner")
+    width: int = Field(default=64, ge=1, le=64, description="Scene width")
+    height: int = Field(default=64, ge=1, le=64, description="Scene height")
+    z: int = Field(default=0, description="Stacking order of the scene's layer (higher is on top)")
+    background: RGBColor = Field(default=RGBColor(r=0, g=0, b=0), description="Background color")
+    sources: dict[str, SceneSource] = Field(default_factory=dict, description="Data sources by name")
+    elements: list[SceneElement] = Field(..., min_length=1, description="Elements, drawn in order")
+    interval: float = Field(
+        default=60,
+        ge=1,
+        description="Seconds between refreshes; refreshes are aligned to multiples of it (60 = every full minute)",
+    )
+
+
+# Playlist endpoints
+class PlaylistItem(ImageQualityOptions):
+    """An image or GIF shown by a playlist."""
+
+    url: str = Field(..., description="URL of the image or GIF")
+    duration: float = Field(default=10, gt=0, description="Seconds to show the item")
+    speed: int | None = Field(
+        default=None,
+        ge=1,
+        description="Milliseconds per GIF frame (default: the GIF's own timing)",
+    )
+    skip_first_frame: bool = Field(default=False, description="Skip first frame (GIFs only)")
+    ssl_verify: bool = Field(default=True, description="Verify SSL certificates")
+
+
+class PlaylistRequest(BaseModel):
+    """Request model for creating or replacing a playlist."""
+
+    items: list[PlaylistItem] = Field(..., min_length=1, description="Items, shown in order and repeated")
+    autostart: bool = Field(default=True, description="Start playing right away")
+    max_age: float = Field(
+        default=300,
+        ge=0,
+        description="Seconds an item's download is reused before it is checked for changes",
+    )
+
+
 # Send endpoints
 class SendTextRequest(BaseModel):
     """Request model for sending scrolling text."""
@@ -117,17 +330,26 @@ class SendImageUrlRequest(BaseModel):
 
 
 # Download endpoints
-class DownloadGifRequest(BaseModel):
+class DownloadGifRequest(ImageQualityOptions):
     """Request model for downloading and displaying a GIF."""
 
     url: str = Field(..., description="URL of the GIF to download")
-    speed: int = Field(default=100, ge=1, description="Animation speed")
+    speed: int | None = Field(
+        default=None,
+        ge=1,
+        description="Milliseconds per frame (default: the GIF's own timing)",
+    )
     skip_first_frame: bool = Field(default=False, description="Skip first frame")
     timeout: int = Field(default=30, ge=1, description="Download timeout in seconds")
     ssl_verify: bool = Field(default=True, description="Verify SSL certificates")
+    max_age: float | None = Field(
+        default=None,
+        ge=0,
+        description="Reuse an earlier download of the URL younger than this many seconds (default: server setting)",
+    )
 
 
-class DownloadImageRequest(BaseModel):
+class DownloadImageRequest(ImageQualityOptions):
     """Request model for downloading and displaying an image."""
 
     url: str = Field(..., description="URL of the image to download")
@@ -135,6 +357,11 @@ class DownloadImageRequest(BaseModel):
     y: int = Field(default=0, description="Y coordinate")
     timeout: int = Field(default=30, ge=1, description="Download timeout in seconds")
     ssl_verify: bool = Field(default=True, description="Verify SSL certificates")
+    max_age: float | None = Field(
+        default=None,
+        ge=0,
+        description="Reuse an earlier download of the URL younger than this many seconds (default: server setting)",
+    )
     push_immediately: bool = Field(default=True, description="Push changes immediately")
 
 
@@ -157,10 +384,14 @@ class DownloadTextRequest(BaseModel):
 
 
 # Image/GIF upload endpoints
-class SendGifRequest(BaseModel):
+class SendGifRequest(ImageQualityOptions):
     """Request model for sending a GIF."""
 
-    speed: int = Field(default=100, ge=1, description="Animation speed")
+    speed: int | None = Field(
+        default=None,
+        ge=1,
+        description="Milliseconds per frame (default: the GIF's own timing)",
+    )
     skip_first_frame: bool = Field(default=False, description="Skip first frame")
 
 
@@ -177,6 +408,16 @@ class SetScreenRequest(BaseModel):
     screen: bool = Field(..., description="Screen state (true=on, false=off)")
 
 
+class DeviceStateRequest(BaseModel):
+    """Request model for changing several settings in one device round trip."""
+
+    brightness: int | None = Field(default=None, ge=0, le=100, description="Brightness level (0-100)")
+    channel: int | None = Field(default=None, ge=0, le=4, description="Channel number")
+    clock: int | None = Field(default=None, ge=0, description="Clock face ID")
+    visualizer: int | None = Field(default=None, ge=0, description="Visualizer number")
+    screen_on: bool | None = Field(default=None, description="Screen state (true=on, false=off)")
+
+
 # Response models
 class SuccessResponse(BaseModel):
     """Standard success response."""
@@ -185,6 +426,13 @@ class SuccessResponse(BaseModel):
     message: str = Field(default="OK", description="Response message")
 
 
+class GifUploadResponse(SuccessResponse):
+    """Response of an image/GIF upload to the device."""
+
+    frames: int = Field(..., description="Number of frames sent to the device")
+    upload_ms: float = Field(..., description="Time taken to convert and send the frames (milliseconds)")
+
+
 class ErrorResponse(BaseModel):
     """Standard error response."""
 
@@ -193,11 +441,179 @@ class ErrorResponse(BaseModel):
     detail: str | None = Field(None, description="Detailed error information")
 
 
+class DeviceHealth(BaseModel):
+    """Reachability of a device."""
+
+    host: str = Field(..., description="Device hostname/IP")
+    reachable: bool = Field(..., description="Whether the device answered its last probes")
+    latency_ms: float | None = Field(default=None, description="Response time of the last successful probe")
+    last_seen: datetime | None = Field(default=None, description="Time of the last successful probe (UTC)")
+    last_error: str | None = Field(default=None, description="Error of the last failed probe")
+
+
 class HealthCheckResponse(BaseModel):
     """Health check endpoint response."""
 
-    status: str = Field(..., description="Health status (healthy/unhealthy)")
+    status: str = Field(..., description="Health status (healthy/degraded/unhealthy)")
     pixoo_host: str = Field(..., description="Configured Pixoo device hostname/IP")
+    devices: dict[str, DeviceHealth] = Field(default_factory=dict, description="Reachability per device name")
+
+
+class QueueStats(BaseModel):
+    """Statistics of a device command queue."""
+
+    depth: int = Field(..., description="Commands waiting to be executed")
+    commands_run: int = Field(..., description="Commands executed so far")
+    pushes_requested: int = Field(..., description="Pushes requested by clients")
+    pushes_sent: int = Field(..., description="Pushes actually sent to the device")
+    pushes_dropped: int = Field(..., description="Pushes merged into a newer frame")
+    pushes_skipped: int = Field(..., description="Pushes skipped because the frame was unchanged")
+
+
+class DeviceStateResponse(BaseModel):
+    """Settings of a device as mirrored by the server (null where unknown)."""
+
+    brightness: int | None = Field(default=None, description="Brightness level (0-100)")
+    channel: int | None = Field(default=None, description="Channel number (unknown while an image or GIF is shown)")
+    clock: int | None = Field(default=None, description="Clock face ID")
+    visualizer: int | None = Field(default=None, description="Visualizer number (only known after it was set)")
+    screen_on: bool | None = Field(default=None, description="Screen state")
+    synced_at: datetime | None = Field(default=None, description="Last time the settings were read from the device (UTC)")
+    writes_sent: int = Field(..., description="Setting changes sent to the device")
+    writes_skipped: int = Field(..., description="Setting changes skipped because the device already had the value")
+    sent: int | None = Field(default=None, description="Settings sent by this request")
+
+
+class GifSlotStats(BaseModel):
+    """Statistics of a device's animation IDs."""
+
+    resets: int = Field(..., description="Times the device's animation IDs were reset")
+    mismatches: int = Field(
+        ...,
+        description="Times the device reported an unexpected animation ID (rebooted or changed elsewhere)",
+    )
+
+
+class DeviceStats(BaseModel):
+    """Runtime statistics of a single device."""
+
+    queue: QueueStats = Field(..., description="Device command queue statistics")
+    gif_slots: GifSlotStats = Field(..., description="Animation ID statistics")
+
+
+class CacheStats(BaseModel):
+    """Statistics of the converted image/GIF frame cache."""
+
+    hits: int = Field(..., description="Lookups answered from the cache")
+    misses: int = Field(..., description="Lookups that required a conversion")
+    entries: int = Field(..., description="Entries held in memory")
+    bytes: int = Field(..., description="Payload bytes held in memory")
+    disk_entries: int = Field(..., description="Entries held on disk")
+    disk_bytes: int = Field(..., description="Bytes held on disk")
+
+
+class DownloadCacheStats(BaseModel):
+    """Statistics of the download cache."""
+
+    fresh: int = Field(..., description="Downloads reused without contacting the server")
+    revalidated: int = Field(..., description="Downloads confirmed unchanged by the server (304)")
+    downloaded: int = Field(..., description="Files actually downloaded")
+    coalesced: int = Field(..., description="Requests that joined a download already in progress")
+    entries: int = Field(..., description="Files held in memory")
+    bytes: int = Field(..., description="Bytes held in memory")
+
+
+class DivoomCatalogStats(BaseModel):
+    """Statistics of the Divoom dial catalog cache."""
+
+    hits: int = Field(..., description="Requests answered from the cache")
+    stale: int = Field(..., description="Requests answered from an outdated entry while it was refreshed")
+    misses: int = Field(..., description="Requests that waited for the Divoom cloud")
+    errors: int = Field(..., description="Failed requests to the Divoom cloud")
+    entries: int = Field(..., description="Cached dial types and dial list pages")
+
+
+class ImageWorkerStats(BaseModel):
+    """Statistics of the image conversion pool."""
+
+    mode: str = Field(..., description="Pool type (thread or process)")
+    workers: int = Field(..., description="Number of workers")
+    pending: int = Field(..., description="Conversions running or waiting")
+    jobs_run: int = Field(..., description="Conversions finished so far")
+    jobs_rejected: int = Field(..., description="Conversions rejected because the queue was full")
+    jobs_timed_out: int = Field(..., description="Conversions that exceeded the timeout")
+
+
+class StatsResponse(BaseModel):
+    """Runtime statistics endpoint response."""
+
+    devices: dict[str, DeviceStats] = Field(..., description="Statistics per device name")
+    frame_cache: CacheStats = Field(..., description="Converted image/GIF frame cache statistics")
+    download_cache: DownloadCacheStats = Field(..., description="Download cache statistics")
+    divoom_catalog: DivoomCatalogStats = Field(..., description="Divoom dial catalog cache statistics")
+    image_workers: ImageWorkerStats = Field(..., description="Image conversion pool statistics")
+
+
+class DeviceInfo(BaseModel):
+    """A configured Pixoo device."""
+
+    name: str = Field(..., description="Device name")
+    host: str = Field(..., description="Device hostname/IP")
+    screen_size: int = Field(..., description="Screen size in pixels")
+    default: bool = Field(..., description="Whether the un-prefixed routes address this device")
+
+
+class DiscoveredDeviceInfo(BaseModel):
+    """A Pixoo device found on the local network."""
+
+    host: str = Field(..., description="Device IP address (with port, if not 80)")
+    device: str | None = Field(default=None, description="Name of the configured device using this host, if any")
+    latency_ms: float = Field(..., description="Response time of the last discovery probe")
+    first_seen: datetime = Field(..., description="Time the device was first found (UTC)")
+    last_seen: datetime = Field(..., description="Time the device last answered a probe (UTC)")
+    conf: dict = Field(default_factory=dict, description="Settings reported by the device (Channel/GetAllConf)")
+
+
+class LayerInfo(BaseModel):
+    """A layer of a device."""
+
+    name: str = Field(..., description="Layer name")
+    x: int = Field(..., description="X coordinate of the top-left corner")
+    y: int = Field(..., description="Y coordinate of the top-left corner")
+    width: int = Field(..., description="Layer width")
+    height: int = Field(..., description="Layer height")
+    z: int = Field(..., description="Stacking order (higher is on top)")
+    opacity: float = Field(..., description="Opacity")
+    visible: bool = Field(..., description="Whether the layer is shown")
+
+
+class SceneInfo(BaseModel):
+    """A scene of a device and its refresh statistics."""
+
+    name: str = Field(..., description="Scene name (also the name of its layer)")
+    interval: float = Field(..., description="Seconds between refreshes")
+    refreshes: int = Field(..., description="Refreshes so far")
+    renders: int = Field(..., description="Refreshes that changed the scene and were drawn")
+    last_error: str | None = Field(default=None, description="Error of the last refresh, if it failed")
+
+
+class PlaylistInfo(BaseModel):
+    """A playlist of a device and its playback state."""
+
+    name: str = Field(..., description="Playlist name")
+    items: int = Field(..., description="Number of items")
+    playing: bool = Field(..., description="Whether the playlist is playing")
+    position: int = Field(..., description="Index of the item shown (or shown next)")
+    prepared: int = Field(..., description="Items whose device payload is ready")
+    rotations: int = Field(..., description="Items shown so far")
+    last_error: str | None = Field(default=None, description="Error of the last item that failed, if any")
+
+
+class BroadcastResponse(SuccessResponse):
+    """Response of a broadcast to several devices."""
+
+    devices: list[str] = Field(..., description="Devices that received the frame")
+    failed: dict[str, str] = Field(default_factory=dict, description="Error message per failed device")
 
 
 class RootResponse(BaseModel):
@@ -253,3 +669,19 @@ class DivoomDialListResponse(DivoomApiResponse):
         description="List of available dials/clocks for the specified type"
     )
     total_num: int = Field(default=0, alias="TotalNum", description="Total number of available dials")
+
+
+class DivoomDialPrefetchResponse(SuccessResponse):
+    """Response of a dial list prefetch."""
+
+    dial_type: str = Field(..., description="Dial type that is loaded")
+    pages: int | None = Field(
+        default=None,
+        description="Pages of the dial type now held in the cache (null while loading in the background)",
+    )
+
+
+class DivoomDialFindResponse(BaseModel):
+    """Dials found in the cached dial lists."""
+
+    dials: list[dict] = Field(default_factory=list, description="Matching dials as returned by the Divoom API")
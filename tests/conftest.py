@@ -0,0 +1,80 @@
+"""Shared fixtures: a local HTTP server answering with stubbed JSON responses."""
+
+import json
+import threading
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pytest
+
+# Answers a request (method, path, JSON body) with a status code and a JSON body
+Responder = Callable[[str, str, Any], tuple[int, Any]]
+
+
+class StubServer:
+    """HTTP server on a free local port that records requests and answers them with `responder`."""
+
+    def __init__(self, responder: Responder):
+        self.responder = responder
+        self.requests: list[tuple[str, str, Any]] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _answer(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                stub.requests.append((self.command, self.path, body))
+                status, answer = stub.responder(self.command, self.path, body)
+                data = json.dumps(answer).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _answer
+            do_POST = _answer
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def host(self) -> str:
+        """`host:port` of the server."""
+        address, port = self._server.server_address[:2]
+        return f"{address}:{port}"
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}"
+
+    def paths(self, method: str = "POST") -> list[str]:
+        """Paths of the requests received so far with the given method."""
+        return [path for received, path, _ in self.requests if received == method]
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub_server() -> Iterator[Callable[[Responder], StubServer]]:
+    """Start stub servers for the test; they are stopped afterwards."""
+    servers: list[StubServer] = []
+
+    def start(responder: Responder) -> StubServer:
+        server = StubServer(responder)
+        server.start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
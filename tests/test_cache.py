@@ -0,0 +1,68 @@
+"""Tests of the frame cache."""
+
+import asyncio
+
+from pixoo_rest.core.cache import FrameCache
+from pixoo_rest.core.imaging import GifFrames, PreparedImage
+
+
+def _image(fill: int) -> PreparedImage:
+    """10x10 image of 300 bytes."""
+    return PreparedImage(10, 10, bytes([fill]) * 300)
+
+
+def test_least_recently_used_entry_is_evicted():
+    async def run():
+        cache = FrameCache(max_bytes=700)
+        await cache.put("a", _image(1))
+        await cache.put("b", _image(2))
+        assert await cache.get("a") == _image(1)
+        await cache.put("c", _image(3))
+        assert (cache.entries, cache.nbytes) == (2, 600)
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == _image(1)
+        assert await cache.get("c") == _image(3)
+        assert (cache.hits, cache.misses) == (3, 1)
+
+        # Larger than the whole cache: not stored, and nothing is evicted for it
+        await cache.put("huge", PreparedImage(20, 20, bytes(1200)))
+        assert await cache.get("huge") is None
+        assert cache.entries == 2
+
+    asyncio.run(run())
+
+
+def test_evicted_entries_are_read_back_from_disk(tmp_path):
+    gif = GifFrames(16, ["AAAA", "BBBB"], speed=80)
+
+    async def run():
+        cache = FrameCache(max_bytes=400, disk_path=str(tmp_path), max_disk_bytes=1 << 20)
+        await cache.put("gif", gif)
+        await cache.put("a", _image(1))
+        await cache.put("b", _image(2))
+        assert cache.entries == 1
+        assert cache.disk_entries == 3
+
+        assert await cache.get("a") == _image(1)
+        assert await cache.get("gif") == gif
+
+        # A new cache finds the entries of the previous one
+        reopened = FrameCache(max_bytes=400, disk_path=str(tmp_path), max_disk_bytes=1 << 20)
+        assert reopened.disk_entries == 3
+        assert await reopened.get("b") == _image(2)
+
+    asyncio.run(run())
+
+
+def test_disk_tier_keeps_at_most_max_disk_bytes(tmp_path):
+    async def run():
+        cache = FrameCache(max_bytes=0, disk_path=str(tmp_path), max_disk_bytes=800)
+        for key in "abc":
+            await cache.put(key, _image(ord(key)))
+        assert cache.disk_entries == 2
+        assert cache.disk_bytes <= 800
+        assert sorted(path.stem for path in tmp_path.iterdir()) == ["b", "c"]
+        assert await cache.get("a") is None
+
+    asyncio.run(run())
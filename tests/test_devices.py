@@ -0,0 +1,148 @@
+"""Tests of the device model against a stub Pixoo."""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from pixoo_rest.core.devices import Device, DeviceExecutor
+
+
+def _pixoo(state: dict):
+    """Stub of a Pixoo's animation commands; `state["PicId"]` is the animation it plays."""
+    def respond(method: str, path: str, body):
+        command = body["Command"]
+        if command == "Draw/SendHttpGif":
+            state["PicId"] = body["PicID"]
+        elif command == "Draw/ResetHttpGifId":
+            state["PicId"] = 0
+        return 200, {"error_code": 0, "PicId": state["PicId"]}
+
+    return respond
+
+
+def _sent(server) -> list[str]:
+    return [body["Command"] for _, _, body in server.requests if body["Command"] != "Draw/GetHttpGifId"]
+
+
+async def _connected(host: str) -> Device:
+    device = Device("test", host, 16, False, timeout=5.0)
+    device.executor.start()
+    device.reachable = True
+    return device
+
+
+def test_calls_run_one_at_a_time_in_submission_order():
+    async def run():
+        executor = DeviceExecutor(timeout=5.0)
+        executor.start()
+        ran: list[int] = []
+        threads: set[str] = set()
+
+        def call(number: int) -> int:
+            ran.append(number)
+            threads.add(threading.current_thread().name)
+            return number * 10
+
+        assert await asyncio.gather(*(executor.run(call, number) for number in range(5))) == [0, 10, 20, 30, 40]
+        assert ran == [0, 1, 2, 3, 4]
+        # Every call ran on the device's own thread
+        assert len(threads) == 1
+        assert threading.current_thread().name not in threads
+        await executor.close()
+
+    asyncio.run(run())
+
+
+def test_queued_pushes_are_coalesced_into_the_latest():
+    async def run():
+        executor = DeviceExecutor(timeout=5.0)
+        executor.start()
+        busy = threading.Event()
+        pushed: list[str] = []
+
+        # Keep the worker busy while the pushes queue up behind it
+        blocking = asyncio.ensure_future(executor.run(busy.wait))
+        pushes = [asyncio.ensure_future(executor.push(lambda frame=frame: pushed.append(frame))) for frame in "abc"]
+        await asyncio.sleep(0.05)
+        busy.set()
+        await asyncio.gather(blocking, *pushes)
+
+        # Callers of the dropped pushes were answered by the latest frame
+        assert pushed == ["c"]
+        assert (executor.pushes_requested, executor.pushes_sent, executor.pushes_dropped) == (3, 1, 2)
+        await executor.close()
+
+    asyncio.run(run())
+
+
+def test_call_that_timed_out_while_queued_is_skipped():
+    async def run():
+        executor = DeviceExecutor(timeout=0.1)
+        executor.start()
+        busy = threading.Event()
+        ran: list[str] = []
+
+        blocking = asyncio.ensure_future(executor.run(busy.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as raised:
+            await executor.run(ran.append, "late")
+        assert raised.value.status_code == 504
+        busy.set()
+        with pytest.raises(HTTPException):
+            await blocking
+
+        # The worker moves on to the next call without running the abandoned one
+        assert await executor.run(lambda: "next") == "next"
+        assert ran == []
+        await executor.close()
+
+    asyncio.run(run())
+
+
+def test_unchanged_push_is_skipped_while_the_device_shows_it(stub_server):
+    state = {"PicId": 0}
+    server = stub_server(_pixoo(state))
+
+    async def run():
+        device = await _connected(server.host)
+        await device.run(device.canvas.fill, 255, 0, 0)
+        await device.push()
+        await device.push()
+        assert device.pushes_skipped == 1
+        assert _sent(server) == ["Draw/ResetHttpGifId", "Draw/SendHttpGif"]
+
+        # The device was rebooted (or showed something else) in the meantime
+        state["PicId"] = 0
+        await device.push()
+        assert device.pushes_skipped == 1
+        assert _sent(server)[-1] == "Draw/SendHttpGif"
+        assert len(_sent(server)) == 4
+        await device.close()
+
+    asyncio.run(run())
+
+
+def test_async_call_is_cancelled_at_its_timeout():
+    async def run():
+        executor = DeviceExecutor(timeout=5.0)
+        executor.start()
+        cancelled = asyncio.Event()
+
+        async def hung_upload():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(HTTPException) as raised:
+            await executor.run_async(hung_upload, timeout=0.1)
+        assert raised.value.status_code == 504
+        # The queue is free again for the next command
+        assert await executor.run(lambda: "next") == "next"
+        assert cancelled.is_set()
+        await executor.close()
+
+    asyncio.run(run())
@@ -0,0 +1,125 @@
+"""Tests of LAN discovery against stub Pixoo devices."""
+
+import asyncio
+import socket
+
+import httpx
+import pytest
+
+from pixoo_rest.core.config import Settings
+from pixoo_rest.core.devices import AUTO_HOST, Device, DeviceRegistry
+from pixoo_rest.core.discovery import MAX_SCAN_HOSTS, LanDiscovery, expand_targets
+
+CONF = {"Brightness": 80, "RotationFlag": 0, "ClockTime": 60, "LightSwitch": 1}
+
+
+def _pixoo(method: str, path: str, body):
+    """Stub of a Pixoo's HTTP API."""
+    if method == "GET":
+        return 200, {}
+    command = body["Command"]
+    if command == "Channel/GetAllConf":
+        return 200, {"error_code": 0, **CONF}
+    if command == "Channel/GetIndex":
+        return 200, {"error_code": 0, "SelectIndex": 3}
+    if command == "Draw/GetHttpGifId":
+        return 200, {"error_code": 0, "PicId": 1}
+    return 200, {"error_code": 0}
+
+
+def _not_a_pixoo(method: str, path: str, body):
+    return 404, {"detail": "Not Found"}
+
+
+def _closed_host() -> str:
+    """`host:port` where nothing listens."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{sock.getsockname()[1]}"
+
+
+def test_expand_targets():
+    assert expand_targets(["192.168.1.0/30", " 192.168.1.1 ", "", "pixoo:8080"]) == [
+        "192.168.1.1",
+        "192.168.1.2",
+        "pixoo:8080",
+    ]
+    assert expand_targets(["10.0.0.7/32"]) == ["10.0.0.7"]
+    with pytest.raises(ValueError):
+        expand_targets(["10.0.0.0/8"])
+    with pytest.raises(ValueError):
+        expand_targets(["10.0.0.0/20", "10.1.0.0/20"])
+    assert len(expand_targets(["10.0.0.0/20"])) == MAX_SCAN_HOSTS - 2
+
+
+def test_scan_keeps_only_pixoo_devices(stub_server):
+    pixoo = stub_server(_pixoo)
+    other = stub_server(_not_a_pixoo)
+    targets = [other.host, _closed_host(), pixoo.host]
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            discovery = LanDiscovery(client, targets, timeout=1.0, ttl=60, concurrency=2)
+            # Concurrent scans share one run
+            first, second = await asyncio.gather(discovery.scan(), discovery.scan())
+            assert first == second
+            assert [device.host for device in first] == [pixoo.host]
+            assert first[0].conf == CONF
+            assert (discovery.scans, discovery.probes) == (1, 3)
+
+            # The inventory is reused within the TTL
+            assert [device.host for device in await discovery.devices()] == [pixoo.host]
+            assert discovery.probes == 3
+            await discovery.devices(refresh=True)
+            assert discovery.probes == 6
+            await discovery.close()
+
+    asyncio.run(run())
+    assert pixoo.requests[0] == ("POST", "/post", {"Command": "Channel/GetAllConf"})
+
+
+def test_devices_are_dropped_after_the_ttl(stub_server):
+    pixoo = stub_server(_pixoo)
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            discovery = LanDiscovery(client, [pixoo.host], timeout=1.0, ttl=0.2, concurrency=1)
+            await discovery.scan()
+            assert len(discovery.inventory) == 1
+            await asyncio.sleep(0.3)
+            assert discovery.inventory == []
+            await discovery.close()
+
+    asyncio.run(run())
+
+
+def test_auto_device_is_assigned_a_discovered_host(stub_server):
+    pixoo = stub_server(_pixoo)
+    other = stub_server(_not_a_pixoo)
+    settings = Settings(
+        _env_file=None,
+        pixoo_probe_interval=0.1,
+        pixoo_probe_timeout=1.0,
+        pixoo_reconnect_min_delay=0.05,
+        pixoo_reconnect_max_delay=0.1,
+    )
+
+    async def run():
+        device = Device("auto", AUTO_HOST, 64, False, timeout=2.0)
+        registry = DeviceRegistry([device])
+        async with httpx.AsyncClient() as client:
+            discovery = LanDiscovery(client, [other.host, pixoo.host], timeout=1.0, ttl=60, concurrency=4)
+            registry.start(client, settings, discovery)
+            for _ in range(100):
+                if device.reachable:
+                    break
+                await asyncio.sleep(0.05)
+            try:
+                assert device.host == pixoo.host
+                assert device.reachable
+            finally:
+                await registry.close()
+                await discovery.close()
+
+    asyncio.run(run())
+    assert ("GET", "/get", None) in pixoo.requests
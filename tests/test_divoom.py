@@ -0,0 +1,126 @@
+"""Tests of the cached Divoom cloud catalog against a stub cloud."""
+
+import asyncio
+import math
+
+import httpx
+
+from pixoo_rest.core.divoom import DivoomCatalog
+
+DIALS = [{"ClockId": clock_id, "Name": f"Game face {clock_id}"} for clock_id in range(1, 46)]
+PAGE_SIZE = 20
+
+
+def _cloud(state: dict):
+    """Stub of the cloud's dial endpoints; `state` switches failures and counts type requests."""
+    def respond(method: str, path: str, body):
+        if state.get("failing"):
+            return 500, {}
+        if path == "/Channel/GetDialType":
+            state["types"] = state.get("types", 0) + 1
+            return 200, {"error_code": 0, "DialTypeList": [{"Type": "Game"}], "Version": state["types"]}
+        if path == "/Channel/GetDialList" and body["DialType"] == "Game":
+            page = body["Page"]
+            dials = DIALS[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+            return 200, {"error_code": 0, "TotalNum": len(DIALS), "DialList": dials}
+        return 200, {"error_code": 1}
+
+    return respond
+
+
+def test_stale_answer_is_served_while_refreshing(stub_server):
+    state: dict = {}
+    cloud = stub_server(_cloud(state))
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            catalog = DivoomCatalog(client, cloud.url, max_age=0.2, max_stale=60)
+            first = await catalog.dial_types()
+            assert (await catalog.dial_types())["Version"] == first["Version"] == 1
+            assert (catalog.misses, catalog.hits) == (1, 1)
+
+            await asyncio.sleep(0.3)
+            # Outdated: answered from the cache while a refresh runs in the background
+            assert (await catalog.dial_types())["Version"] == 1
+            assert catalog.stale == 1
+            await asyncio.gather(*catalog._pending.values())
+            assert (await catalog.dial_types())["Version"] == 2
+
+            await asyncio.sleep(0.3)
+            state["failing"] = True
+            # A failing cloud is bridged with the stale answer
+            assert (await catalog.dial_types())["Version"] == 2
+            await asyncio.gather(*catalog._pending.values(), return_exceptions=True)
+            assert catalog.errors == 1
+            await catalog.close()
+
+    asyncio.run(run())
+    assert cloud.paths().count("/Channel/GetDialType") == 3
+
+
+def test_concurrent_requests_share_one_cloud_request(stub_server):
+    cloud = stub_server(_cloud({}))
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            catalog = DivoomCatalog(client, cloud.url, max_age=60, max_stale=0)
+            answers = await asyncio.gather(*(catalog.dial_list("Game", 1) for _ in range(5)))
+            assert all(answer == answers[0] for answer in answers)
+            await catalog.close()
+
+    asyncio.run(run())
+    assert cloud.paths() == ["/Channel/GetDialList"]
+
+
+def test_prefetch_loads_all_pages_and_find_searches_them(stub_server):
+    cloud = stub_server(_cloud({}))
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            catalog = DivoomCatalog(client, cloud.url, max_age=60, max_stale=0)
+            assert await catalog.prefetch("Game") == math.ceil(len(DIALS) / PAGE_SIZE)
+            assert catalog.entries == 3
+
+            found = await catalog.find("face 42")
+            assert [dial["ClockId"] for dial in found] == [42]
+            assert [dial["ClockId"] for dial in await catalog.find("44", "Game")] == [44]
+            await catalog.close()
+
+    asyncio.run(run())
+    # Prefetching again for `find` was answered from the cache
+    assert len(cloud.paths()) == 3
+
+
+def test_error_answers_are_not_cached(stub_server):
+    cloud = stub_server(_cloud({}))
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            catalog = DivoomCatalog(client, cloud.url, max_age=60, max_stale=0)
+            assert (await catalog.dial_list("Unknown", 1))["error_code"] == 1
+            assert (await catalog.dial_list("Unknown", 1))["error_code"] == 1
+            assert catalog.entries == 0
+            assert catalog.errors == 2
+            await catalog.close()
+
+    asyncio.run(run())
+
+
+def test_cache_keeps_at_most_max_entries(stub_server):
+    cloud = stub_server(_cloud({}))
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            catalog = DivoomCatalog(client, cloud.url, max_age=60, max_stale=0, max_entries=2)
+            for page in (1, 2, 3):
+                await catalog.dial_list("Game", page)
+            assert catalog.entries == 2
+
+            # The least recently used page was dropped and is fetched again
+            await catalog.dial_list("Game", 1)
+            assert catalog.misses == 4
+            await catalog.dial_list("Game", 3)
+            assert catalog.hits == 1
+            await catalog.close()
+
+    asyncio.run(run())
@@ -0,0 +1,87 @@
+"""Tests of the download cache and the text download endpoint."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from pixoo_rest.api.download import download_text
+from pixoo_rest.core.devices import Device
+from pixoo_rest.core.downloads import DownloadCache
+from pixoo_rest.models.requests import DownloadTextRequest
+
+
+def _files(requests: list[httpx.Request]):
+    """Mock server whose files are their path repeated 100 times, with the path as ETag."""
+    def respond(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        etag = f'"{request.url.path}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, content=request.url.path.encode() * 100, headers={"ETag": etag})
+
+    return httpx.MockTransport(respond)
+
+
+def test_outdated_file_is_revalidated():
+    requests: list[httpx.Request] = []
+
+    async def run():
+        async with httpx.AsyncClient(transport=_files(requests)) as client:
+            cache = DownloadCache(max_age=60, max_bytes=1 << 20, max_content_bytes=1 << 20)
+            content = await cache.fetch(client, "http://files/a")
+            assert await cache.fetch(client, "http://files/a") == content
+            assert (cache.downloaded, cache.fresh) == (1, 1)
+
+            # Older than max_age: a conditional request answered with 304 keeps the content
+            assert await cache.fetch(client, "http://files/a", max_age=0) == content
+            assert cache.revalidated == 1
+            assert cache.downloaded == 1
+
+    asyncio.run(run())
+    assert [request.headers.get("If-None-Match") for request in requests] == [None, '"/a"']
+
+
+def test_least_recently_used_file_is_evicted():
+    requests: list[httpx.Request] = []
+
+    async def run():
+        async with httpx.AsyncClient(transport=_files(requests)) as client:
+            # Room for two of the 200-byte files
+            cache = DownloadCache(max_age=60, max_bytes=500, max_content_bytes=1 << 20)
+            await cache.fetch(client, "http://files/a")
+            await cache.fetch(client, "http://files/b")
+            await cache.fetch(client, "http://files/a")
+            await cache.fetch(client, "http://files/c")
+            assert (cache.entries, cache.nbytes) == (2, 400)
+
+            # "b" was dropped and is downloaded again (dropping "a"); "c" is still cached
+            await cache.fetch(client, "http://files/b")
+            await cache.fetch(client, "http://files/c")
+            assert (cache.downloaded, cache.fresh) == (4, 2)
+
+            # Larger than the whole cache: passed through, not stored
+            small = DownloadCache(max_age=60, max_bytes=100, max_content_bytes=1 << 20)
+            await small.fetch(client, "http://files/a")
+            assert (small.entries, small.nbytes) == (0, 0)
+
+    asyncio.run(run())
+    assert [request.url.path for request in requests] == ["/a", "/b", "/c", "/b", "/a"]
+
+
+def test_text_download_rejected_by_the_device_is_a_bad_gateway(stub_server):
+    server = stub_server(lambda method, path, body: (200, {"error_code": 1}))
+    request = DownloadTextRequest(url="http://example.com/text", r=255, g=255, b=255)
+
+    async def run():
+        device = Device("test", server.host, 64, False, timeout=5.0)
+        device.executor.start()
+        device.reachable = True
+        with pytest.raises(HTTPException) as raised:
+            await download_text(request, device)
+        assert raised.value.status_code == 502
+        assert "'error_code': 1" in raised.value.detail
+        await device.close()
+
+    asyncio.run(run())
@@ -0,0 +1,62 @@
+"""Tests of the GIF conversion."""
+
+import base64
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from pixoo_rest.core.imaging import MAX_GIF_FRAMES, GifFrames, encode_gif
+
+RED, GREEN, BLUE = (255, 0, 0), (0, 255, 0), (0, 0, 255)
+
+
+def _gif(colors: list[tuple[int, int, int]], durations: list[int]) -> Image.Image:
+    """Animated GIF of solid 8x8 frames."""
+    frames = [Image.new("RGB", (8, 8), color) for color in colors]
+    buffer = BytesIO()
+    frames[0].save(buffer, format="GIF", save_all=True, append_images=frames[1:], duration=durations, loop=0)
+    return Image.open(BytesIO(buffer.getvalue()))
+
+
+def _shown(gif: GifFrames) -> list[tuple[int, int, int]]:
+    """Color of each frame sent to the device."""
+    return [tuple(int(value) for value in np.frombuffer(base64.b64decode(frame), np.uint8)[:3]) for frame in gif.frames]
+
+
+def test_frames_are_sampled_on_a_grid_of_the_shortest_duration():
+    encoded = encode_gif(_gif([RED, GREEN, BLUE], [100, 300, 200]), 8, skip_first_frame=False)
+    # One 100 ms step per frame shown; longer frames are repeated
+    assert _shown(encoded) == [RED, GREEN, GREEN, GREEN, BLUE, BLUE]
+    assert encoded.speed == 100
+    assert encoded.width == 8
+
+    # A given speed replaces the GIF's timing
+    encoded = encode_gif(_gif([RED, GREEN, BLUE], [100, 300, 200]), 8, skip_first_frame=True, speed=50)
+    assert _shown(encoded) == [GREEN, BLUE]
+    assert encoded.speed == 50
+
+
+def test_long_animations_are_sampled_over_their_whole_length():
+    colors = [(index * 2, 0, 255 - index * 2) for index in range(100)]
+    encoded = encode_gif(_gif(colors, [20] * 100), 8, skip_first_frame=False)
+    assert len(encoded.frames) == MAX_GIF_FRAMES
+    # The animation is not cut off: its last frame is still shown, and it plays as long as before
+    shown = _shown(encoded)
+    assert shown[0] == colors[0]
+    assert shown[-1] == colors[-1]
+    assert shown == sorted(shown)
+    assert abs(encoded.speed * MAX_GIF_FRAMES - 2000) <= MAX_GIF_FRAMES
+
+    assert len(encode_gif(_gif(colors, [20] * 100), 8, skip_first_frame=False, max_frames=10).frames) == 10
+
+
+def test_near_duplicate_frames_are_merged():
+    almost_red = (250, 0, 0)
+    gif = _gif([RED, almost_red, GREEN], [100, 100, 100])
+    assert _shown(encode_gif(gif, 8, skip_first_frame=False)) == [RED, almost_red, GREEN]
+
+    # Merged into the first frame, which then lasts twice as long
+    encoded = encode_gif(gif, 8, skip_first_frame=False, dedupe_threshold=8)
+    assert _shown(encoded) == [RED, RED, GREEN]
+    assert encoded.speed == 100
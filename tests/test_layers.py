@@ -0,0 +1,63 @@
+"""Tests of the layer compositor."""
+
+import numpy as np
+
+from pixoo_rest.core.canvas import Canvas
+from pixoo_rest.core.layers import Compositor
+
+RED, GREEN, BLUE = (255, 0, 0), (0, 255, 0), (0, 0, 255)
+
+
+def test_only_invalidated_regions_are_recomposed():
+    base = Canvas(16)
+    base.fill(*BLUE)
+    compositor = Compositor(16)
+    layer = compositor.put("box", 2, 2, 4, 4)
+    layer.canvas.fill(*RED)
+    frame = compositor.compose(base.pixels).copy()
+    assert tuple(frame[3, 3]) == RED
+    assert tuple(frame[0, 0]) == BLUE
+
+    # Drawn without invalidating: the kept frame is reused as it is
+    layer.canvas.fill(*GREEN)
+    assert tuple(compositor.compose(base.pixels)[3, 3]) == RED
+    compositor.invalidate(layer.bounds)
+    assert tuple(compositor.compose(base.pixels)[3, 3]) == GREEN
+
+    # Moving a layer uncovers its old position
+    compositor.put("box", 10, 10, 4, 4)
+    frame = compositor.compose(base.pixels)
+    assert tuple(frame[3, 3]) == BLUE
+    assert tuple(frame[11, 11]) == GREEN
+
+    compositor.remove("box")
+    assert tuple(compositor.compose(base.pixels)[11, 11]) == BLUE
+
+
+def test_changes_of_the_canvas_beneath_are_recomposed():
+    base = Canvas(16)
+    compositor = Compositor(16)
+    compositor.put("top", 0, 0, 8, 8, z=1).canvas.fill(*RED)
+    compositor.put("half", 4, 4, 8, 8, opacity=0.5).canvas.fill(*GREEN)
+    compositor.compose(base.pixels)
+
+    base.fill(*BLUE)
+    frame = compositor.compose(base.pixels)
+    # Opaque layer on top, blended layer over the new canvas, canvas elsewhere
+    assert tuple(frame[5, 5]) == RED
+    assert tuple(frame[10, 10]) == (0, 128, 128)
+    assert tuple(frame[15, 15]) == BLUE
+    assert np.array_equal(frame[12:, :4], base.pixels[12:, :4])
+
+
+def test_without_layers_the_canvas_is_pushed_as_is():
+    base = Canvas(8)
+    compositor = Compositor(8)
+    assert compositor.compose(base.pixels) is base.pixels
+
+    # The first frame with a layer recomposes the whole screen
+    base.fill(*BLUE)
+    compositor.put("dot", 0, 0, 1, 1).canvas.fill(*RED)
+    frame = compositor.compose(base.pixels)
+    assert tuple(frame[0, 0]) == RED
+    assert tuple(frame[7, 7]) == BLUE
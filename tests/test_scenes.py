@@ -0,0 +1,56 @@
+"""Tests of scenes against a stub Pixoo."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from pixoo_rest.core.devices import Device
+from pixoo_rest.core.downloads import DownloadCache
+from pixoo_rest.core.http import HttpClients
+from pixoo_rest.core.scenes import SceneManager
+from pixoo_rest.core.workers import ImageWorkers
+from pixoo_rest.models.requests import SceneRequest
+
+
+def _pixoo(method: str, path: str, body):
+    return 200, {"error_code": 0, "PicId": 1}
+
+
+def _layer_names(device: Device) -> list[str]:
+    return [layer.name for layer in device.compositor.layers]
+
+
+def test_scene_is_kept_when_its_layer_cannot_be_removed(stub_server):
+    server = stub_server(_pixoo)
+
+    async def run():
+        device = Device("test", server.host, 64, False, timeout=5.0)
+        device.executor.start()
+        device.reachable = True
+        clients = HttpClients(max_connections=4, max_keepalive_connections=2, keepalive_expiry=5.0)
+        workers = ImageWorkers("thread", workers=1, max_pending=4, timeout=5.0)
+        manager = SceneManager(DownloadCache(60, 1 << 20, 1 << 20), clients, workers)
+        request = SceneRequest(elements=[{"type": "text", "text": "{now:%H:%M}"}], width=32, height=8)
+        scene = await manager.put(device, "clock", request)
+        assert _layer_names(device) == ["clock"]
+
+        device.reachable = False
+        with pytest.raises(HTTPException) as raised:
+            await manager.remove(device, "clock")
+        assert raised.value.status_code == 503
+        # Still scheduled, so the layer can be removed once the device is back
+        assert manager.get(device, "clock") is scene
+        assert not scene._task.done()
+
+        device.reachable = True
+        await manager.remove(device, "clock")
+        assert manager.of_device(device) == []
+        assert _layer_names(device) == []
+
+        await manager.close()
+        workers.close()
+        await clients.close()
+        await device.close()
+
+    asyncio.run(run())